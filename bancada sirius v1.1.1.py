@@ -1,74 +1,49 @@
 import tkinter as tk
-from tkinter import messagebox, ttk, filedialog
+from tkinter import messagebox, ttk, filedialog, simpledialog
 import serial
 import serial.tools.list_ports
 import time
-import cv2
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
-from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
-from PIL import Image, ImageTk, ImageOps
-from sklearn.linear_model import LinearRegression
+from PIL import Image
+import math
 import os
+import threading
+
+from siriusgraph.portas import descobrir_portas, porta_em_cache
+from siriusgraph.ui import FundoRedimensionavel, PainelLeituras
+
+# Os subsistemas pesados (OpenCV, NumPy, Matplotlib e os módulos do siriusgraph
+# que dependem deles) são importados só quando usados, para a janela abrir
+# rápido; precarregar_modulos() adianta essas importações em segundo plano.
+MODULOS_PESADOS = ('numpy', 'cv2', 'matplotlib.figure', 'matplotlib.backends.backend_agg',
+                   'siriusgraph.aquisicao', 'siriusgraph.grafico', 'siriusgraph.composicao',
+                   'siriusgraph.pipeline', 'siriusgraph.gravador', 'siriusgraph.video')
+
+
+# Função para importar os módulos pesados em uma thread, depois que a janela já apareceu
+# Opções de codec da gravação (nomes de siriusgraph.video, repetidos aqui para não importar o OpenCV)
+CODECS_GRAVACAO = ('auto', 'x264', 'h264_nvenc', 'h264_qsv', 'h264_videotoolbox', 'h264_amf',
+                   'mjpg', 'xvid', 'mp4v', 'mjpg_direto')
+
+
+def precarregar_modulos(modulos=MODULOS_PESADOS):
+    import importlib
+
+    def carregar():
+        for modulo in modulos:
+            try:
+                importlib.import_module(modulo)
+            except ImportError as e:
+                print(f"Não foi possível precarregar {modulo}: {e}")
+
+    thread = threading.Thread(target=carregar, name='precarregar-modulos', daemon=True)
+    thread.start()
+    return thread
 
 # Função para listar as portas seriais disponíveis
 def listar_portas_seriais():
     portas = serial.tools.list_ports.comports()
     return [porta.device for porta in portas]
 
-# Função para conectar a uma porta serial específica
-def conectar_porta_serial(porta, baudrate=115200):
-    try:
-        conexao = serial.Serial(porta, baudrate, timeout=1)
-        if conexao.is_open:
-            print(f"Conectado à porta {porta} com baudrate {baudrate}.")
-            # Verificação adicional para garantir que há comunicação na porta serial
-            conexao.write(b'\n')  # Enviar um byte para verificar a comunicação
-            time.sleep(1)  # Esperar um momento para receber a resposta
-            if conexao.in_waiting > 0:
-                print("Comunicação estabelecida com sucesso.")
-                return conexao
-            else:
-                print("Nenhuma resposta do dispositivo na porta serial.")
-                conexao.close()
-                return None
-        else:
-            print(f"Falha ao conectar à porta {porta}.")
-            return None
-    except serial.SerialException as e:
-        print(f"Erro ao conectar à porta {porta}: {e}")
-        return
-# Função para desenhar o gráfico de linha como uma imagem
-def gerar_imagem_grafico(df, largura, altura):
-    fig, ax = plt.subplots(figsize((largura / 100), (altura / 100)), dpi=100)
-
-    # Gráfico de linha para tempo vs. força
-    ax.plot(df['tempo'], df['forca'], color='purple', label='Força (N)')  # Linha roxa
-    
-    # Configurações do gráfico
-    ax.set_title('Força vs. Tempo')
-    ax.set_xlabel('Tempo (s)')
-    ax.set_ylabel('Força (N)')
-    ax.grid(True)
-
-    # Ajustar os limites do eixo y para manter os dados centralizados
-    ax.set_ylim(0, df['forca'].max() * 1.2)
-
-    # Tornar o gráfico transparente
-    ax.set_facecolor((0, 0, 0, 0))  # Fundo do gráfico transparente
-    fig.patch.set_alpha(0)  # Fundo da figura transparente
-
-    # Converter o gráfico para uma imagem numpy
-    canvas = FigureCanvas(fig)
-    canvas.draw()
-
-    # Transformar a figura em uma imagem numpy
-    img = np.frombuffer(canvas.tostring_rgb(), dtype='uint8')
-    img = img.reshape(fig.canvas.get_width_height()[::-1] + (3,))
-    
-    plt.close(fig)  # Fechar a figura para liberar memória
-    return img
 class CalibrationApp:
     def __init__(self, root):
         self.root = root
@@ -81,24 +56,56 @@ class CalibrationApp:
         
         # Atributos para gravação
         self.gravando = False
-        self.dados = []  # Lista para armazenar os dados
         self.arquivo = None  # Caminho do arquivo de saída
+        self.gravador = None  # Grava as amostras no arquivo .srun à medida que chegam
+        self.folder_name = None
+        self.fator_conversao = float('nan')  # Último fator enviado ao ESP32
         self.serial_connection = None  # Conexão serial
-        self.model = LinearRegression()  # Modelo de regressão linear
+        self.aquisicao = None  # Thread de aquisição dona da porta serial
+        self.pipeline = None  # Pipeline de vídeo da webcam (captura, composição, gravação)
+        self.video_writer = None
+        self.esperas_inicio_gravacao = 0  # esperas_captura do pipeline ao iniciar a gravação
+        self.amostras_nao_gravadas = 0  # Amostras sobrescritas no buffer durante a gravação
+        self.trava_video = threading.Lock()  # O VideoWriter é usado pela etapa de gravação
+        self.formato_camera = None  # Resolução/taxa que a câmera aceitou
+        # Vídeo pedido à câmera; codec ('auto': H.264 na GPU, x264 ou MJPG) e qualidade
+        # da gravação escolhidos na janela e lidos ao abrir a webcam
+        self.resolucao_video = (1280, 720)
+        self.fps_video = 30.0
+        self.codec_video = tk.StringVar(value='auto')
+        self.qualidade_video = tk.IntVar(value=75)
+        self.codec_gravacao = None  # codec_video já resolvido, ao abrir a webcam
+        self.qualidade_gravacao = 75
+        self.perfil_calibracao = None  # Último perfil de calibração ajustado
+        self.medicao_patamar = None  # Coleta de patamar em andamento (thread, resultado, perfil, carga)
+        # Filtro da força nos gráficos (ex.: FiltroMediana() de siriusgraph.filtros);
+        # as leituras, o impulso e o CSV continuam com as amostras cruas
+        self.filtro_exibicao = None
+        # Tempos por etapa do vídeo ao vivo (tecla 'd' mostra/esconde na tela) e rastro
+        # salvo ao fechar a webcam; ligue com a variável de ambiente SIRIUS_DEPURACAO=1
+        self.depuracao = bool(os.environ.get('SIRIUS_DEPURACAO'))
+        self.instrumentacao = None
+        # Vídeo limpo: grava só a câmera (com o índice e as amostras) e a sobreposição
+        # é feita depois por siriusgraph.renderizacao; ao vivo só as leituras na tela
+        self.video_limpo = tk.BooleanVar(value=False)
+        self.gravar_limpo = False  # Modo da janela da webcam aberta
 
         # Carregar a imagem de fundo
         # coloque o caminho do arquivo fundo.png presente na pasta(lembre de colocar barras duplas)
-        self.background_image = Image.open("C:\\Users\\neide\\Downloads\\abviewer\\Projeto bancada sirius v1\\fundo.png")
-        self.background_photo = ImageTk.PhotoImage(self.background_image)
+        try:
+            self.background_image = Image.open("C:\\Users\\neide\\Downloads\\abviewer\\Projeto bancada sirius v1\\fundo.png")
+        except OSError as e:
+            print(f"Imagem de fundo indisponível: {e}")
+            self.background_image = None
         self.canvas = tk.Canvas(root)
         self.canvas.pack(fill=tk.BOTH, expand=True)
-        self.update_background_image()
 
-        # Vincular o evento de redimensionamento da janela à função de redimensionamento da imagem de fundo
-        self.root.bind("<Configure>", self.on_resize)
+        # O fundo é redimensionado só quando o canvas para de mudar de tamanho, com cache por tamanho
+        self.fundo = FundoRedimensionavel(self.canvas, self.background_image)
 
         # Definir a variável known_weight
         self.known_weight = tk.DoubleVar()
+        self.celula = tk.StringVar(value="celula")  # Identifica o perfil de calibração salvo
 
         # Interface
         self.port_label = tk.Label(root, text="Selecione a porta serial:", fg=label_color, font=('Arial', 12))
@@ -110,12 +117,23 @@ class CalibrationApp:
         self.refresh_button = tk.Button(root, text="Atualizar Portas", command=self.atualizar_portas, bg=btn_color, fg=btn_fg_color, font=('Arial', 10))
         self.refresh_button.place(x=400, y=20)
 
+        self.procurar_button = tk.Button(root, text="Procurar Bancada", command=self.procurar_bancada, font=('Arial', 10))
+        self.procurar_button.place(x=520, y=20)
+        self.busca_portas = None  # Thread da busca em andamento e seu resultado
+        self.port_combobox.set(porta_em_cache() or '')  # Última porta em que a bancada respondeu
+
         self.label = tk.Label(root, text="Peso conhecido (kg):", fg=btn_color, font=('Arial', 12))
         self.label.place(x=20, y=60)
         
         self.entry = tk.Entry(root, textvariable=self.known_weight)
         self.entry.place(x=220, y=60)
 
+        self.celula_label = tk.Label(root, text="Célula:", fg=label_color, font=('Arial', 12))
+        self.celula_label.place(x=400, y=60)
+
+        self.celula_entry = tk.Entry(root, textvariable=self.celula, width=12)
+        self.celula_entry.place(x=460, y=60)
+
         self.calibrate_button = tk.Button(root, text="Calibrar", command=self.calibrate, font=('Arial', 10))
         self.calibrate_button.place(x=20, y=100)
 
@@ -134,52 +152,101 @@ class CalibrationApp:
         self.connect_button = tk.Button(root, text="Conectar", command=self.conectar_porta, font=('Arial', 10))
         self.connect_button.place(x=220, y=140)
 
-        # Animação
-        self.animate_widgets()
-
-    def animate_widgets(self):
-        # Animação para o botão calibrar
-        self.calibrate_button.config(bg="red")
-        self.root.after(500, lambda: self.calibrate_button.config(bg="blue"))
-        self.root.after(1000, lambda: self.animate_widgets())
+        self.video_limpo_check = tk.Checkbutton(root, text="Gravar vídeo limpo", variable=self.video_limpo, font=('Arial', 10))
+        self.video_limpo_check.place(x=320, y=140)
+
+        self.codec_label = tk.Label(root, text="Codec:", fg=label_color, font=('Arial', 10))
+        self.codec_label.place(x=480, y=142)
+        self.codec_combobox = ttk.Combobox(root, textvariable=self.codec_video, values=CODECS_GRAVACAO,
+                                           state='readonly', width=14)
+        self.codec_combobox.place(x=530, y=142)
+        self.qualidade_label = tk.Label(root, text="Qualidade:", fg=label_color, font=('Arial', 10))
+        self.qualidade_label.place(x=660, y=142)
+        self.qualidade_spinbox = tk.Spinbox(root, from_=0, to=100, increment=5, textvariable=self.qualidade_video,
+                                            width=4)
+        self.qualidade_spinbox.place(x=740, y=142)
+
+        # Leituras ao vivo da célula de carga (atualizadas só enquanto há aquisição)
+        self.painel_leituras = PainelLeituras(root)
+        self.painel_leituras.place(x=20, y=180)
+        self.grafico_ao_vivo = None  # Gráfico de empuxo, criado ao conectar (importa NumPy)
+        self.root.minsize(820, 500)
 
     def atualizar_portas(self):
         self.port_combobox['values'] = listar_portas_seriais()
+
+    def procurar_bancada(self):
+        # Sonda todas as portas em paralelo (envia 'g' e espera <2,escala>) fora da thread da interface
+        if self.busca_portas is not None:
+            return
+        self.procurar_button.config(state=tk.DISABLED, text="Procurando...")
+        resultado = []
+        thread = threading.Thread(target=lambda: resultado.extend(descobrir_portas()), daemon=True)
+        self.busca_portas = (thread, resultado)
+        thread.start()
+        self.root.after(100, self.verificar_busca)
+
+    def verificar_busca(self):
+        thread, resultado = self.busca_portas
+        if thread.is_alive():
+            self.root.after(100, self.verificar_busca)
+            return
+        self.busca_portas = None
+        self.procurar_button.config(state=tk.NORMAL, text="Procurar Bancada")
+        self.atualizar_portas()
+        if resultado:
+            porta, escala = resultado[0]
+            self.port_combobox.set(porta)
+            messagebox.showinfo("Bancada encontrada", f"Bancada na porta {porta} (escala {escala})")
+        else:
+            messagebox.showwarning("Bancada", "Nenhuma porta respondeu ao comando 'g'.")
     
-    def update_background_image(self):
-        # Obtenha o tamanho atual da janela
-        width, height = self.root.winfo_width(), self.root.winfo_height()
-        resized_image = self.background_image.resize((width, height), Image.Resampling.LANCZOS)
-        self.background_photo = ImageTk.PhotoImage(resized_image)
-        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.background_photo)
-        self.canvas.lower("all")
-
-    def on_resize(self, event):
-        # Atualiza a imagem de fundo quando a janela é redimensionada
-        self.update_background_image()
     def conectar_porta(self):
+        from siriusgraph.aquisicao import AquisicaoSerial
+
         port = self.port_combobox.get()
+        if self.aquisicao:
+            self.painel_leituras.parar()
+            if self.grafico_ao_vivo:
+                self.grafico_ao_vivo.parar()
+            self.aquisicao.parar()
+            self.aquisicao = None
         try:
-            self.serial_connection = serial.Serial(port, 115200, timeout=1)
+            # A thread de aquisição passa a ser a única dona da porta serial
+            self.aquisicao = AquisicaoSerial(port, 115200, filtro=self.filtro_exibicao).iniciar()
+            self.serial_connection = self.aquisicao.conexao
+            self.acompanhar_aquisicao()
             messagebox.showinfo("Conexão", f"Conectado à porta {port}")
         except serial.SerialException as e:
             messagebox.showerror("Erro de Conexão", f"Não foi possível abrir a porta {port}: {e}")
 
+    def acompanhar_aquisicao(self):
+        # Leituras e gráfico da janela passam a seguir o buffer da aquisição atual
+        self.painel_leituras.acompanhar(self.aquisicao.buffer)
+        if self.grafico_ao_vivo is None:
+            # Gráfico de empuxo ao vivo (últimos segundos ou corrida inteira)
+            from siriusgraph.grafico_tk import GraficoTk
+            self.grafico_ao_vivo = GraficoTk(self.root)
+            self.grafico_ao_vivo.place(x=240, y=180)
+        self.grafico_ao_vivo.acompanhar(self.aquisicao.buffer_exibicao)
+
     def testar_conexao(self):
         try:
-            if self.serial_connection and self.serial_connection.is_open:
-                self.serial_connection.write(b'g\n')
-                response = self.serial_connection.readline().decode().strip()
-                if response.startswith("<2,"):
+            if self.aquisicao and self.serial_connection.is_open:
+                self.aquisicao.enviar(b'g\n')
+                response = self.aquisicao.aguardar_resposta()
+                if response is not None:
                     messagebox.showinfo("Teste de Conexão", "Conexão estabelecida e resposta recebida.")
                 else:
                     messagebox.showerror("Teste de Conexão", "Resposta inválida recebida.")
         except (serial.SerialException, ValueError) as e:
             messagebox.showerror("Erro de Conexão", f"Erro ao testar a conexão: {e}")
     def selecionar_marca_dagua(self):
+        from siriusgraph.composicao import MarcaDagua
+
         self.marca_dagua_path = filedialog.askopenfilename(filetypes=[("Image files", "*.png;*.jpg;*.jpeg;*.bmp;*.tiff")])
         if self.marca_dagua_path:
-            self.marca_dagua = cv2.imread(self.marca_dagua_path, cv2.IMREAD_UNCHANGED)  # Carregar com canal alfa para transparência
+            self.marca_dagua = MarcaDagua.carregar(self.marca_dagua_path)  # Carregar com canal alfa para transparência
             if self.marca_dagua is None:
                 messagebox.showerror("Erro", "Não foi possível carregar a imagem da marca d'água.")
             else:
@@ -187,221 +254,447 @@ class CalibrationApp:
         else:
             messagebox.showinfo("Informação", "Nenhuma imagem selecionada.")
 
-    def get_load_cell_reading(self):
-        try:
-            if self.serial_connection and self.serial_connection.is_open:
-                line = self.serial_connection.readline().decode().strip()
-                if line:
-                    _, time_value, weight_value = line.strip('<>').split(',')
-                    return float(weight_value)
-        except (serial.SerialException, ValueError) as e:
-            messagebox.showerror("Erro de Conexão", f"Erro na leitura dos dados: {e}")
-        return None
+    def get_load_cell_reading(self, timeout=1.0):
+        # Espera uma amostra nova do buffer de aquisição, sem tocar na porta
+        if not self.aquisicao:
+            messagebox.showerror("Erro de Conexão", "Nenhuma porta serial conectada.")
+            return None
+        buffer = self.aquisicao.buffer
+        cursor = buffer.escritos
+        limite = time.monotonic() + timeout
+        while buffer.escritos == cursor and time.monotonic() < limite:
+            time.sleep(0.005)
+        if self.aquisicao.erro:
+            messagebox.showerror("Erro de Conexão", f"Erro na leitura dos dados: {self.aquisicao.erro}")
+            return None
+        ultima = buffer.ultima()
+        return ultima[1] if ultima else None
 
     def set_conversion_factor(self, factor):
-        if self.serial_connection and self.serial_connection.is_open:
+        if self.aquisicao and self.serial_connection.is_open:
             command = f's{factor}\n'
-            self.serial_connection.write(command.encode())
-            response = self.serial_connection.read_until().decode().strip()
-            messagebox.showinfo("Resposta", f"Fator de conversão atualizado: {response}")
+            self.aquisicao.enviar(command)
+            # O firmware não responde ao 's'; confirmamos lendo a escala com 'g'
+            escala = self.ler_escala()
+            if escala is None:
+                messagebox.showerror("Resposta", f"O ESP32 não confirmou o fator de conversão {factor}.")
+            else:
+                messagebox.showinfo("Resposta", f"Fator de conversão atualizado: {escala}")
+    def ler_escala(self):
+        # Escala atual do HX711 pelo comando 'g'; None sem resposta ou com escala inválida
+        self.aquisicao.enviar(b'g\n')
+        resposta = self.aquisicao.aguardar_resposta()
+        if not resposta:
+            return None
+        try:
+            escala = float(resposta[1])
+        except (IndexError, TypeError, ValueError):
+            return None
+        return escala if math.isfinite(escala) and escala != 0 else None
+
     def calibrate(self):
+        from siriusgraph.calibracao import PerfilCalibracao
+
+        if not self.aquisicao:
+            messagebox.showerror("Erro de Conexão", "Nenhuma porta serial conectada.")
+            return
+        if self.medicao_patamar is not None:
+            return  # Já há uma calibração em andamento
+        # Escala atual do HX711: as leituras dos patamares estão nessa escala, e o
+        # fator enviado ao ESP32 é calculado a partir dela
+        escala = self.ler_escala()
+        if escala is None:
+            messagebox.showerror("Calibração",
+                                 "Não foi possível ler a escala atual do ESP32 (comando 'g'); "
+                                 "calibração cancelada.")
+            return
+        perfil = PerfilCalibracao(self.celula.get().strip() or "celula", escala_referencia=escala)
+
         # Aviso ao usuário para obter leituras sem carga
         messagebox.showinfo("Aviso", "Vamos obter os valores sem carga.")
         if not messagebox.askokcancel("Confirmação", "Clique em OK para continuar."):
             return  # Se o usuário cancelar, interrompa o processo
+        self.medir_patamar(perfil, 0.0)
+
+    def pedir_carga(self, perfil, carga):
+        # Um patamar para cada peso conhecido, até o usuário cancelar
+        carga = simpledialog.askfloat(
+            "Peso conhecido",
+            f"Coloque o peso conhecido (kg) e clique em OK.\n"
+            f"Pontos medidos: {len(perfil.pontos)}. Cancele para terminar.",
+            initialvalue=carga or self.known_weight.get(), parent=self.root)
+        if carga is None:
+            self.concluir_calibracao(perfil)
+        else:
+            self.medir_patamar(perfil, carga)
 
-        # Obtenha a leitura sem carga
-        no_load_value = self.get_load_cell_reading()
-        messagebox.showinfo("Informação", "Adicione a carga conhecida e clique em OK")
-        
-        # Obtenha a leitura com carga conhecida
-        known_load_value = self.get_load_cell_reading()
-        known_weight = self.known_weight.get()
-        
-        # Calcular o fator de conversão
-        conversion_factor = (known_load_value - no_load_value) / known_weight
-        print(f'Novo fator de conversão: {conversion_factor}')
-        
-        # Atualizar dados de calibração para aprendizado de máquina
-        self.update_calibration_data(no_load_value, known_load_value, known_weight)
+    def concluir_calibracao(self, perfil):
+        from siriusgraph.calibracao import ErroCalibracao, salvar_perfil
+
+        try:
+            ajuste = perfil.ajustar()
+        except ErroCalibracao as e:
+            messagebox.showerror("Calibração", str(e))
+            return
+        self.perfil_calibracao = perfil
+        caminho = salvar_perfil(perfil)
+        residuos = "\n".join(f"{p['carga']:.3f} kg: {r:+.4f} kg" for p, r in zip(perfil.pontos, ajuste['residuos']))
+        messagebox.showinfo("Calibração",
+                            f"Perfil {perfil.celula} v{perfil.versao} salvo em {caminho}\n\n"
+                            f"Resíduos:\n{residuos}\n\n"
+                            f"Não linearidade: {ajuste['nao_linearidade_pct']:.3f}% do fundo de escala")
 
         # Configurar novo fator de conversão no ESP32
-        self.set_conversion_factor(conversion_factor)
-    
-    def update_calibration_data(self, no_load_value, known_load_value, known_weight):
-        # Atualizar o modelo de regressão linear com novos dados
-        X = np.array([[no_load_value], [known_load_value]])
-        y = np.array([0, known_weight])
-        self.model.fit(X, y)
-        print("Modelo de regressão atualizado.")
+        self.fator_conversao = perfil.fator_firmware
+        print(f'Novo fator de conversão: {self.fator_conversao}')
+        self.set_conversion_factor(self.fator_conversao)
+
+    def medir_patamar(self, perfil, carga):
+        # Média robusta de muitas amostras do buffer de aquisição para esta carga; a coleta
+        # (alguns segundos) roda fora da thread da interface
+        from siriusgraph.calibracao import coletar_patamar
+
+        self.calibrate_button.config(state=tk.DISABLED, text="Medindo...")
+        resultado = []
+        buffer = self.aquisicao.buffer
+        thread = threading.Thread(target=lambda: resultado.append(coletar_patamar(buffer)), daemon=True)
+        self.medicao_patamar = (thread, resultado, perfil, carga)
+        thread.start()
+        self.root.after(100, self.verificar_patamar)
+
+    def verificar_patamar(self):
+        thread, resultado, perfil, carga = self.medicao_patamar
+        if thread.is_alive():
+            self.root.after(100, self.verificar_patamar)
+            return
+        self.medicao_patamar = None
+        self.calibrate_button.config(state=tk.NORMAL, text="Calibrar")
+        amostras = resultado[0] if resultado else ()
+        erro = self.aquisicao.erro if self.aquisicao else "porta desconectada"
+        if erro or len(amostras) == 0:
+            messagebox.showerror("Erro de Conexão", f"Sem leituras da célula de carga: {erro}")
+            return
+        ponto = perfil.adicionar_patamar(carga, amostras)
+        print(f"Patamar {carga} kg: leitura {ponto['leitura']:.5f} ± {ponto['desvio']:.5f} "
+              f"({ponto['amostras']} amostras, {ponto['rejeitadas']} descartadas)")
+        self.pedir_carga(perfil, carga)
+
     def iniciar_gravacao(self):
         """Inicia a gravação dos dados."""
         if not self.gravando:
             self.gravando = True
-            self.dados.clear()  # Limpa os dados antes de começar a gravar
             self.start_recording_button.config(text="Parar Gravação")  # Atualiza o texto do botão
 
             # Criar a pasta para salvar os dados
             self.folder_name = f"calibration_data_{time.strftime('%Y%m%d_%H%M%S')}"
             os.makedirs(self.folder_name, exist_ok=True)
 
-            # Iniciar o VideoWriter para gravação de tela
-            self.video_writer = cv2.VideoWriter(
-                os.path.join(self.folder_name, 'calibration_video.avi'),
-                cv2.VideoWriter_fourcc(*'XVID'),
-                #taxa de quadros
-                30.0,
-                (1280, 720)  # Tamanho do frame
-            )
+            # Amostras vão para o disco à medida que chegam, em uma thread própria
+            from siriusgraph.gravador import GravadorCorrida
+            periodo = self.aquisicao.periodo_estimado if self.aquisicao else None
+            # Escala em uso no ESP32, que calibracao.aplicar precisa para corrigir a corrida depois
+            escala = self.ler_escala() if self.aquisicao else None
+            if escala is None:
+                print("Escala do ESP32 desconhecida (sem resposta ao 'g'); a corrida fica sem fator de calibração")
+                escala = float('nan')
+            self.gravador = GravadorCorrida(
+                os.path.join(self.folder_name, 'calibration_data.srun'),
+                fator_calibracao=escala,
+                taxa_amostragem=1.0 / periodo if periodo else float('nan')).iniciar()
+
+            # O VideoWriter é aberto pela etapa de gravação no primeiro quadro,
+            # com o tamanho real do quadro e a taxa informada pela câmera
+            with self.trava_video:
+                self.video_writer = None
+            self.esperas_inicio_gravacao = self.pipeline.esperas_captura if self.pipeline else 0
+            self.amostras_nao_gravadas = 0
         else:
             self.gravando = False
             self.start_recording_button.config(text="Iniciar Gravação")  # Atualiza o texto do botão
 
-            # Finalizar o VideoWriter
-            self.video_writer.release()
+            # Grava o último lote pendente e fecha o arquivo
+            gravador, self.gravador = self.gravador, None
+            if gravador is not None:
+                gravador.fechar()
+                print(f"Amostras gravadas: {gravador.amostras_gravadas}")
+                if gravador.erro is not None:
+                    messagebox.showerror("Erro de Gravação",
+                                         f"Falha ao gravar {gravador.caminho}: {gravador.erro}\n"
+                                         f"Só {gravador.amostras_gravadas} amostras foram gravadas.")
+                elif gravador.blocos_descartados or self.amostras_nao_gravadas:
+                    motivos = []
+                    if gravador.blocos_descartados:
+                        motivos.append(f"{gravador.blocos_descartados} blocos de amostras foram descartados "
+                                       f"porque o disco não acompanhou")
+                    if self.amostras_nao_gravadas:
+                        motivos.append(f"{self.amostras_nao_gravadas} amostras foram sobrescritas no buffer "
+                                       f"antes de chegar ao gravador")
+                    messagebox.showerror("Erro de Gravação",
+                                         f"{'; '.join(motivos)}; {gravador.caminho} está incompleto.")
+
+            # Finalizar o VideoWriter (esperando a etapa de gravação soltar o quadro atual)
+            with self.trava_video:
+                if self.video_writer is not None:
+                    self.video_writer.fechar()
+                    try:
+                        self.video_writer.escritor.release()
+                    except RuntimeError as e:  # ErroVideo: o FFmpeg falhou ao finalizar o arquivo
+                        messagebox.showerror("Erro de Vídeo", str(e))
+                    print(f"Vídeo gravado: {self.video_writer.estatisticas()}")
+                    print(f"Codificação: {self.video_writer.escritor.estatisticas()}")
+                    self.video_writer = None
+                    if self.pipeline:
+                        esperas = self.pipeline.esperas_captura - self.esperas_inicio_gravacao
+                        if esperas:
+                            # Nenhum quadro capturado foi descartado, mas a câmera foi lida com atraso;
+                            # o GravadorSincronizado cobre as lacunas repetindo o quadro anterior
+                            print(f"A captura esperou a composição {esperas} vezes")
+                    if self.gravar_limpo:
+                        marca = getattr(self, 'marca_dagua_path', None)
+                        opcao = f' --marca-dagua "{marca}"' if marca else ''
+                        print(f"Vídeo limpo; para sobrepor o gráfico: "
+                              f"python -m siriusgraph.renderizacao {self.folder_name}{opcao}")
     def salvar_dados(self):
         """Salva os dados gravados em um arquivo .txt."""
-        if not self.dados:
+        from siriusgraph.formato import abrir_corrida, binario_para_texto, recuperar_corrida
+
+        # As amostras já estão no disco (calibration_data.srun); aqui só exportamos para texto
+        caminho_corrida = os.path.join(self.folder_name, 'calibration_data.srun') if self.folder_name else None
+        if not caminho_corrida or not os.path.exists(caminho_corrida):
             messagebox.showwarning("Aviso", "Não há dados para salvar.")
             return
+        if self.gravador is not None:
+            messagebox.showwarning("Aviso", "Pare a gravação antes de salvar os dados.")
+            return
+        if not abrir_corrida(caminho_corrida).completa:
+            recuperar_corrida(caminho_corrida)  # Corrida interrompida (ex.: queda do programa)
 
         # Salvar os dados na pasta criada
         caminho_arquivo = os.path.join(self.folder_name, 'calibration_data.txt')
-        with open(caminho_arquivo, 'w') as f:
-            for dado in self.dados:
-                f.write(f"{dado}\n")
+        if not binario_para_texto(caminho_corrida, caminho_arquivo):
+            messagebox.showwarning("Aviso", "Não há dados para salvar.")
+            return
         messagebox.showinfo("Sucesso", f"Dados salvos em {caminho_arquivo}")
     def mostrar_webcam_com_grafico(self):
-        port = self.port_combobox.get()
-        cap = cv2.VideoCapture(0)
+        import cv2
 
-        # Definir a janela para tela cheia
-        cv2.namedWindow('Webcam com Gráfico Transparente', cv2.WND_PROP_FULLSCREEN)
-        cv2.setWindowProperty('Webcam com Gráfico Transparente', cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+        from siriusgraph.aquisicao import AquisicaoSerial
+        from siriusgraph.impulso import AcumuladorImpulso
+        from siriusgraph.hud import HudLeituras
+        from siriusgraph.instrumentacao import DESLIGADA, HudDepuracao, Instrumentacao
+        from siriusgraph.pipeline import PipelineVideo
+        from siriusgraph.video import CODEC_MJPG_DIRETO, abrir_camera, escolher_codec
+
+        port = self.port_combobox.get()
+        if self.pipeline:
+            return  # A janela da webcam já está aberta
 
-        # Carregar a imagem da marca d'água de sua equipe
-        marca_dagua_path = self.marca_dagua_path
-        marca_dagua = cv2.imread(marca_dagua_path, cv2.IMREAD_UNCHANGED)  # Carregar com canal alfa para transparência
+        # Marca d'água da equipe, já redimensionada e pré-processada ao ser selecionada
+        self.marca_dagua_ativa = getattr(self, 'marca_dagua', None)
+        # Lido uma vez aqui: a composição roda em outra thread e não consulta o Tk
+        self.gravar_limpo = self.video_limpo.get()
 
-        if marca_dagua is None:
+        if self.marca_dagua_ativa is None and not self.gravar_limpo:
             messagebox.showerror("Erro", "Não foi possível carregar a imagem da marca d'água.")
             return
 
-        # Redimensionar a marca d'água para um tamanho menor
-        altura_marca, largura_marca = marca_dagua.shape[:2]
-        nova_largura = int(largura_marca * 0.20)  # Largura 20% do original
-        nova_altura = int(altura_marca * 0.25)    # Altura 25% do original
-        marca_dagua = cv2.resize(marca_dagua, (nova_largura, nova_altura), interpolation=cv2.INTER_AREA)
-
-        try:
-            ser = serial.Serial(port, 115200, timeout=1)  # Tentar conectar à porta serial
-        except serial.SerialException as e:
-            ser = None
-            messagebox.showerror("Erro de Conexão", f"Não foi possível abrir a porta {port}: {e}")
-
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            altura, largura, _ = frame.shape  # Dimensões do frame da webcam
-
-            # Posição da marca d'água no canto inferior direito
-            y_offset = altura - nova_altura - 3
-            x_offset = largura - nova_largura - 3
-
-            # Processamento dos dados se disponíveis
-            if ser:
-                line = ser.readline().decode().strip()
-                if line:
-                    data = line.strip('<>').split(',')
-                    if len(data) == 3:
-                        tempo, forca, pressao = map(float, data)
+        # Os dados vêm do buffer da thread de aquisição; a porta não é reaberta aqui
+        if not self.aquisicao:
+            try:
+                self.aquisicao = AquisicaoSerial(port, 115200, filtro=self.filtro_exibicao).iniciar()
+                self.serial_connection = self.aquisicao.conexao
+                self.acompanhar_aquisicao()
+            except serial.SerialException as e:
+                messagebox.showerror("Erro de Conexão", f"Não foi possível abrir a porta {port}: {e}")
+        self.cursor_dados = self.aquisicao.buffer.escritos if self.aquisicao else 0
+        self.grafico = None  # Figura criada uma única vez e atualizada a cada quadro
+        self.acumulador = AcumuladorImpulso()  # Impulso integrado amostra a amostra (trapézio)
+        self.leituras = None  # Últimos valores exibidos (tempo, força, impulso, impulso total)
+        self.hud = HudLeituras()  # Textos das leituras sobre o vídeo (UTF-8, com cache)
+        self.instrumentacao = Instrumentacao() if self.depuracao else DESLIGADA
+        self.hud_depuracao = HudDepuracao(self.instrumentacao)
+        self.mostrar_depuracao = self.depuracao
 
-                        # Criar um DataFrame temporário para o gráfico
-                        df = pd.DataFrame({
-                            'tempo': [tempo],
-                            'forca': [forca],
-                            'pressao': [pressao]
-                        })
-
-                        # Calcular impulso e total de impulso
-                        df['impulso'] = df['forca'] * df['tempo']  # Impulso = Força * Tempo
-                        df['impulso_total'] = df['impulso'].cumsum()  # Impulso total é a soma cumulativa dos impulsos
-
-                        # Gerar o gráfico de linha (tempo vs força)
-                        grafico_img = gerar_imagem_grafico(df, largura, altura)
+        # Definir a janela para tela cheia
+        cv2.namedWindow('Webcam com Gráfico Transparente', cv2.WND_PROP_FULLSCREEN)
+        cv2.setWindowProperty('Webcam com Gráfico Transparente', cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
 
-                        # Redimensionar o gráfico para cobrir toda a tela
+        # Captura, composição e gravação rodam em threads próprias; a exibição fica
+        # na thread da interface, chamada pelo root.after, e o Tkinter não congela
+        # 'auto' testa os codificadores com o FFmpeg (um subprocesso cada); aqui, e não
+        # na etapa de gravação, onde a espera encheria a fila e travaria a composição
+        self.codec_gravacao = escolher_codec(self.codec_video.get())
+        try:
+            self.qualidade_gravacao = min(100, max(0, int(self.qualidade_video.get())))
+        except (tk.TclError, ValueError):
+            self.qualidade_gravacao = 75
+        # No vídeo limpo com mjpg_direto a câmera entrega os JPEGs sem decodificar e eles
+        # vão assim para o arquivo; só a imagem da tela é decodificada, na composição
+        bruto = self.gravar_limpo and self.codec_gravacao == CODEC_MJPG_DIRETO
+        self.cap, self.formato_camera = abrir_camera(0, *self.resolucao_video, self.fps_video, bruto=bruto)
+        print(f"Codec de gravação: {self.codec_gravacao} (qualidade {self.qualidade_gravacao})")
+        print(f"Câmera: {self.formato_camera}")
+        self.pipeline = PipelineVideo(self.cap, self.compor_quadro, gravar=self.gravar_quadro,
+                                      instrumentacao=self.instrumentacao).iniciar()
+        self.exibir_quadros()
+
+    def compor_quadro(self, quadro):
+        """Etapa de composição: gráfico, leituras e marca d'água sobre o quadro.
+
+        No modo de vídeo limpo só as amostras são consumidas e o quadro segue cru.
+        """
+        import cv2
+
+        instrumentacao = self.instrumentacao
+        frame = quadro.imagem
+        if frame.ndim == 1:
+            # JPEG da captura bruta (mjpg_direto): no vídeo limpo segue assim para a
+            # gravação, e a tela recebe a imagem decodificada
+            with instrumentacao.etapa('decodificacao'):
+                frame = cv2.imdecode(frame, cv2.IMREAD_COLOR)
+            if self.gravar_limpo:
+                quadro.exibicao = frame
+        altura, largura, _ = frame.shape  # Dimensões do frame da webcam
+        buffer = self.aquisicao.buffer if self.aquisicao else None
+
+        # Processamento dos dados se disponíveis (leitura não bloqueante do buffer)
+        combined_frame = frame
+        if buffer:
+            with instrumentacao.etapa('dados'):
+                novos_tempos, novas_forcas, _, self.cursor_dados, perdidas = buffer.desde(self.cursor_dados)
+                if perdidas and self.gravando:
+                    # Sobrescritas no buffer antes de lidas: não chegam ao .srun
+                    self.amostras_nao_gravadas += perdidas
+                if len(novos_tempos):
+                    # Calcular impulso e total de impulso só para as amostras novas
+                    impulsos, impulsos_totais = self.acumulador.adicionar(novos_tempos, novas_forcas)
+                    self.leituras = (novos_tempos[-1], novas_forcas[-1], impulsos[-1], impulsos_totais[-1])
+
+                    # Enviar as amostras novas ao gravador se a gravação estiver ativa
+                    gravador = self.gravador
+                    if self.gravando and gravador is not None:
+                        gravador.adicionar(tempo=novos_tempos, forca=novas_forcas,
+                                           impulso=impulsos, impulso_total=impulsos_totais)
+            instrumentacao.contar('amostras', len(novos_tempos))
+
+            if self.leituras and not self.gravar_limpo:
+                with instrumentacao.etapa('grafico'):
+                    # Janela mais recente para o gráfico
+                    tempos, forcas, _ = self.aquisicao.buffer_exibicao.ultimas(2000)
+
+                    # Atualizar o gráfico de linha (tempo vs força)
+                    if self.grafico is None:
+                        from siriusgraph.grafico import GraficoOverlay
+                        self.grafico = GraficoOverlay(largura, altura)
+                    grafico_img = cv2.cvtColor(self.grafico.atualizar(tempos, forcas), cv2.COLOR_RGBA2BGR)
+
+                with instrumentacao.etapa('mistura'):
+                    # Redimensionar o gráfico para cobrir toda a tela (só se o tamanho diferir)
+                    if grafico_img.shape[:2] != (altura, largura):
                         grafico_img_resized = cv2.resize(grafico_img, (largura, altura))
-
-                        # Aplicar transparência ao gráfico (0.7 para o frame e 0.3 para o gráfico)
-                        combined_frame = cv2.addWeighted(frame, 0.7, grafico_img_resized, 0.3, 0)
-
-                        # Pegar os últimos valores (mais recentes) do dataset
-                        ultimo_dado = df.iloc[-1]
-                        tempo = ultimo_dado['tempo']
-                        forca = ultimo_dado['forca']
-                        impulso = ultimo_dado['impulso']
-                        impulso_total = df['impulso_total'].iloc[-1]  # Impulso total
-
-                        # Exibir o texto na tela
-                        cv2.putText(combined_frame, "Tempo", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
-                        cv2.putText(combined_frame, "{:.2f} s".format(tempo), (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2, cv2.LINE_AA)
-
-                        cv2.putText(combined_frame, "Força", (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
-                        cv2.putText(combined_frame, "{:.2f} N".format(forca), (10, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2, cv2.LINE_AA)
-
-                        cv2.putText(combined_frame, "Impulso", (10, 130), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
-                        cv2.putText(combined_frame, "{:.2f} N.s".format(impulso), (10, 150), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2, cv2.LINE_AA)
-
-                        cv2.putText(combined_frame, "Impulso Total", (10, 180), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
-                        cv2.putText(combined_frame, "{:.2f} N.s".format(impulso_total), (10, 200), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2, cv2.LINE_AA)
-
-                        # Adicionar os dados à lista se a gravação estiver ativa
-                        if self.gravando:
-                            self.dados.append(f"{tempo},{forca},{impulso},{impulso_total}")
-
-                            # Gravar o frame no vídeo
-                            self.video_writer.write(combined_frame)
-                else:
-                    combined_frame = frame.copy()
-            else:
-                combined_frame = frame.copy()
-
-            # Sobrepor a marca d'água no canto inferior direito
-            if marca_dagua.shape[2] == 4:
-                alpha_channel = marca_dagua[:, :, 3] / 255.0
-                marca_dagua_rgb = marca_dagua[:, :, :3]
-                # Combinando a marca d'água com o frame
-                for c in range(0, 3):
-                    combined_frame[y_offset:y_offset+nova_altura, x_offset:x_offset+nova_largura, c] = \
-                        (1. - alpha_channel) * combined_frame[y_offset:y_offset+nova_altura, x_offset:x_offset+nova_largura, c] + \
-                        alpha_channel * marca_dagua_rgb[:, :, c]
-            else:
-                # Caso a marca d'água não tenha transparência, simplesmente sobrepor
-                combined_frame[y_offset:y_offset+nova_altura, x_offset:x_offset+nova_largura] = marca_dagua
-
+                    else:
+                        grafico_img_resized = grafico_img
+
+                    # Aplicar transparência ao gráfico (0.7 para o frame e 0.3 para o gráfico)
+                    combined_frame = cv2.addWeighted(frame, 0.7, grafico_img_resized, 0.3, 0)
+
+                # Rótulos desenhados uma vez; só os valores que mudaram são recompostos
+                with instrumentacao.etapa('hud'):
+                    self.hud.aplicar(combined_frame, self.leituras)
+
+        # Sobrepor a marca d'água no canto inferior direito
+        if not self.gravar_limpo:
+            with instrumentacao.etapa('marca_dagua'):
+                self.marca_dagua_ativa.aplicar(combined_frame)
+            quadro.imagem = combined_frame
+        return quadro
+
+    def gravar_quadro(self, quadro):
+        """Etapa de gravação: recebe todos os quadros compostos, sem descarte."""
+        from siriusgraph.sincronizacao import GravadorSincronizado
+        from siriusgraph.video import abrir_escritor
+
+        with self.trava_video:
+            if not self.gravando:
+                return
+            if self.video_writer is None:
+                # Vídeo no tamanho e na taxa que a câmera aceitou; quadros diferentes são redimensionados
+                formato = self.formato_camera
+                escritor = abrir_escritor(
+                    os.path.join(self.folder_name, 'calibration_video'),
+                    formato['fps'],
+                    (formato['largura'], formato['altura']),
+                    self.codec_gravacao,
+                    self.qualidade_gravacao)
+                # Taxa constante a partir dos instantes de captura, com índice quadro → amostras
+                self.video_writer = GravadorSincronizado(
+                    escritor, formato['fps'],
+                    caminho_indice=os.path.join(self.folder_name, 'calibration_video_indice.csv'),
+                    relogio=self.aquisicao.relogio if self.aquisicao else None)
+            self.video_writer.escrever(quadro.imagem, quadro.instante, quadro.indice)
+
+    def exibir_quadros(self):
+        # Mostra o quadro composto mais recente e agenda a próxima exibição
+        import cv2
+
+        from siriusgraph.pipeline import FIM
+
+        inicio = time.perf_counter()
+        quadro = self.pipeline.quadro_para_exibir()
+        if quadro is FIM:
+            self.fechar_webcam()
+            return
+        for etapa, erro in self.pipeline.novos_erros():
+            if etapa == 'gravacao' and self.gravando:
+                self.iniciar_gravacao()  # Para a gravação e fecha o que foi gravado até aqui
+            messagebox.showerror("Erro de Vídeo", f"Falha na etapa de {etapa} do vídeo: {erro}")
+        if quadro is not None:
+            imagem = quadro.imagem if quadro.exibicao is None else quadro.exibicao
+            limpo = self.gravar_limpo and self.leituras
+            depuracao = self.mostrar_depuracao and self.instrumentacao.ativa
+            if (limpo or depuracao) and quadro.exibicao is None:
+                # Cópia: o mesmo quadro vai para a gravação, que não deve levar estes textos
+                imagem = imagem.copy()
+            if limpo:
+                with self.instrumentacao.etapa('hud'):
+                    self.hud.aplicar(imagem, self.leituras)
+            if depuracao:
+                imagem = self.hud_depuracao.aplicar(imagem)
             # Mostrar o frame com o gráfico transparente e os dados
-            cv2.imshow('Webcam com Gráfico Transparente', combined_frame)
-
-            # Gravar o frame no vídeo, se gravação estiver ativa
-            if self.gravando:
-                self.video_writer.write(combined_frame)
+            cv2.imshow('Webcam com Gráfico Transparente', imagem)
+            self.pipeline.registrar_exibicao(time.perf_counter() - inicio)
 
-            # Pressione 'q' para sair
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
-
-        if ser:
-            ser.close()
-        cap.release()
+        # Pressione 'q' para sair e 'd' para mostrar/esconder os tempos por etapa
+        tecla = cv2.waitKey(1) & 0xFF
+        if tecla == ord('q'):
+            self.fechar_webcam()
+            return
+        if tecla == ord('d'):
+            self.mostrar_depuracao = not self.mostrar_depuracao
+        self.root.after(5, self.exibir_quadros)
+
+    def fechar_webcam(self):
+        import cv2
+
+        self.pipeline.parar()
+        metricas = self.pipeline.metricas()
+        print(f"Métricas do pipeline de vídeo: {metricas}")
+        if self.instrumentacao.ativa:
+            # Rastro da sessão ao lado dos dados gravados (ou no diretório atual)
+            base = os.path.join(self.folder_name or os.getcwd(), time.strftime('desempenho_%Y%m%d_%H%M%S'))
+            self.instrumentacao.exportar(base + '.json', pipeline=metricas)
+            self.instrumentacao.exportar(base + '.csv')
+            print(f"Tempos por etapa salvos em {base}.json e {base}.csv")
+        self.pipeline = None
+        self.cap.release()
         cv2.destroyAllWindows()
 
 # Função principal
 def main():
     root = tk.Tk()
     app = CalibrationApp(root)
+    # Com a janela já desenhada, adianta as importações pesadas em segundo plano
+    root.after(200, precarregar_modulos)
     root.mainloop()
 
 if __name__ == "__main__":
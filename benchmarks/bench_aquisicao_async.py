@@ -0,0 +1,82 @@
+"""Quatro ESP32 simulados lidos ao mesmo tempo pelo ``ServicoAquisicao``.
+
+Cada simulador roda em um processo separado, para que o tempo de CPU medido
+(``time.process_time``) seja só o do laço de aquisição. A fração de um núcleo
+usada é esse tempo dividido pelo tempo decorrido; a vazão é contada depois de
+um aquecimento, para não incluir a abertura das portas.
+
+Uso: python benchmarks/bench_aquisicao_async.py
+"""
+import os
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+from siriusgraph.aquisicao_async import ServicoAquisicao
+from siriusgraph.simulador import TRANSPORTE_PTY, TRANSPORTE_SOCKET
+
+N_FONTES = 4
+TAXAS = (80, 1000, 5000)
+TRANSPORTE = TRANSPORTE_PTY if os.name == 'posix' else TRANSPORTE_SOCKET
+
+
+def iniciar_simulador(taxa):
+    processo = subprocess.Popen([sys.executable, '-u', '-m', 'siriusgraph.simulador', '--taxa', str(taxa),
+                                 '--transporte', TRANSPORTE, '--ruido', '0.1'],
+                                cwd=RAIZ, stdout=subprocess.PIPE, text=True)
+    # "Simulador em <url> (...)"
+    url = processo.stdout.readline().split()[2]
+    return processo, url
+
+
+def medir(taxa, duracao=2.0, aquecimento=0.5, n_fontes=N_FONTES):
+    simuladores = [iniciar_simulador(taxa) for _ in range(n_fontes)]
+    servico = ServicoAquisicao()
+    try:
+        for i, (_, url) in enumerate(simuladores):
+            servico.adicionar_fonte(f'fonte{i}', url)
+        servico.iniciar()
+        time.sleep(aquecimento)
+        quadros = [f.quadros_validos for f in servico.fontes.values()]
+        cpu, inicio = time.process_time(), time.monotonic()
+        time.sleep(duracao)
+        cpu, decorrido = time.process_time() - cpu, time.monotonic() - inicio
+        recebidos = [f.quadros_validos - q for f, q in zip(servico.fontes.values(), quadros)]
+        tempo, alinhadas = servico.janela_alinhada(1.0)
+    finally:
+        servico.parar()
+        for processo, _ in simuladores:
+            processo.terminate()
+            processo.wait()
+    return {
+        'recebidos_por_s': sum(recebidos) / decorrido,
+        'fracao_esperada': min(recebidos) / (taxa * decorrido),
+        'perdidas': sum(f.amostras_perdidas for f in servico.fontes.values()),
+        'cpu_pct': 100.0 * cpu / decorrido,
+        'fontes_alinhadas': len(alinhadas),
+    }
+
+
+def executar(duracao=2.0):
+    resultados = {}
+    for taxa in TAXAS:
+        medida = medir(taxa, duracao)
+        resultados[f'aquisicao_async_{N_FONTES}_fontes_cpu_pct_{taxa}hz'] = medida['cpu_pct']
+        resultados[f'aquisicao_async_{N_FONTES}_fontes_recebidos_por_s_{taxa}hz'] = medida['recebidos_por_s']
+        resultados[f'aquisicao_async_{N_FONTES}_fontes_perdidas_{taxa}hz'] = medida['perdidas']
+    return resultados
+
+
+def main():
+    print(f"{N_FONTES} fontes simultâneas")
+    print(f"{'taxa (Hz)':>10} {'recebidos/s':>12} {'% esperado':>11} {'perdidas':>9} {'CPU (%)':>8}")
+    for taxa in TAXAS:
+        m = medir(taxa)
+        print(f"{taxa:>10} {m['recebidos_por_s']:>12.0f} {100 * m['fracao_esperada']:>11.1f} "
+              f"{m['perdidas']:>9} {m['cpu_pct']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""CPU dos filtros de ``siriusgraph.filtros`` ao vivo, com amostras chegando a 10 kHz.
+
+Cada filtro recebe 10 s de um sinal de ignição sintético (degrau com ruído e
+picos isolados) em blocos de 100 amostras, como a aquisição entregaria com
+leituras a cada 10 ms. O tempo de CPU é dado em % de um núcleo. Também confere
+que o resultado em blocos é idêntico ao do sinal inteiro de uma vez.
+
+Uso: python benchmarks/bench_filtros.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from siriusgraph import filtros
+
+TAXA = 10000
+DURACAO = 10.0
+BLOCO = 100
+
+
+def sinal_sintetico(taxa=TAXA, duracao=DURACAO):
+    rng = np.random.default_rng(0)
+    t = np.arange(int(taxa * duracao)) / taxa
+    forca = np.where(t > 2.0, 200.0 * (1.0 - np.exp(-(t - 2.0) / 0.02)), 0.0) + rng.normal(0, 1.5, len(t))
+    forca[rng.integers(0, len(t), 100)] += rng.choice([-80.0, 80.0], 100)
+    return forca
+
+
+def criar_filtros():
+    candidatos = {
+        'media': lambda: filtros.FiltroMediaMovel(10),
+        'exponencial': lambda: filtros.FiltroExponencial(0.94),
+        'savgol': lambda: filtros.FiltroSavitzkyGolay(21, 3),
+        'mediana': lambda: filtros.FiltroMediana(7),
+        'butterworth': lambda: filtros.FiltroButterworth(200, TAXA),
+        'mediana_butterworth': lambda: filtros.CadeiaFiltros(filtros.FiltroMediana(7),
+                                                             filtros.FiltroButterworth(200, TAXA)),
+    }
+    criados = {}
+    for nome, criar in candidatos.items():
+        try:
+            criados[nome] = criar()
+        except ImportError:
+            pass  # Butterworth sem o SciPy
+    return criados
+
+
+def medir(filtro, forca, repeticoes=5):
+    # A menor de algumas passadas: a medida não fica à mercê de outro processo na máquina
+    cpu = float('inf')
+    for _ in range(repeticoes):
+        filtro.reiniciar()
+        inicio = time.process_time()
+        saida = [filtro.filtrar(forca[i:i + BLOCO]) for i in range(0, len(forca), BLOCO)]
+        cpu = min(cpu, time.process_time() - inicio)
+    filtro.reiniciar()
+    identico = np.array_equal(np.concatenate(saida), filtro.filtrar(forca))
+    return 100.0 * cpu / (len(forca) / TAXA), identico
+
+
+def executar():
+    forca = sinal_sintetico()
+    resultados = {}
+    for nome, filtro in criar_filtros().items():
+        cpu, _ = medir(filtro, forca)
+        resultados[f'filtro_{nome}_cpu_pct_10khz'] = cpu
+    return resultados
+
+
+def main():
+    forca = sinal_sintetico()
+    print(f"{'filtro':>20} {'CPU (% núcleo)':>15} {'blocos = inteiro':>17}")
+    for nome, filtro in criar_filtros().items():
+        cpu, identico = medir(filtro, forca)
+        print(f"{nome:>20} {cpu:>15.2f} {'sim' if identico else 'NÃO':>17}")
+
+
+if __name__ == "__main__":
+    main()
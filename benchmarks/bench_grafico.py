@@ -0,0 +1,80 @@
+"""Compara o gerar_imagem_grafico antigo com o GraficoOverlay incremental.
+
+Uso: python benchmarks/bench_grafico.py
+"""
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from siriusgraph.grafico import GraficoOverlay
+
+LARGURA, ALTURA = 1280, 720
+TAMANHOS = (1_000, 10_000, 100_000)
+
+
+# Versão antiga (uma figura nova por quadro), mantida aqui só como referência.
+# tostring_rgb saiu do Matplotlib 3.10, então a conversão usa buffer_rgba + cópia.
+def gerar_imagem_grafico(df, largura, altura):
+    fig, ax = plt.subplots(figsize=(largura / 100, altura / 100), dpi=100)
+    ax.plot(df['tempo'], df['forca'], color='purple', label='Força (N)')
+    ax.set_title('Força vs. Tempo')
+    ax.set_xlabel('Tempo (s)')
+    ax.set_ylabel('Força (N)')
+    ax.grid(True)
+    ax.set_ylim(0, df['forca'].max() * 1.2)
+    ax.set_facecolor((0, 0, 0, 0))
+    fig.patch.set_alpha(0)
+    canvas = FigureCanvas(fig)
+    canvas.draw()
+    img = np.asarray(canvas.buffer_rgba())[:, :, :3].copy()
+    plt.close(fig)
+    return img
+
+
+def curva_sintetica(n, taxa=80.0):
+    tempo = np.arange(n) / taxa
+    forca = 100 * np.exp(-((tempo - tempo[-1] / 3) / (tempo[-1] / 6 + 1e-9)) ** 2)
+    forca += np.random.default_rng(0).normal(0, 1, n)
+    return tempo, forca
+
+
+def medir_fps(funcao, repeticoes):
+    funcao()  # Aquecimento
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return repeticoes / (time.perf_counter() - inicio)
+
+
+def executar(repeticoes=20):
+    resultados = {}
+    for n in TAMANHOS:
+        tempo, forca = curva_sintetica(n)
+        df = pd.DataFrame({'tempo': tempo, 'forca': forca})
+        grafico = GraficoOverlay(LARGURA, ALTURA)
+        resultados[f'grafico_antigo_fps_{n}'] = medir_fps(
+            lambda: gerar_imagem_grafico(df, LARGURA, ALTURA), max(2, repeticoes // 4))
+        resultados[f'grafico_overlay_fps_{n}'] = medir_fps(
+            lambda: grafico.atualizar(tempo, forca), repeticoes)
+    return resultados
+
+
+def main():
+    resultados = executar()
+    print(f"{'amostras':>10} {'antigo (FPS)':>14} {'overlay (FPS)':>14} {'ganho':>8}")
+    for n in TAMANHOS:
+        antigo = resultados[f'grafico_antigo_fps_{n}']
+        novo = resultados[f'grafico_overlay_fps_{n}']
+        print(f"{n:>10} {antigo:>14.1f} {novo:>14.1f} {novo / antigo:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Custo por quadro das leituras sobre o vídeo: 8 × cv2.putText vs. HudLeituras.
+
+Os valores seguem uma corrida típica a 30 quadros/s: o tempo muda a cada
+quadro, a força com ruído, e os impulsos devagar. O ``HudLeituras`` também
+desenha "ç", o que as fontes Hershey do ``putText`` não fazem.
+
+Uso: python benchmarks/bench_hud.py
+"""
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from siriusgraph.hud import HudLeituras
+
+RESOLUCOES = {'720p': (1280, 720), '1080p': (1920, 1080)}
+N_QUADROS = 2000
+
+
+def leituras(n=N_QUADROS):
+    rng = np.random.default_rng(0)
+    tempo = np.arange(n) / 30.0
+    forca = 50.0 + rng.normal(0, 0.5, n)
+    impulso = np.cumsum(forca) / 30.0
+    return np.column_stack((tempo, forca, forca / 30.0, impulso)).tolist()
+
+
+# Versão antiga, como estava em compor_quadro
+def desenhar_antigo(frame, valores):
+    tempo, forca, impulso, impulso_total = valores
+    cv2.putText(frame, "Tempo", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
+    cv2.putText(frame, "{:.2f} s".format(tempo), (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2, cv2.LINE_AA)
+    cv2.putText(frame, "Força", (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
+    cv2.putText(frame, "{:.2f} N".format(forca), (10, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2, cv2.LINE_AA)
+    cv2.putText(frame, "Impulso", (10, 130), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
+    cv2.putText(frame, "{:.2f} N.s".format(impulso), (10, 150), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2, cv2.LINE_AA)
+    cv2.putText(frame, "Impulso Total", (10, 180), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
+    cv2.putText(frame, "{:.2f} N.s".format(impulso_total), (10, 200), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2, cv2.LINE_AA)
+
+
+def medir_ms(funcao, frame, valores):
+    inicio = time.perf_counter()
+    for v in valores:
+        funcao(frame, v)
+    return 1e3 * (time.perf_counter() - inicio) / len(valores)
+
+
+def executar():
+    valores = leituras()
+    resultados = {}
+    for nome, (largura, altura) in RESOLUCOES.items():
+        frame = np.full((altura, largura, 3), 90, dtype=np.uint8)
+        hud = HudLeituras()
+        resultados[f'hud_puttext_ms_{nome}'] = medir_ms(desenhar_antigo, frame, valores)
+        resultados[f'hud_cache_ms_{nome}'] = medir_ms(hud.aplicar, frame, valores)
+    return resultados
+
+
+def main():
+    resultados = executar()
+    print(f"{'resolução':>10} {'putText (ms)':>13} {'HUD (ms)':>9}")
+    for nome in RESOLUCOES:
+        print(f"{nome:>10} {resultados[f'hud_puttext_ms_{nome}']:>13.3f} {resultados[f'hud_cache_ms_{nome}']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
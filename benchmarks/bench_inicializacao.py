@@ -0,0 +1,88 @@
+"""Tempo de inicialização da interface: importações e primeira janela.
+
+Cada medida roda em um processo Python novo, para contar o custo real de
+importar os módulos (e não o do cache de ``sys.modules``). A primeira janela só
+é medida se houver display disponível para o Tkinter.
+
+Uso: python benchmarks/bench_inicializacao.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT_GUI = os.path.join(RAIZ, 'bancada sirius v1.1.1.py')
+
+# Módulos que a interface usava (ou usa) e quanto custa importar cada um sozinho
+MODULOS = ('tkinter', 'serial', 'PIL.ImageTk', 'numpy', 'cv2', 'pandas', 'matplotlib.figure', 'sklearn.linear_model')
+
+_CARREGAR_GUI = f"""
+import importlib.util, sys
+sys.path.insert(0, {RAIZ!r})
+spec = importlib.util.spec_from_file_location('bancada', {SCRIPT_GUI!r})
+gui = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(gui)
+"""
+
+_MEDIR_IMPORTACAO = """
+import json, time
+inicio = time.perf_counter()
+{codigo}
+print(json.dumps({{'ms': (time.perf_counter() - inicio) * 1000}}))
+"""
+
+_MEDIR_JANELA = """
+import json, time
+inicio = time.perf_counter()
+{carregar}
+importado = time.perf_counter()
+root = gui.tk.Tk()
+app = gui.CalibrationApp(root)
+root.update()
+janela = time.perf_counter()
+root.destroy()
+print(json.dumps({{'importacao_ms': (importado - inicio) * 1000, 'janela_ms': (janela - inicio) * 1000}}))
+"""
+
+
+def _rodar(codigo):
+    # Processo novo a cada medida; None se o código falhar (módulo ausente, sem display...)
+    resultado = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, cwd=RAIZ)
+    if resultado.returncode != 0:
+        return None
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+
+def medir_importacao(codigo, repeticoes):
+    tempos = [_rodar(_MEDIR_IMPORTACAO.format(codigo=codigo)) for _ in range(repeticoes)]
+    tempos = [t['ms'] for t in tempos if t is not None]
+    return min(tempos) if tempos else None
+
+
+def medir_primeira_janela(repeticoes):
+    medidas = [_rodar(_MEDIR_JANELA.format(carregar=_CARREGAR_GUI)) for _ in range(repeticoes)]
+    medidas = [m for m in medidas if m is not None]
+    if not medidas:
+        return None
+    return min(m['janela_ms'] for m in medidas)
+
+
+def executar(repeticoes=5):
+    resultados = {}
+    for modulo in MODULOS:
+        resultados[f"import_{modulo.replace('.', '_')}_ms"] = medir_importacao(f"import {modulo}", repeticoes)
+    resultados['inicializacao_import_gui_ms'] = medir_importacao(_CARREGAR_GUI, repeticoes)
+    resultados['inicializacao_primeira_janela_ms'] = medir_primeira_janela(repeticoes)
+    return resultados
+
+
+def main():
+    resultados = executar()
+    print(f"{'medida':<40} {'ms':>10}")
+    for nome, valor in resultados.items():
+        print(f"{nome:<40} {'indisponível' if valor is None else f'{valor:10.1f}':>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Custo da ``Instrumentacao`` no laço de vídeo: por medida e por quadro.
+
+A composição de um quadro 720p é imitada com as mesmas etapas medidas na
+interface (dados, gráfico, mistura, HUD, marca d'água), cada uma com trabalho
+real do OpenCV. O laço roda sem instrumentação, com ``DESLIGADA`` e com uma
+``Instrumentacao`` ligada (com rastro), e a sobrecarga é dada em % do tempo do
+quadro. O custo de uma medida isolada também é medido.
+
+Uso: python benchmarks/bench_instrumentacao.py
+"""
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from siriusgraph.instrumentacao import DESLIGADA, Instrumentacao
+
+N_QUADROS = 300
+N_MEDIDAS = 200000
+ETAPAS = ('dados', 'grafico', 'mistura', 'hud', 'marca_dagua')
+
+
+def compor(instrumentacao, frame, grafico, saida):
+    with instrumentacao.etapa('dados'):
+        np.cumsum(frame[0, :, 0])
+    instrumentacao.contar('amostras', 1)
+    with instrumentacao.etapa('grafico'):
+        cv2.cvtColor(grafico, cv2.COLOR_RGBA2BGR, dst=saida)
+    with instrumentacao.etapa('mistura'):
+        cv2.addWeighted(frame, 0.7, saida, 0.3, 0, dst=saida)
+    with instrumentacao.etapa('hud'):
+        cv2.putText(saida, "12.34 N", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    with instrumentacao.etapa('marca_dagua'):
+        saida[-100:, -200:] //= 2
+
+
+def compor_sem(frame, grafico, saida):
+    np.cumsum(frame[0, :, 0])
+    cv2.cvtColor(grafico, cv2.COLOR_RGBA2BGR, dst=saida)
+    cv2.addWeighted(frame, 0.7, saida, 0.3, 0, dst=saida)
+    cv2.putText(saida, "12.34 N", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    saida[-100:, -200:] //= 2
+
+
+def medir_laco(funcao, *argumentos):
+    inicio = time.perf_counter()
+    for _ in range(N_QUADROS):
+        funcao(*argumentos)
+    return 1e3 * (time.perf_counter() - inicio) / N_QUADROS
+
+
+def custo_medida_us(instrumentacao, trechos=10):
+    # Menor custo entre alguns trechos, para descontar momentos em que a máquina está ocupada
+    cronometro = instrumentacao.etapa
+    por_trecho = N_MEDIDAS // trechos
+    melhor = float('inf')
+    for _ in range(trechos):
+        inicio = time.perf_counter()
+        for _ in range(por_trecho):
+            with cronometro('x'):
+                pass
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return 1e6 * melhor / por_trecho
+
+
+def sobrecarga_medida():
+    """Tempo do quadro (ms) sem instrumentação, com ``DESLIGADA`` e ligada.
+
+    A diferença entre os três fica dentro do ruído da máquina, por isso não
+    entra nos resultados comparados com a referência.
+    """
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+    grafico = rng.integers(0, 256, (720, 1280, 4), dtype=np.uint8)
+    saida = np.empty_like(frame)
+    compor_sem(frame, grafico, saida)  # Aquecimento
+
+    # Alternados, para que variações da máquina afetem os três por igual
+    tempos = {'sem': [], 'desligada': [], 'ligada': []}
+    for _ in range(5):
+        tempos['sem'].append(medir_laco(compor_sem, frame, grafico, saida))
+        tempos['desligada'].append(medir_laco(compor, DESLIGADA, frame, grafico, saida))
+        tempos['ligada'].append(medir_laco(compor, Instrumentacao(), frame, grafico, saida))
+    return {nome: min(valores) for nome, valores in tempos.items()}
+
+
+def executar():
+    ms = sobrecarga_medida()
+    por_medida = custo_medida_us(Instrumentacao())
+    return {
+        'instrumentacao_quadro_ms': ms['sem'],
+        'instrumentacao_medida_us': por_medida,
+        'instrumentacao_desligada_medida_us': custo_medida_us(DESLIGADA),
+        # Custo calculado das medidas de um quadro em relação ao quadro inteiro
+        'instrumentacao_ligada_calculada_pct': 100.0 * (len(ETAPAS) + 1) * por_medida / (1e3 * ms['sem']),
+    }
+
+
+def main():
+    resultados = executar()
+    ms = sobrecarga_medida()
+    print(f"quadro sem instrumentação: {resultados['instrumentacao_quadro_ms']:.3f} ms")
+    print(f"custo por medida: ligada {resultados['instrumentacao_medida_us']:.2f} µs, "
+          f"desligada {resultados['instrumentacao_desligada_medida_us']:.2f} µs")
+    print(f"sobrecarga medida no quadro: ligada {100 * (ms['ligada'] / ms['sem'] - 1):+.2f} %, "
+          f"desligada {100 * (ms['desligada'] / ms['sem'] - 1):+.2f} %")
+    print(f"sobrecarga calculada (medidas × custo): {resultados['instrumentacao_ligada_calculada_pct']:.3f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Leitura dos arquivos de dados e cálculo do impulso, com pico de memória.
+
+O arquivo de texto é o ``bin/dados.txt`` repetido (com o tempo continuando a
+crescer) até ``N_LINHAS`` linhas, e é lido de três formas: ``ler_dados_arquivo``
+(pandas), ``SeguidorArquivo`` (acompanhamento ao vivo) e o mesmo conteúdo em
+``.srun``. O impulso é integrado sobre 1e3 a 1e7 amostras sintéticas. O pico
+de memória vem do ``tracemalloc``, que também conta os arrays do NumPy, em uma
+chamada à parte; os tempos são o melhor de várias chamadas sem ele.
+
+Uso: python benchmarks/bench_leitura.py
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from siriusgraph.formato import abrir_corrida, texto_para_binario
+from siriusgraph.impulso import impulso_acumulado
+from siriusgraph.leitura import SeguidorArquivo, ler_dados_arquivo
+
+DADOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bin', 'dados.txt')
+N_LINHAS = 100_000
+TAMANHOS_IMPULSO = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7)
+
+
+def arquivo_repetido(caminho, n_linhas=N_LINHAS):
+    # As linhas do bin/dados.txt, em sequência, com o tempo deslocado a cada repetição
+    originais = np.loadtxt(DADOS, ndmin=2)
+    repeticoes = -(-n_linhas // len(originais))
+    deslocamento = originais[-1, 0] - originais[0, 0] + 1.0
+    tempo = (originais[:, 0][None, :] + deslocamento * np.arange(repeticoes)[:, None]).ravel()[:n_linhas]
+    forca = np.tile(originais[:, 1], repeticoes)[:n_linhas]
+    np.savetxt(caminho, np.column_stack((tempo, forca)), fmt='%.6g')
+    return caminho
+
+
+def medir(funcao, minimo=0.3, repeticoes=3):
+    """(segundos da chamada mais rápida, pico de memória em MiB).
+
+    Repete ``funcao`` ao menos ``repeticoes`` vezes e até somar ``minimo``
+    segundos, para que as chamadas curtas não fiquem só com o ruído do relógio.
+    """
+    melhor, total, feitas = float('inf'), 0.0, 0
+    while feitas < repeticoes or total < minimo:
+        inicio = time.perf_counter()
+        funcao()
+        decorrido = time.perf_counter() - inicio
+        melhor, total, feitas = min(melhor, decorrido), total + decorrido, feitas + 1
+    tracemalloc.start()
+    funcao()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return melhor, pico / 2 ** 20
+
+
+def ler_seguidor(caminho):
+    seguidor = SeguidorArquivo(caminho, formato='bancada')
+    seguidor.ler_novos(ate_o_fim=True)
+    return seguidor.buffer
+
+
+def ler_srun(caminho):
+    corrida = abrir_corrida(caminho)
+    return float(np.asarray(corrida['forca']).sum())  # Força a leitura das páginas mapeadas
+
+
+def executar():
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        texto = arquivo_repetido(os.path.join(pasta, 'dados.txt'))
+        binario = os.path.join(pasta, 'dados.srun')
+        texto_para_binario(texto, binario, formato='bancada')
+
+        leitores = {
+            'pandas': lambda: ler_dados_arquivo(texto),
+            'seguidor': lambda: ler_seguidor(texto),
+            'srun': lambda: ler_srun(binario),
+        }
+        for nome, funcao in leitores.items():
+            decorrido, pico = medir(funcao)
+            resultados[f'leitura_{nome}_linhas_por_s'] = N_LINHAS / decorrido
+            resultados[f'leitura_{nome}_memoria_mib'] = pico
+
+    rng = np.random.default_rng(0)
+    for n in TAMANHOS_IMPULSO:
+        tempo = np.arange(n) / 1000.0
+        forca = 100.0 + rng.normal(0, 1, n)
+        expoente = int(round(np.log10(n)))
+        for metodo in ('trapezio', 'simpson'):
+            decorrido, pico = medir(lambda: impulso_acumulado(tempo, forca, metodo))
+            resultados[f'impulso_{metodo}_ms_1e{expoente}'] = 1e3 * decorrido
+            resultados[f'impulso_{metodo}_memoria_mib_1e{expoente}'] = pico
+    return resultados
+
+
+def main():
+    resultados = executar()
+    print(f"{'leitura':>10} {'linhas/s':>12} {'pico (MiB)':>11}")
+    for nome in ('pandas', 'seguidor', 'srun'):
+        print(f"{nome:>10} {resultados[f'leitura_{nome}_linhas_por_s']:>12.0f} "
+              f"{resultados[f'leitura_{nome}_memoria_mib']:>11.1f}")
+    print(f"\n{'amostras':>10} {'trapézio (ms)':>14} {'Simpson (ms)':>13} {'pico (MiB)':>11}")
+    for n in TAMANHOS_IMPULSO:
+        chave = f'1e{int(round(np.log10(n)))}'
+        print(f"{n:>10} {resultados[f'impulso_trapezio_ms_{chave}']:>14.3f} "
+              f"{resultados[f'impulso_simpson_ms_{chave}']:>13.3f} "
+              f"{resultados[f'impulso_simpson_memoria_mib_{chave}']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
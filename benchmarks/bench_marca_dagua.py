@@ -0,0 +1,70 @@
+"""Custo por quadro da marca d'água: laço por canal em float64 vs. MarcaDagua.
+
+Uso: python benchmarks/bench_marca_dagua.py
+"""
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from siriusgraph.composicao import MarcaDagua
+
+RESOLUCOES = {'720p': (1280, 720), '1080p': (1920, 1080)}
+
+
+def marca_dagua_sintetica(largura=2000, altura=1200):
+    rng = np.random.default_rng(0)
+    imagem = rng.integers(0, 256, (altura, largura, 4), dtype=np.uint8)
+    imagem[:, :, 3] = np.linspace(0, 255, largura, dtype=np.uint8)  # Gradiente de transparência
+    return imagem
+
+
+# Versão antiga, como estava em mostrar_webcam_com_grafico
+def aplicar_antigo(combined_frame, marca_dagua):
+    nova_altura, nova_largura = marca_dagua.shape[:2]
+    altura, largura = combined_frame.shape[:2]
+    y_offset = altura - nova_altura - 3
+    x_offset = largura - nova_largura - 3
+    alpha_channel = marca_dagua[:, :, 3] / 255.0
+    marca_dagua_rgb = marca_dagua[:, :, :3]
+    for c in range(0, 3):
+        combined_frame[y_offset:y_offset+nova_altura, x_offset:x_offset+nova_largura, c] = \
+            (1. - alpha_channel) * combined_frame[y_offset:y_offset+nova_altura, x_offset:x_offset+nova_largura, c] + \
+            alpha_channel * marca_dagua_rgb[:, :, c]
+    return combined_frame
+
+
+def medir_ms(funcao, repeticoes):
+    funcao()
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1e3
+
+
+def executar(repeticoes=200):
+    original = marca_dagua_sintetica()
+    marca = MarcaDagua(original)
+    redimensionada = cv2.resize(original, (marca.largura, marca.altura), interpolation=cv2.INTER_AREA)
+    resultados = {}
+    for nome, (largura, altura) in RESOLUCOES.items():
+        frame = np.random.default_rng(1).integers(0, 256, (altura, largura, 3), dtype=np.uint8)
+        resultados[f'marca_dagua_antigo_ms_{nome}'] = medir_ms(lambda: aplicar_antigo(frame, redimensionada), repeticoes)
+        resultados[f'marca_dagua_novo_ms_{nome}'] = medir_ms(lambda: marca.aplicar(frame), repeticoes)
+    return resultados
+
+
+def main():
+    resultados = executar()
+    print(f"{'resolução':>10} {'antigo (ms)':>12} {'novo (ms)':>10} {'ganho':>8}")
+    for nome in RESOLUCOES:
+        antigo = resultados[f'marca_dagua_antigo_ms_{nome}']
+        novo = resultados[f'marca_dagua_novo_ms_{nome}']
+        print(f"{nome:>10} {antigo:>12.3f} {novo:>10.3f} {antigo / novo:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Vazão do interpretador de quadros: readline + split por linha vs. ProtocoloSerial.
+
+Os quadros são entregues em blocos de 4 KiB, como chegam de ``read(in_waiting)``,
+com 1% deles corrompidos pelo ``SimuladorSerial``. A versão antiga é medida já
+com as linhas separadas em memória, sem o custo do ``readline()`` do pyserial
+(que lê byte a byte); o ganho de ponta a ponta aparece em ``bench_simulador.py``.
+Quadros com lixo antes do ``<`` são recuperados pelo ``ProtocoloSerial``, por
+isso ele pode aceitar mais quadros que os intactos.
+
+Uso: python benchmarks/bench_protocolo.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from siriusgraph.protocolo import ProtocoloSerial
+from siriusgraph.simulador import SimuladorSerial, curva_motor
+
+TAMANHO_BLOCO = 4096
+
+
+def gerar_fluxo(n_quadros, corrupcao=0.01):
+    # Usa a formatação e a corrupção do simulador, sem abrir transporte nenhum
+    simulador = SimuladorSerial.__new__(SimuladorSerial)
+    simulador.forca = curva_motor()
+    simulador._escala_inicial = simulador.escala = 1.0
+    simulador.ruido, simulador.corrupcao, simulador.casas_tempo = 0.1, corrupcao, 3
+    simulador._aleatorio = np.random.default_rng(0)
+    simulador.quadros_enviados = simulador.quadros_corrompidos = simulador.bytes_enviados = 0
+    dados = simulador._quadros(np.arange(n_quadros) * 0.0125)
+    return dados, n_quadros - simulador.quadros_corrompidos  # Quadros intactos
+
+
+def blocos(dados):
+    return [dados[i:i + TAMANHO_BLOCO] for i in range(0, len(dados), TAMANHO_BLOCO)]
+
+
+# Interpretação antiga: uma linha por vez, exceção a cada linha ruim
+def interpretar_antigo(partes):
+    resto, tempos, forcas = b'', [], []
+    for parte in partes:
+        linhas = (resto + parte).split(b'\n')
+        resto = linhas.pop()
+        for linha in linhas:
+            try:
+                campos = linha.decode('ascii').strip().strip('<>').split(',')
+                if int(campos[0]) == 1:
+                    tempos.append(float(campos[1]))
+                    forcas.append(float(campos[2]))
+            except (UnicodeDecodeError, ValueError, IndexError):
+                pass
+    return len(tempos)
+
+
+def interpretar_novo(partes):
+    protocolo = ProtocoloSerial()
+    total = 0
+    for parte in partes:
+        tempos, _ = protocolo.alimentar(parte)
+        total += len(tempos)
+    return total
+
+
+def medir(funcao, partes, repeticoes):
+    funcao(partes)
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        quadros = funcao(partes)
+    return quadros, quadros * repeticoes / (time.perf_counter() - inicio)
+
+
+def executar(n_quadros=200_000, repeticoes=3):
+    dados, intactos = gerar_fluxo(n_quadros)
+    partes = blocos(dados)
+    antigos, vazao_antiga = medir(interpretar_antigo, partes, repeticoes)
+    novos, vazao_nova = medir(interpretar_novo, partes, repeticoes)
+    return {
+        'protocolo_antigo_quadros_por_s': vazao_antiga,
+        'protocolo_novo_quadros_por_s': vazao_nova,
+        'protocolo_antigo_quadros_aceitos': antigos,
+        'protocolo_novo_quadros_aceitos': novos,
+        'protocolo_quadros_intactos': intactos,
+    }
+
+
+def main():
+    r = executar()
+    print(f"{r['protocolo_quadros_intactos']} quadros intactos")
+    print(f"readline + split: {r['protocolo_antigo_quadros_por_s']:>12,.0f} quadros/s "
+          f"({r['protocolo_antigo_quadros_aceitos']} aceitos)")
+    print(f"ProtocoloSerial:  {r['protocolo_novo_quadros_por_s']:>12,.0f} quadros/s "
+          f"({r['protocolo_novo_quadros_aceitos']} aceitos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Custo da sobreposição ao vivo contra o vídeo limpo, e vazão da renderização posterior.
+
+Uma corrida sintética (10 s a 1 kHz, vídeo limpo 720p em MJPG a 30 fps, com o
+índice do ``GravadorSincronizado``) é gerada em uma pasta temporária. Mede-se
+a composição completa de um quadro (gráfico, leituras e marca d'água), que é o
+que sai do laço ao vivo no modo de vídeo limpo, o que fica nele (leituras em
+uma cópia para a tela) e quantos quadros por segundo ``renderizar`` produz com
+um processo e com todos os núcleos.
+
+Uso: python benchmarks/bench_renderizacao.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from siriusgraph.composicao import MarcaDagua
+from siriusgraph.formato import EscritorCorrida
+from siriusgraph.hud import HudLeituras
+from siriusgraph.renderizacao import CompositorSobreposicao, amostras_exibidas, carregar_dados, renderizar
+from siriusgraph.sincronizacao import GravadorSincronizado, RelogioDispositivo, carregar_indice
+from siriusgraph.video import abrir_escritor
+
+TAMANHO = (1280, 720)
+FPS = 30.0
+TAXA = 1000
+DURACAO = 10.0
+
+
+def corrida_sintetica(pasta):
+    """Grava ``calibration_data.srun``, o vídeo limpo e o índice em ``pasta``; devolve os caminhos."""
+    rng = np.random.default_rng(0)
+    tempo = 3.0 + np.arange(int(TAXA * DURACAO)) / TAXA  # O relógio do ESP32 não começa em zero
+    forca = np.where(tempo > 5.0, 200.0 * (1.0 - np.exp(-(tempo - 5.0) / 0.05)), 0.0) + rng.normal(0, 1, len(tempo))
+    dados = os.path.join(pasta, 'calibration_data.srun')
+    with EscritorCorrida(dados) as escritor:
+        zeros = np.zeros_like(tempo)
+        escritor.escrever(tempo=tempo, forca=forca, impulso=zeros, impulso_total=zeros)
+
+    relogio = RelogioDispositivo()
+    deslocamento = 1000.0
+    for t in tempo[::50]:
+        relogio.registrar(t, t + deslocamento)
+    escritor = abrir_escritor(os.path.join(pasta, 'calibration_video'), FPS, TAMANHO, 'mjpg')
+    indice = os.path.join(pasta, 'calibration_video_indice.csv')
+    gravador = GravadorSincronizado(escritor, FPS, indice, relogio)
+    largura, altura = TAMANHO
+    x = np.linspace(0, 255, largura, dtype=np.float32)
+    for k in range(int(DURACAO * FPS)):
+        base = np.broadcast_to((x + 4 * k) % 256, (altura, largura))
+        imagem = np.stack([base, base[::-1], np.full_like(base, 128)], axis=2).astype(np.uint8)
+        gravador.escrever(imagem, tempo[0] + deslocamento + (k + 0.5) / FPS, k)
+    gravador.fechar()
+    escritor.release()
+    return escritor.caminho, indice, dados
+
+
+def custo_por_quadro(video, indice, dados, repeticoes=3, n_imagens=30):
+    """(ms da composição completa, ms das leituras na cópia para a tela), o melhor de algumas passadas.
+
+    Só as primeiras ``n_imagens`` do vídeo ficam decodificadas na memória e são
+    reaproveitadas em ciclo; os dados seguem os quadros da corrida inteira.
+    """
+    amostras = carregar_dados(dados)
+    n = amostras_exibidas(carregar_indice(indice), amostras['tempo'])
+    captura = cv2.VideoCapture(video)
+    quadros = []
+    ok, frame = captura.read()
+    while ok and len(quadros) < n_imagens:
+        quadros.append(frame)
+        ok, frame = captura.read()
+    captura.release()
+    marca = MarcaDagua(np.full((200, 400, 4), 200, dtype=np.uint8))
+
+    completa = limpa = float('inf')
+    for _ in range(repeticoes):
+        compositor = CompositorSobreposicao(amostras, *TAMANHO, marca_dagua=marca)
+        inicio = time.perf_counter()
+        for j, k in enumerate(n):
+            compositor.compor(quadros[j % len(quadros)], k)
+        completa = min(completa, (time.perf_counter() - inicio) / len(n))
+
+        hud = HudLeituras()
+        inicio = time.perf_counter()
+        for j, k in enumerate(n):
+            i = max(k - 1, 0)
+            hud.aplicar(quadros[j % len(quadros)].copy(), (amostras['tempo'][i], amostras['forca'][i],
+                                                          amostras['impulso'][i], amostras['impulso_total'][i]))
+        limpa = min(limpa, (time.perf_counter() - inicio) / len(n))
+    return 1e3 * completa, 1e3 * limpa
+
+
+def vazao(video, indice, dados, pasta, processos):
+    resumo = renderizar(video, indice, dados, os.path.join(pasta, f'sobreposto_{processos}'), codec='mjpg',
+                        processos=processos)
+    return resumo['quadros'] / resumo['segundos']
+
+
+def executar():
+    with tempfile.TemporaryDirectory() as pasta:
+        video, indice, dados = corrida_sintetica(pasta)
+        completa, limpa = custo_por_quadro(video, indice, dados)
+        nucleos = os.cpu_count() or 1
+        resultados = {
+            'renderizacao_composicao_completa_ms': completa,
+            'renderizacao_exibicao_limpa_ms': limpa,
+            'renderizacao_1_processo_fps': vazao(video, indice, dados, pasta, 1),
+        }
+        if nucleos > 1:
+            resultados['renderizacao_paralela_fps'] = vazao(video, indice, dados, pasta, nucleos)
+    return resultados
+
+
+def main():
+    resultados = executar()
+    print(f"composição completa por quadro (sai do laço ao vivo): "
+          f"{resultados['renderizacao_composicao_completa_ms']:.2f} ms")
+    print(f"leituras na cópia para a tela (fica no laço ao vivo): "
+          f"{resultados['renderizacao_exibicao_limpa_ms']:.2f} ms")
+    print(f"renderização posterior, 1 processo: {resultados['renderizacao_1_processo_fps']:.1f} quadros/s")
+    if 'renderizacao_paralela_fps' in resultados:
+        print(f"renderização posterior, {os.cpu_count()} processos: "
+              f"{resultados['renderizacao_paralela_fps']:.1f} quadros/s")
+
+
+if __name__ == "__main__":
+    main()
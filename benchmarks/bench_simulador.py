@@ -0,0 +1,63 @@
+"""Taxa máxima de amostragem que a aquisição acompanha, com o ESP32 simulado.
+
+Para cada taxa, o simulador envia quadros por ``duracao`` segundos e a
+``AquisicaoSerial`` os lê pela porta virtual. A taxa é sustentável se chegam
+pelo menos 99% dos quadros enviados sem amostras perdidas.
+
+Uso: python benchmarks/bench_simulador.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from siriusgraph.aquisicao import AquisicaoSerial
+from siriusgraph.simulador import TRANSPORTE_PTY, TRANSPORTE_SOCKET, SimuladorSerial
+
+TAXAS = (80, 500, 1000, 2000, 5000, 10000, 20000)
+TRANSPORTE = TRANSPORTE_PTY if os.name == 'posix' else TRANSPORTE_SOCKET
+
+
+def medir_taxa(taxa, duracao=1.0, corrupcao=0.0):
+    simulador = SimuladorSerial(taxa=taxa, transporte=TRANSPORTE, ruido=0.1, corrupcao=corrupcao,
+                                semente=0).iniciar()
+    aquisicao = AquisicaoSerial(simulador.url).iniciar()
+    time.sleep(duracao)
+    simulador.parar()
+    time.sleep(0.2)  # Deixa a aquisição esvaziar o que ainda está em trânsito
+    aquisicao.parar()
+    enviados = simulador.quadros_enviados - simulador.quadros_corrompidos
+    return {
+        'enviados': enviados,
+        'recebidos': aquisicao.quadros_validos,
+        'invalidos': aquisicao.quadros_invalidos,
+        'perdidas': aquisicao.amostras_perdidas,
+        'atraso_maximo_ms': simulador.atraso_maximo * 1e3,
+    }
+
+
+def executar(duracao=1.0):
+    resultados = {}
+    sustentavel = 0
+    for taxa in TAXAS:
+        medida = medir_taxa(taxa, duracao)
+        resultados[f'aquisicao_recebidos_por_s_{taxa}hz'] = medida['recebidos'] / duracao
+        if medida['enviados'] and medida['recebidos'] >= 0.99 * medida['enviados'] and not medida['perdidas']:
+            sustentavel = taxa
+    resultados['aquisicao_taxa_maxima_sustentavel_hz'] = sustentavel
+    # Com 1% de quadros corrompidos, todos devem ser contados como inválidos e nenhum válido perdido
+    medida = medir_taxa(1000, duracao, corrupcao=0.01)
+    resultados['aquisicao_invalidos_1pct_corrupcao'] = medida['invalidos']
+    return resultados
+
+
+def main():
+    print(f"{'taxa (Hz)':>10} {'enviados':>9} {'recebidos':>10} {'inválidos':>10} {'perdidas':>9} {'atraso (ms)':>12}")
+    for taxa in TAXAS:
+        m = medir_taxa(taxa)
+        print(f"{taxa:>10} {m['enviados']:>9} {m['recebidos']:>10} {m['invalidos']:>10} {m['perdidas']:>9} "
+              f"{m['atraso_maximo_ms']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Custo de codificação por quadro de cada codec disponível nesta máquina.
+
+Os quadros são 720p sintéticos (gradiente em movimento com ruído leve, para
+não comprimir de forma irreal). ``mjpg_direto`` é medido duas vezes: com
+quadros BGR (comprime em JPEG) e com JPEGs prontos, como chegam da câmera em
+captura bruta, que é o caso de custo quase nulo.
+
+Uso: python benchmarks/bench_video.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from siriusgraph.video import (CODEC_MJPG_DIRETO, CODECS_OPENCV, CODIFICADORES_FFMPEG, abrir_escritor,
+                               codificador_disponivel)
+
+TAMANHO = (1280, 720)
+N_QUADROS = 60
+
+
+def quadros_sinteticos(n=N_QUADROS, tamanho=TAMANHO):
+    largura, altura = tamanho
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, largura, dtype=np.float32)
+    quadros = []
+    for i in range(n):
+        base = np.broadcast_to((x + 4 * i) % 256, (altura, largura))
+        imagem = np.stack([base, base[::-1], np.full_like(base, 128)], axis=2)
+        imagem = imagem + rng.normal(0, 4, imagem.shape).astype(np.float32)
+        quadros.append(np.clip(imagem, 0, 255).astype(np.uint8))
+    return quadros
+
+
+def medir(codec, quadros, pasta):
+    escritor = abrir_escritor(os.path.join(pasta, f'bench_{codec}'), 30.0, TAMANHO, codec)
+    inicio = time.perf_counter()
+    for quadro in quadros:
+        escritor.write(quadro)
+    escritor.release()  # Inclui o que o FFmpeg ainda tinha para codificar
+    decorrido = time.perf_counter() - inicio
+    return {
+        'ms_por_quadro': 1e3 * decorrido / len(quadros),
+        'bytes_por_quadro': os.path.getsize(escritor.caminho) / len(quadros),
+        'codec_usado': escritor.codec,
+    }
+
+
+def codecs_disponiveis():
+    codecs = list(CODECS_OPENCV)
+    codecs += [nome for nome, codificador in CODIFICADORES_FFMPEG.items() if codificador_disponivel(codificador)]
+    return codecs + [CODEC_MJPG_DIRETO]
+
+
+def executar():
+    quadros = quadros_sinteticos()
+    jpegs = [cv2.imencode('.jpg', q)[1] for q in quadros]
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        for codec in codecs_disponiveis():
+            resultados[f'video_{codec}_ms_por_quadro'] = medir(codec, quadros, pasta)['ms_por_quadro']
+        resultados['video_mjpg_direto_jpeg_ms_por_quadro'] = medir(CODEC_MJPG_DIRETO, jpegs, pasta)['ms_por_quadro']
+    return resultados
+
+
+def main():
+    quadros = quadros_sinteticos()
+    jpegs = [cv2.imencode('.jpg', q)[1] for q in quadros]
+    print(f"{'codec':>22} {'ms/quadro':>10} {'KiB/quadro':>11}")
+    with tempfile.TemporaryDirectory() as pasta:
+        medidas = [(codec, medir(codec, quadros, pasta)) for codec in codecs_disponiveis()]
+        medidas.append(('mjpg_direto (JPEG)', medir(CODEC_MJPG_DIRETO, jpegs, pasta)))
+    for nome, m in medidas:
+        print(f"{nome:>22} {m['ms_por_quadro']:>10.2f} {m['bytes_por_quadro'] / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
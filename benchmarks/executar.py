@@ -0,0 +1,237 @@
+"""Roda os benchmarks, grava os resultados em JSON e compara com a referência.
+
+Cada ``bench_*.py`` desta pasta expõe ``executar()``, que devolve um dicionário
+``{métrica: valor}``. Aqui cada um roda em um processo Python novo (sem cache de
+importações nem memória de um benchmark anterior), e o pico de memória do
+processo entra como ``memoria_pico_mib`` onde o sistema informa. Os resultados
+ficam agrupados por benchmark: ``{'resultados': {'leitura': {...}, ...}}``.
+
+O sentido de cada métrica vem do nome: ``_ms``, ``_us``, ``_pct``, ``memoria``
+e ``perdidas`` são melhores menores; ``fps``, ``_por_s`` e ``hz`` são melhores
+maiores; as outras (ex.: quadros inválidos, que dependem do sorteio da
+corrupção) só são mostradas. Uma métrica pior que a
+referência além de ``--tolerancia`` é uma regressão, e o código de saída é 1.
+Cada benchmark roda ``--repeticoes`` vezes e fica o melhor valor de cada
+métrica, o que tira boa parte do ruído de uma máquina compartilhada.
+
+Uso:
+    python benchmarks/executar.py                      # todos, compara com baseline.json
+    python benchmarks/executar.py leitura marca_dagua  # só alguns
+    python benchmarks/executar.py --atualizar-baseline # grava a nova referência
+"""
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(PASTA, 'baseline.json')
+TOLERANCIA = 0.30
+REPETICOES = 3
+
+MENOR_MELHOR = ('_ms', '_us', '_pct', 'memoria', 'perdidas')
+MAIOR_MELHOR = ('fps', '_por_s', 'hz')
+
+
+def listar_benchmarks():
+    return sorted(nome[len('bench_'):-len('.py')] for nome in os.listdir(PASTA)
+                  if nome.startswith('bench_') and nome.endswith('.py'))
+
+
+def sentido(metrica):
+    """-1 se menor é melhor, +1 se maior é melhor, 0 se a métrica é só informativa."""
+    if any(marca in metrica for marca in MENOR_MELHOR):
+        return -1
+    if any(marca in metrica for marca in MAIOR_MELHOR):
+        return 1
+    return 0
+
+
+def _pico_memoria_mib():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em KiB no Linux e em bytes no macOS
+    return pico / 2 ** 20 if sys.platform == 'darwin' else pico / 2 ** 10
+
+
+def _executar_interno(nome, caminho_saida):
+    # Roda dentro do processo filho: importa o benchmark e grava o resultado em JSON
+    spec = importlib.util.spec_from_file_location(f'bench_{nome}', os.path.join(PASTA, f'bench_{nome}.py'))
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    resultados = modulo.executar()
+    pico = _pico_memoria_mib()
+    if pico is not None:
+        resultados['memoria_pico_mib'] = pico
+    with open(caminho_saida, 'w') as f:
+        json.dump(resultados, f)
+
+
+def rodar_benchmark(nome, timeout=1800):
+    """Resultados de ``bench_<nome>.executar()`` em um processo novo; levanta ``RuntimeError`` se falhar."""
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'resultado.json')
+        processo = subprocess.run([sys.executable, os.path.abspath(__file__), '--interno', nome, caminho],
+                                  capture_output=True, text=True, cwd=os.path.dirname(PASTA), timeout=timeout)
+        if processo.returncode != 0 or not os.path.exists(caminho):
+            erro = processo.stderr.strip().splitlines()
+            raise RuntimeError(erro[-1] if erro else f"código de saída {processo.returncode}")
+        with open(caminho) as f:
+            resultados = json.load(f)
+    # Métricas que não puderam ser medidas nesta máquina (ex.: sem display) vêm como None
+    return {metrica: valor for metrica, valor in resultados.items() if valor is not None}
+
+
+def combinar_melhores(execucoes):
+    """Melhor valor de cada métrica entre várias execuções (o último, nas informativas)."""
+    melhores = {}
+    for resultados in execucoes:
+        for metrica, valor in resultados.items():
+            direcao = sentido(metrica)
+            if metrica not in melhores or direcao == 0:
+                melhores[metrica] = valor
+            elif direcao > 0:
+                melhores[metrica] = max(melhores[metrica], valor)
+            else:
+                melhores[metrica] = min(melhores[metrica], valor)
+    return melhores
+
+
+def metadados():
+    versoes = {}
+    for modulo in ('numpy', 'cv2', 'matplotlib', 'pandas', 'scipy'):
+        try:
+            versoes[modulo] = __import__(modulo).__version__
+        except ImportError:
+            pass
+    return {
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'processador': platform.processor() or platform.machine(),
+        'nucleos': os.cpu_count(),
+        'versoes': versoes,
+    }
+
+
+def comparar(resultados, referencia, tolerancia=TOLERANCIA):
+    """Lista de (métrica, referência, atual, variação relativa, situação) das métricas da referência.
+
+    ``resultados`` e ``referencia`` são ``{benchmark: {métrica: valor}}``; só os
+    benchmarks presentes em ``resultados`` são comparados. A situação é
+    ``'regressao'``, ``'melhora'``, ``'estavel'``, ``'informativa'`` ou
+    ``'ausente'`` (estava na referência e não foi medida agora).
+    """
+    comparacao = []
+    for nome, medidas in resultados.items():
+        for metrica, antes in sorted(referencia.get(nome, {}).items()):
+            rotulo = f'{nome}: {metrica}'
+            agora = medidas.get(metrica)
+            if agora is None:
+                comparacao.append((rotulo, antes, None, None, 'ausente'))
+                continue
+            variacao = (agora - antes) / abs(antes) if antes else (0.0 if agora == antes else float('inf'))
+            direcao = sentido(metrica)
+            if direcao == 0:
+                situacao = 'informativa'
+            elif direcao * variacao < -tolerancia:
+                situacao = 'regressao'
+            elif direcao * variacao > tolerancia:
+                situacao = 'melhora'
+            else:
+                situacao = 'estavel'
+            comparacao.append((rotulo, antes, agora, variacao, situacao))
+    return comparacao
+
+
+def imprimir_comparacao(comparacao, mostrar_estaveis=False):
+    marcas = {'regressao': '!!', 'melhora': '++', 'ausente': '??', 'estavel': '  ', 'informativa': '  '}
+    for metrica, antes, agora, variacao, situacao in comparacao:
+        if situacao in ('estavel', 'informativa') and not mostrar_estaveis:
+            continue
+        if agora is None:
+            print(f"{marcas[situacao]} {metrica:<60} {antes:>12.4g} {'—':>12}")
+        else:
+            print(f"{marcas[situacao]} {metrica:<60} {antes:>12.4g} {agora:>12.4g} {100 * variacao:>+8.1f} %")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Roda os benchmarks da bancada e compara com a referência.")
+    parser.add_argument('benchmarks', nargs='*', help=f"nomes sem o prefixo bench_ (padrão: todos: "
+                                                      f"{', '.join(listar_benchmarks())})")
+    parser.add_argument('--saida', default=os.path.join(PASTA, 'resultados.json'),
+                        help="arquivo JSON com os resultados desta execução")
+    parser.add_argument('--baseline', default=BASELINE, help="arquivo JSON de referência")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA,
+                        help="piora relativa aceita antes de contar como regressão (padrão: 0.30)")
+    parser.add_argument('--atualizar-baseline', action='store_true',
+                        help="grava os resultados como a nova referência em vez de comparar")
+    parser.add_argument('--repeticoes', type=int, default=REPETICOES,
+                        help="execuções de cada benchmark; fica o melhor valor de cada métrica (padrão: 3)")
+    parser.add_argument('--todas', action='store_true', help="mostra também as métricas estáveis")
+    parser.add_argument('--interno', nargs=2, metavar=('BENCHMARK', 'SAIDA'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.interno:
+        _executar_interno(*args.interno)
+        return 0
+
+    disponiveis = listar_benchmarks()
+    nomes = args.benchmarks or disponiveis
+    desconhecidos = [nome for nome in nomes if nome not in disponiveis]
+    if desconhecidos:
+        parser.error(f"benchmark desconhecido: {', '.join(desconhecidos)}")
+
+    resultados, falhas = {}, {}
+    for nome in nomes:
+        inicio = time.perf_counter()
+        print(f"{nome}...", end=' ', flush=True)
+        try:
+            resultados[nome] = combinar_melhores(rodar_benchmark(nome) for _ in range(max(1, args.repeticoes)))
+            print(f"{time.perf_counter() - inicio:.1f} s")
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            falhas[nome] = str(e)
+            print(f"FALHOU: {e}")
+
+    documento = {'metadados': dict(metadados(), repeticoes=args.repeticoes), 'falhas': falhas,
+                 'resultados': resultados}
+    if args.atualizar_baseline:
+        if os.path.exists(args.baseline):
+            # Só os benchmarks que rodaram agora são substituídos na referência
+            with open(args.baseline) as f:
+                anteriores = json.load(f)['resultados']
+            documento['resultados'] = dict(anteriores, **resultados)
+        caminho = args.baseline
+    else:
+        caminho = args.saida
+    with open(caminho, 'w') as f:
+        json.dump(documento, f, indent=1, sort_keys=True)
+    print(f"Resultados gravados em {caminho}")
+    if args.atualizar_baseline:
+        return 1 if falhas else 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Sem referência em {args.baseline}; rode com --atualizar-baseline para criá-la.")
+        return 1 if falhas else 0
+    with open(args.baseline) as f:
+        referencia = json.load(f)['resultados']
+    comparacao = comparar(resultados, referencia, args.tolerancia)
+    imprimir_comparacao(comparacao, args.todas)
+    contagem = {situacao: sum(1 for *_, s in comparacao if s == situacao)
+                for situacao in ('regressao', 'ausente', 'melhora', 'estavel')}
+    print(f"{contagem['regressao']} regressões, {contagem['ausente']} ausentes, {contagem['melhora']} melhoras, "
+          f"{contagem['estavel']} estáveis (tolerância {100 * args.tolerancia:.0f} %)")
+    return 1 if falhas or contagem['regressao'] or contagem['ausente'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,55 +1,13 @@
+import os
+import sys
+
 import cv2
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
-from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
-
-# Função para ler os dados do arquivo e gerar o dataset
-def ler_dados_arquivo(caminho_arquivo):
-    try:
-        df = pd.read_csv(caminho_arquivo, delim_whitespace=True, header=None, skiprows=1, encoding='latin1',  names=['tempo', 'forca'])
-        return df
-    except Exception as e:
-        print(f"Erro ao ler o arquivo: {e}") # mostrar o erro
-        return None
-
-# Função para calcular impulso e total de impulso
-def calcular_impulso(df):
-    df['impulso'] = df['forca'] * df['tempo']  # Impulso = Força * Tempo
-    df['impulso_total'] = df['impulso'].cumsum()  # Impulso total é a soma cumulativa dos impulsos
-    return df
-
-# Função para desenhar o gráfico de linha como uma imagem
-def gerar_imagem_grafico(df, largura, altura):
-    # Dimensões do gráfico
-    fig, ax = plt.subplots(figsize=(5, 3), dpi=100)  # Ajustar o tamanho do gráfico
-
-    # Gráfico de linha para tempo vs. força
-    ax.plot(df['tempo'], df['forca'], color='purple', label='Força (N)')  # Linha roxa
-    
-    # Configurações do gráfico
-    ax.set_title('Força vs. Tempo')
-    ax.set_xlabel('Tempo (s)')
-    ax.set_ylabel('Força (N)')
-    ax.grid(True)
-
-    # Ajustar os limites do eixo y para manter os dados centralizados
-    ax.set_ylim(0, df['forca'].max() * 1.2)
-
-    # Tornar o gráfico transparente
-    ax.set_facecolor((0, 0, 0, 0))  # Fundo do gráfico transparente
-    fig.patch.set_alpha(0)  # Fundo da figura transparente
-
-    # Converter o gráfico para uma imagem numpy
-    canvas = FigureCanvas(fig)
-    canvas.draw()
-
-    # Transformar a figura em uma imagem numpy
-    img = np.frombuffer(canvas.tostring_rgb(), dtype='uint8')
-    img = img.reshape(fig.canvas.get_width_height()[::-1] + (3,))
-
-    plt.close(fig)  # Fechar a figura para liberar memória
-    return img
+
+# Os módulos compartilhados ficam na raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from siriusgraph.grafico import GraficoOverlay
+from siriusgraph.hud import HudLeituras
+from siriusgraph.leitura import SeguidorArquivo, calcular_impulso
 
 def mostrar_webcam_com_grafico(caminho_arquivo):
     cap = cv2.VideoCapture(0)
@@ -58,6 +16,15 @@ def mostrar_webcam_com_grafico(caminho_arquivo):
     cv2.namedWindow('Webcam com Gráfico Transparente', cv2.WND_PROP_FULLSCREEN)
     cv2.setWindowProperty('Webcam com Gráfico Transparente', cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
 
+    # Figura 5x3 polegadas criada uma única vez e atualizada a cada quadro
+    grafico = GraficoOverlay(500, 300)
+    # Rótulos e valores no mesmo tamanho; os rótulos são desenhados uma vez, os valores só quando mudam
+    hud = HudLeituras(tamanho_valor=17)
+
+    # Acompanha o log enquanto ele cresce, pulando o cabeçalho em latin1
+    seguidor = SeguidorArquivo(caminho_arquivo, formato='log')
+    dados = seguidor.buffer
+
     while True:
         ret, frame = cap.read()
         if not ret:
@@ -65,14 +32,13 @@ def mostrar_webcam_com_grafico(caminho_arquivo):
 
         altura, largura, _ = frame.shape  # Dimensões do frame da webcam
 
-        # Carregar os dados e gerar a imagem do gráfico
-        df = ler_dados_arquivo(caminho_arquivo)
-        if df is not None:
-            # Calcular impulso e total de impulso
-            df = calcular_impulso(df)
-
-            # Gerar o gráfico de linha (tempo vs força)
-            grafico_img = gerar_imagem_grafico(df, largura, altura)
+        # Ler só as linhas novas do arquivo e integrar o impulso (trapézio) apenas nelas
+        inicio = len(dados)
+        seguidor.ler_novos()
+        calcular_impulso(dados, inicio)
+        if len(dados):
+            # Atualizar o gráfico de linha (tempo vs força)
+            grafico_img = cv2.cvtColor(grafico.atualizar(dados['tempo'], dados['forca']), cv2.COLOR_RGBA2BGR)
 
             # Definir posição do gráfico no canto inferior esquerdo
             posicao_x = 10
@@ -88,34 +54,10 @@ def mostrar_webcam_com_grafico(caminho_arquivo):
             # Aplicar transparência ao gráfico (0.7 = 70% do frame + 30% do gráfico)
             combined_frame = cv2.addWeighted(frame, 0.6, frame_copia, 0.4, 0)
 
-            # Pegar os últimos valores (mais recentes) do dataset
-            ultimo_dado = df.iloc[-1]
-            tempo = ultimo_dado['tempo']
-            forca = ultimo_dado['forca']
-            impulso = ultimo_dado['impulso']
-            impulso_total = df['impulso_total'].iloc[-1]  # Impulso total
-
-            # Ajustar o texto para ficar em múltiplas linhas
-            texto1 = f"Tempo:{tempo:.2f} s"
-            texto2 = f"Forca:{forca:.2f} N"
-            texto3 = f"Impulso:{impulso:.2f} N.s"
-            texto4 = f"Impulso Total:{impulso_total:.2f} N.s"
-
-            # Definir as coordenadas para o texto na tela (canto superior esquerdo)
-            posicao_x_texto = 10
-            posicao_y_inicial = 30
-            espaçamento = 50  # Espaçamento entre linhas
-
-            # Exibir o texto na tela
-            cv2.putText(combined_frame, texto1.split(':')[0], (posicao_x_texto, posicao_y_inicial), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
-            cv2.putText(combined_frame, texto1.split(':')[1], (posicao_x_texto, posicao_y_inicial + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
-            cv2.putText(combined_frame, texto2.split(':')[0], (posicao_x_texto, posicao_y_inicial + espaçamento), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
-            cv2.putText(combined_frame, texto2.split(':')[1], (posicao_x_texto, posicao_y_inicial + 20 + espaçamento), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
-            cv2.putText(combined_frame, texto3.split(':')[0], (posicao_x_texto, posicao_y_inicial + 2 * espaçamento), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
-            cv2.putText(combined_frame, texto3.split(':')[1], (posicao_x_texto, posicao_y_inicial + 20 + 2 * espaçamento), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
-            cv2.putText(combined_frame, texto4.split(':')[0], (posicao_x_texto, posicao_y_inicial + 3 * espaçamento), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
-            cv2.putText(combined_frame, texto4.split(':')[1], (posicao_x_texto, posicao_y_inicial + 20 + 3 * espaçamento), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
-           
+            # Pegar os últimos valores (mais recentes) do dataset e exibir o texto na tela
+            hud.aplicar(combined_frame, (dados['tempo'][-1], dados['forca'][-1],
+                                         dados['impulso'][-1], dados['impulso_total'][-1]))
+
             # Mostrar o frame com o gráfico transparente e os dados
             cv2.imshow('Webcam com Gráfico Transparente', combined_frame)
 
@@ -3,14 +3,17 @@
 
 a = Analysis(
     ['main.py'],
-    pathex=[],
+    pathex=['..'],
     binaries=[],
     datas=[],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # main.py não usa interface Tk nem análise com pandas/scikit-learn/scipy;
+    # menos módulos no pacote = menos arquivos a abrir na partida a frio
+    excludes=['tkinter', 'pandas', 'sklearn', 'scipy', 'IPython', 'PyQt5', 'PySide2', 'PyQt6', 'PySide6',
+              'matplotlib.backends.backend_tkagg', 'matplotlib.backends.backend_qtagg', 'pytest'],
     noarchive=False,
     optimize=0,
 )
@@ -25,7 +28,7 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=False,  # Descompactar DLLs com UPX a cada execução atrasa a partida
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -38,7 +41,7 @@ coll = COLLECT(
     a.binaries,
     a.datas,
     strip=False,
-    upx=True,
+    upx=False,
     upx_exclude=[],
     name='main',
 )
@@ -0,0 +1 @@
+"""Módulos compartilhados da bancada Sirius (aquisição, gráficos e análise)."""
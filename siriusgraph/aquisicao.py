@@ -0,0 +1,270 @@
+"""Aquisição contínua da célula de carga em uma thread dedicada.
+
+O ESP32 (``bin/sistemaDeCaptacao/app.c``) envia quadros ``<1,tempo,forca>`` a
+cada ~12 ms e responde ``<2,escala>`` ao comando ``g``. A thread de aquisição é a
+única dona da ``serial.Serial``: ela lê em blocos tudo o que chegou, interpreta os
+quadros com ``protocolo.ProtocoloSerial`` e os grava em um buffer circular
+pré-alocado, de onde a interface e o laço de vídeo leem sem bloquear.
+"""
+import queue
+import threading
+import time
+
+import numpy as np
+import serial
+
+from siriusgraph.protocolo import QUADRO_DADOS, QUADRO_ESCALA, ProtocoloSerial
+from siriusgraph.sincronizacao import RelogioDispositivo
+
+
+class BufferCircular:
+    """Buffer circular de amostras (tempo, força, tipo) apoiado em arrays NumPy.
+
+    Há um único escritor (a thread de aquisição) e qualquer número de leitores.
+    O escritor grava os dados e só depois publica o novo total em ``escritos``;
+    os leitores copiam a janela desejada e conferem ``escritos`` de novo para
+    descartar o que tiver sido sobrescrito durante a cópia. Nenhuma trava é
+    necessária.
+    """
+
+    def __init__(self, capacidade=1 << 18):
+        self.capacidade = int(capacidade)
+        self.tempo = np.zeros(self.capacidade, dtype=np.float64)
+        self.forca = np.zeros(self.capacidade, dtype=np.float64)
+        self.tipo = np.zeros(self.capacidade, dtype=np.uint8)
+        self.escritos = 0  # Total de amostras já gravadas (nunca diminui)
+
+    def __len__(self):
+        return min(self.escritos, self.capacidade)
+
+    def limpar(self):
+        self.escritos = 0
+
+    def adicionar(self, tempo, forca, tipo=QUADRO_DADOS):
+        i = self.escritos % self.capacidade
+        self.tempo[i] = tempo
+        self.forca[i] = forca
+        self.tipo[i] = tipo
+        self.escritos += 1
+
+    def adicionar_lote(self, tempos, forcas, tipo=QUADRO_DADOS):
+        tempos = np.asarray(tempos, dtype=np.float64)
+        forcas = np.asarray(forcas, dtype=np.float64)
+        n = len(tempos)
+        if n == 0:
+            return
+        if n > self.capacidade:
+            # Só as últimas ``capacidade`` amostras cabem; as demais contam como escritas
+            self.escritos += n - self.capacidade
+            tempos, forcas = tempos[-self.capacidade:], forcas[-self.capacidade:]
+            n = self.capacidade
+        inicio = self.escritos % self.capacidade
+        primeiro = min(n, self.capacidade - inicio)
+        self.tempo[inicio:inicio + primeiro] = tempos[:primeiro]
+        self.forca[inicio:inicio + primeiro] = forcas[:primeiro]
+        self.tipo[inicio:inicio + primeiro] = tipo
+        if primeiro < n:
+            resto = n - primeiro
+            self.tempo[:resto] = tempos[primeiro:]
+            self.forca[:resto] = forcas[primeiro:]
+            self.tipo[:resto] = tipo
+        self.escritos += n
+
+    def _copiar(self, inicio, fim):
+        # Copia as amostras [inicio, fim) em ordem, tratando a volta do buffer
+        a, b = inicio % self.capacidade, fim % self.capacidade
+        if fim - inicio == 0:
+            vazio = np.empty(0)
+            return vazio, vazio.copy(), np.empty(0, dtype=np.uint8)
+        if a < b:
+            return self.tempo[a:b].copy(), self.forca[a:b].copy(), self.tipo[a:b].copy()
+        return (np.concatenate((self.tempo[a:], self.tempo[:b])),
+                np.concatenate((self.forca[a:], self.forca[:b])),
+                np.concatenate((self.tipo[a:], self.tipo[:b])))
+
+    def desde(self, cursor):
+        """Retorna as amostras gravadas a partir de ``cursor``.
+
+        Devolve ``(tempo, forca, tipo, novo_cursor, perdidas)``, em que
+        ``perdidas`` conta as amostras sobrescritas antes de serem lidas.
+        """
+        fim = self.escritos
+        inicio = max(cursor, fim - self.capacidade)
+        tempo, forca, tipo = self._copiar(inicio, fim)
+        # Se o escritor deu a volta durante a cópia, o começo pode estar corrompido
+        limite = self.escritos - self.capacidade
+        if limite > inicio:
+            corte = min(limite - inicio, fim - inicio)
+            tempo, forca, tipo = tempo[corte:], forca[corte:], tipo[corte:]
+            inicio += corte
+        return tempo, forca, tipo, fim, inicio - min(cursor, inicio)
+
+    def ultimas(self, n):
+        """Retorna ``(tempo, forca, tipo)`` com as ``n`` amostras mais recentes."""
+        fim = self.escritos
+        tempo, forca, tipo, _, _ = self.desde(max(0, fim - int(n)))
+        return tempo, forca, tipo
+
+    def ultima(self):
+        """Retorna ``(tempo, forca)`` da amostra mais recente ou ``None``."""
+        fim = self.escritos
+        if fim == 0:
+            return None
+        i = (fim - 1) % self.capacidade
+        return float(self.tempo[i]), float(self.forca[i])
+
+
+class AquisicaoSerial(threading.Thread):
+    """Thread que possui a porta serial e alimenta um ``BufferCircular``."""
+
+    # Intervalo entre amostras, em períodos, a partir do qual há amostras perdidas:
+    # uma amostra perdida já dá 2 períodos, bem acima do jitter do millis()
+    LIMIAR_LACUNA = 1.5
+
+    def __init__(self, porta, baudrate=115200, buffer=None, timeout=0.05, filtro=None):
+        super().__init__(name=f"aquisicao-{porta}", daemon=True)
+        self.porta = porta
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.buffer = buffer if buffer is not None else BufferCircular()
+        # Filtro opcional (``siriusgraph.filtros``) só para exibição: o ``buffer`` continua cru
+        self.filtro = filtro
+        self.buffer_filtrado = None
+        if filtro is not None:
+            filtro.reiniciar()
+            self.buffer_filtrado = BufferCircular(self.buffer.capacidade)
+        self.respostas = queue.Queue()  # Quadros que não são de dados (ex.: <2,escala>)
+        self.protocolo = ProtocoloSerial()
+        self.protocolo.registrar(QUADRO_ESCALA, lambda campos: self.respostas.put([QUADRO_ESCALA] + campos))
+        self.relogio = RelogioDispositivo()  # millis() do ESP32 → time.monotonic() do computador
+        self.conexao = None
+        self.erro = None
+        self._parar = threading.Event()
+        self._trava_escrita = threading.Lock()
+
+        # Contadores (os de quadros ficam no protocolo)
+        self.amostras_perdidas = 0  # Lacunas detectadas no tempo do ESP32
+        self.periodo_estimado = None
+        self._ultimo_tempo = None
+        self._inicio = None
+
+    @property
+    def buffer_exibicao(self):
+        """Buffer para gráficos e leituras: o filtrado, se houver filtro, senão o cru."""
+        return self.buffer_filtrado if self.buffer_filtrado is not None else self.buffer
+
+    @property
+    def quadros_validos(self):
+        return self.protocolo.quadros_dados
+
+    @property
+    def quadros_invalidos(self):
+        return self.protocolo.quadros_malformados
+
+    @property
+    def bytes_recebidos(self):
+        return self.protocolo.bytes_recebidos
+
+    def abrir(self):
+        """Abre a porta serial; levanta ``serial.SerialException`` em caso de falha.
+
+        ``porta`` pode ser um dispositivo (``COM3``, ``/dev/ttyUSB0``) ou uma URL do
+        pyserial, como ``socket://127.0.0.1:5000`` do ``siriusgraph.simulador``.
+        """
+        self.conexao = serial.serial_for_url(self.porta, self.baudrate, timeout=self.timeout)
+        return self.conexao
+
+    def iniciar(self):
+        if self.conexao is None:
+            self.abrir()
+        self.start()
+        return self
+
+    def parar(self, timeout=2.0):
+        self._parar.set()
+        if self.is_alive():
+            self.join(timeout)
+        if self.conexao is not None and self.conexao.is_open:
+            self.conexao.close()
+
+    def enviar(self, comando):
+        """Envia um comando ao ESP32 (``g``, ``s<fator>``) a partir de qualquer thread."""
+        if isinstance(comando, str):
+            comando = comando.encode()
+        with self._trava_escrita:
+            self.conexao.write(comando)
+
+    def aguardar_resposta(self, tipo=QUADRO_ESCALA, timeout=1.0):
+        """Espera um quadro de ``tipo`` e devolve seus campos, ou ``None``."""
+        limite = time.monotonic() + timeout
+        while True:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                return None
+            try:
+                campos = self.respostas.get(timeout=restante)
+            except queue.Empty:
+                return None
+            if campos[0] == tipo:
+                return campos
+
+    def run(self):
+        self._inicio = time.monotonic()
+        while not self._parar.is_set():
+            try:
+                # Tudo o que já chegou de uma vez; sem nada, espera até ``timeout`` por 1 byte
+                dados = self.conexao.read(self.conexao.in_waiting or 1)
+            except (serial.SerialException, OSError) as e:
+                self.erro = e
+                break
+            if dados:
+                self._processar_bloco(dados, time.monotonic())
+
+    def _processar_bloco(self, dados, instante):
+        tempos, forcas = self.protocolo.alimentar(dados)
+        if len(tempos) == 0:
+            return
+        self._registrar_lacunas(tempos)
+        # A última amostra do bloco é a que chegou com menos atraso até ``instante``
+        self.relogio.registrar(float(tempos[-1]), instante)
+        self._armazenar(tempos, forcas)
+
+    def _armazenar(self, tempos, forcas):
+        self.buffer.adicionar_lote(tempos, forcas, QUADRO_DADOS)
+        if self.filtro is not None:
+            self.buffer_filtrado.adicionar_lote(tempos, self.filtro.filtrar(forcas), QUADRO_DADOS)
+
+    def _registrar_lacunas(self, tempos):
+        # Estima o período do firmware e conta amostras que não chegaram
+        if self._ultimo_tempo is not None:
+            tempos_com_anterior = np.concatenate(([self._ultimo_tempo], tempos))
+        else:
+            tempos_com_anterior = tempos
+        self._ultimo_tempo = float(tempos[-1])
+        dt = np.diff(tempos_com_anterior)
+        dt = dt[dt > 0]
+        if len(dt) == 0:
+            return
+        if self.periodo_estimado is None:
+            self.periodo_estimado = float(dt[0])
+        lacunas = dt > self.LIMIAR_LACUNA * self.periodo_estimado
+        if lacunas.any():
+            self.amostras_perdidas += int(np.round(dt[lacunas] / self.periodo_estimado).sum()) - int(lacunas.sum())
+        normais = dt[~lacunas]
+        if len(normais):
+            # Média móvel exponencial (peso 0.05 por amostra) aplicada ao bloco inteiro
+            self.periodo_estimado += (1.0 - 0.95 ** len(normais)) * (float(normais.mean()) - self.periodo_estimado)
+
+    def estatisticas(self):
+        """Resumo dos contadores de vazão e perdas."""
+        decorrido = time.monotonic() - self._inicio if self._inicio else 0.0
+        return {
+            'quadros_validos': self.quadros_validos,
+            'quadros_invalidos': self.quadros_invalidos,
+            'bytes_recebidos': self.bytes_recebidos,
+            'bytes_descartados': self.protocolo.bytes_descartados,
+            'quadros_desconhecidos': self.protocolo.quadros_desconhecidos,
+            'amostras_perdidas': self.amostras_perdidas,
+            'amostras_por_segundo': self.quadros_validos / decorrido if decorrido > 0 else 0.0,
+            'periodo_estimado': self.periodo_estimado,
+        }
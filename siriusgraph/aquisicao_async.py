@@ -0,0 +1,250 @@
+"""Aquisição de várias bancadas e sensores ao mesmo tempo em um único laço asyncio.
+
+``ServicoAquisicao`` é dono de N portas seriais (célula de empuxo, transdutor
+de pressão, uma segunda bancada...) e as lê em um só laço de eventos, em uma
+thread própria. Cada porta é uma ``FonteSerial`` identificada por um nome: ela
+tem o mesmo ``ProtocoloSerial``, ``BufferCircular`` e ``RelogioDispositivo`` da
+``AquisicaoSerial``, então a interface, o ``GraficoTk`` e a calibração usam uma
+fonte exatamente como usariam a aquisição de uma porta só::
+
+    servico = ServicoAquisicao()
+    servico.adicionar_fonte('empuxo', 'COM3')
+    servico.adicionar_fonte('pressao', 'COM4')
+    servico.gravar('empuxo', GravadorCorrida('empuxo.srun', colunas=COLUNAS_FONTE))
+    servico.iniciar()
+    grafico.acompanhar(servico.fontes['empuxo'].buffer)
+
+Cada ESP32 conta o próprio ``millis()``. O relógio de cada fonte leva esse
+tempo ao ``time.monotonic()`` do computador, e o tempo comum é esse instante
+menos o início do serviço: é o tempo entregue aos assinantes e gravado, e
+``janela_alinhada`` reamostra todas as fontes nele.
+
+O serviço é um módulo à parte, ainda não usado pela interface nem pelo
+gravador (que continuam com uma ``AquisicaoSerial``), para quando a bancada
+ganhar mais de um sensor.
+
+Em POSIX a leitura é feita quando o descritor da porta fica legível
+(``loop.add_reader``); onde isso não existe (portas COM no Windows, laço
+Proactor) cada fonte é consultada a cada ``intervalo`` segundos.
+"""
+import asyncio
+import threading
+import time
+
+import numpy as np
+import serial
+
+from siriusgraph.aquisicao import AquisicaoSerial
+
+# Colunas de um ``.srun`` por fonte (tempo comum e valor medido)
+COLUNAS_FONTE = (('tempo', '<f8'), ('forca', '<f4'))
+
+
+class FonteSerial(AquisicaoSerial):
+    """Uma porta serial lida pelo ``ServicoAquisicao`` (não roda thread própria)."""
+
+    def __init__(self, id_fonte, porta, baudrate=115200, buffer=None, filtro=None):
+        super().__init__(porta, baudrate, buffer=buffer, timeout=0, filtro=filtro)
+        self.id_fonte = id_fonte
+        self.assinantes = []  # funções(id_fonte, tempos_comuns, valores)
+        self.origem = 0.0  # Instante do computador que é o zero do tempo comum
+
+    def iniciar(self):
+        if self.conexao is None:
+            self.abrir()
+        self._inicio = time.monotonic()
+        return self
+
+    def parar(self, timeout=2.0):
+        if self.conexao is not None and self.conexao.is_open:
+            self.conexao.close()
+
+    def ler_disponivel(self):
+        """Lê sem bloquear tudo o que chegou; devolve quantos quadros de dados vieram."""
+        try:
+            # Com timeout=0 o read devolve só o que já chegou; o socket:// do pyserial
+            # informa 0 ou 1 em ``in_waiting``, daí o tamanho mínimo
+            dados = self.conexao.read(max(self.conexao.in_waiting, 4096))
+        except (serial.SerialException, OSError) as e:
+            self.erro = e
+            raise
+        if not dados:
+            return 0
+        return self._processar_bloco(dados, time.monotonic())
+
+    def _processar_bloco(self, dados, instante):
+        tempos, forcas = self.protocolo.alimentar(dados)
+        if len(tempos) == 0:
+            return 0
+        self._registrar_lacunas(tempos)
+        self.relogio.registrar(float(tempos[-1]), instante)
+        self._armazenar(tempos, forcas)
+        if self.assinantes:
+            comuns = self.tempo_comum(tempos)
+            for funcao in self.assinantes:
+                funcao(self.id_fonte, comuns, forcas)
+        return len(tempos)
+
+    def tempo_comum(self, tempos):
+        """Tempo do ESP32 desta fonte → segundos desde o início do serviço."""
+        return self.relogio.para_host(tempos) - self.origem
+
+
+class ServicoAquisicao:
+    """Lê várias ``FonteSerial`` em um laço asyncio rodando em uma thread própria."""
+
+    def __init__(self, intervalo=0.005):
+        self.intervalo = intervalo  # Período de consulta das fontes sem ``add_reader``
+        self.fontes = {}
+        self.origem = time.monotonic()
+        self._laco = None
+        self._thread = None
+        self._parar = None
+        self._pronto = threading.Event()
+
+    def adicionar_fonte(self, id_fonte, porta, baudrate=115200, buffer=None, filtro=None):
+        """Registra uma porta (dispositivo ou URL do pyserial) com o nome ``id_fonte``.
+
+        ``filtro`` (ver ``siriusgraph.filtros``) vale só para a exibição, como na ``AquisicaoSerial``.
+        """
+        if id_fonte in self.fontes:
+            raise ValueError(f"Fonte {id_fonte!r} já existe")
+        if self._thread is not None:
+            raise RuntimeError("Adicione as fontes antes de iniciar o serviço")
+        fonte = FonteSerial(id_fonte, porta, baudrate, buffer, filtro)
+        fonte.origem = self.origem
+        self.fontes[id_fonte] = fonte
+        return fonte
+
+    def assinar(self, funcao, id_fonte=None):
+        """Chama ``funcao(id_fonte, tempos_comuns, valores)`` a cada bloco de ``id_fonte`` (ou de todas).
+
+        A função roda na thread do laço: deve só enfileirar ou copiar os dados.
+        """
+        for fonte in ([self.fontes[id_fonte]] if id_fonte is not None else self.fontes.values()):
+            fonte.assinantes.append(funcao)
+
+    def gravar(self, id_fonte, gravador):
+        """Envia as amostras de ``id_fonte`` a um ``GravadorCorrida`` com colunas ``COLUNAS_FONTE``."""
+        def enfileirar(_, tempos, valores):
+            # Sem espera: com o disco travado, perde-se um bloco (contado no gravador), não o laço
+            gravador.adicionar(timeout=0, tempo=tempos, forca=valores)
+
+        self.assinar(enfileirar, id_fonte)
+
+    def iniciar(self):
+        abertas = []
+        try:
+            for fonte in self.fontes.values():
+                fonte.iniciar()
+                abertas.append(fonte)
+        except Exception:
+            # Uma porta não abriu: fecha as que já estavam abertas antes de repassar o erro
+            for fonte in abertas:
+                fonte.parar()
+            raise
+        self._thread = threading.Thread(target=asyncio.run, args=(self.executar(),),
+                                        name='servico-aquisicao', daemon=True)
+        self._thread.start()
+        self._pronto.wait(2.0)
+        return self
+
+    def parar(self, timeout=2.0):
+        if self._laco is not None and self._parar is not None:
+            try:
+                self._laco.call_soon_threadsafe(self._parar.set)
+            except RuntimeError:
+                pass  # O laço já terminou
+        if self._thread is not None:
+            self._thread.join(timeout)
+        for fonte in self.fontes.values():
+            fonte.parar()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+    async def executar(self):
+        """Lê todas as fontes até ``parar``; pode ser aguardado em um laço já existente."""
+        self._laco = asyncio.get_running_loop()
+        self._parar = asyncio.Event()
+        self._pronto.set()
+        tarefas = [asyncio.create_task(self._ler_fonte(fonte)) for fonte in self.fontes.values()]
+        try:
+            await self._parar.wait()
+        finally:
+            for tarefa in tarefas:
+                tarefa.cancel()
+            await asyncio.gather(*tarefas, return_exceptions=True)
+
+    async def _ler_fonte(self, fonte):
+        try:
+            fd = fonte.conexao.fileno()
+        except (AttributeError, NotImplementedError, OSError, ValueError):
+            fd = None
+        if fd is not None:
+            try:
+                await self._ler_quando_pronta(fonte, fd)
+                return
+            except NotImplementedError:
+                pass  # Laço sem ``add_reader`` (Proactor no Windows)
+        await self._ler_periodicamente(fonte)
+
+    async def _ler_quando_pronta(self, fonte, fd):
+        terminou = self._laco.create_future()
+
+        def ler():
+            try:
+                fonte.ler_disponivel()
+            except (serial.SerialException, OSError):
+                self._laco.remove_reader(fd)
+                if not terminou.done():
+                    terminou.set_result(None)
+
+        self._laco.add_reader(fd, ler)
+        try:
+            await terminou
+        finally:
+            self._laco.remove_reader(fd)
+
+    async def _ler_periodicamente(self, fonte):
+        while True:
+            try:
+                fonte.ler_disponivel()
+            except (serial.SerialException, OSError):
+                return
+            await asyncio.sleep(self.intervalo)
+
+    def enviar(self, id_fonte, comando):
+        """Envia um comando (``g``, ``s<fator>``) ao ESP32 de ``id_fonte``, de qualquer thread."""
+        self.fontes[id_fonte].enviar(comando)
+
+    def janela_alinhada(self, segundos=10.0, passo=None, ids=None):
+        """Reamostra as últimas ``segundos`` de cada fonte em uma mesma grade de tempo comum.
+
+        Devolve ``(tempo, {id_fonte: valores})``; ``passo`` padrão é o menor período
+        estimado entre as fontes. Fora do intervalo medido de uma fonte o valor é NaN.
+        """
+        fontes = [self.fontes[i] for i in (ids if ids is not None else self.fontes)]
+        series = {}
+        for fonte in fontes:
+            if fonte.relogio.deslocamento is None or fonte.periodo_estimado is None:
+                continue
+            n = int(segundos / fonte.periodo_estimado) + 2
+            tempo, valores, _ = fonte.buffer.ultimas(n)
+            series[fonte.id_fonte] = (fonte.tempo_comum(tempo), valores)
+        if not series:
+            return np.empty(0), {}
+        if passo is None:
+            passo = min(self.fontes[i].periodo_estimado for i in series)
+        fim = max(t[-1] for t, _ in series.values())
+        tempo = np.arange(fim - segundos, fim + passo / 2, passo)
+        alinhadas = {}
+        for id_fonte, (t, valores) in series.items():
+            alinhadas[id_fonte] = np.interp(tempo, t, valores, left=np.nan, right=np.nan)
+        return tempo, alinhadas
+
+    def estatisticas(self):
+        return {id_fonte: fonte.estatisticas() for id_fonte, fonte in self.fontes.items()}
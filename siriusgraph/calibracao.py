@@ -0,0 +1,251 @@
+"""Calibração da célula de carga com vários pesos conhecidos.
+
+Cada patamar de carga é medido pela média de muitas amostras do buffer de
+aquisição, descartando as discrepantes pelo desvio absoluto mediano (MAD). A
+reta ``leitura = inclinacao * carga + intercepto`` é ajustada por mínimos
+quadrados ponderados (peso = 1/variância da média de cada patamar), e os
+resíduos dão a não linearidade da célula.
+
+Os perfis são gravados em JSON, versionados por célula, em
+``~/.siriusgraph/calibracao/<celula>/v0001.json``, e podem ser reaplicados a
+corridas já gravadas::
+
+    python -m siriusgraph.calibracao corrida.srun corrigida.srun --celula celula50kg
+"""
+import json
+import os
+import time
+
+import numpy as np
+
+DIRETORIO_PERFIS = os.path.join(os.path.expanduser('~'), '.siriusgraph', 'calibracao')
+VERSAO_FORMATO = 1
+_MAD_PARA_DESVIO = 1.4826  # MAD * 1.4826 estima o desvio padrão de uma normal
+
+
+class ErroCalibracao(ValueError):
+    pass
+
+
+def media_robusta(valores, limite=3.5):
+    """Média das amostras após descartar as que distam mais de ``limite`` desvios (MAD) da mediana.
+
+    Retorna ``(media, desvio, usadas, rejeitadas)``.
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    valores = valores[np.isfinite(valores)]
+    if len(valores) == 0:
+        raise ErroCalibracao("Nenhuma amostra válida no patamar")
+    mediana = np.median(valores)
+    mad = np.median(np.abs(valores - mediana)) * _MAD_PARA_DESVIO
+    if mad > 0:
+        aceitas = valores[np.abs(valores - mediana) <= limite * mad]
+    else:
+        aceitas = valores[valores == mediana] if np.count_nonzero(valores == mediana) > len(valores) // 2 else valores
+    desvio = float(aceitas.std(ddof=1)) if len(aceitas) > 1 else 0.0
+    return float(aceitas.mean()), desvio, len(aceitas), len(valores) - len(aceitas)
+
+
+def coletar_patamar(buffer, n_amostras=200, descartar=20, timeout=10.0):
+    """Junta ``n_amostras`` novas do ``BufferCircular`` (após descartar as ``descartar`` primeiras)."""
+    cursor = buffer.escritos
+    partes, obtidas = [], 0
+    limite = time.monotonic() + timeout
+    while obtidas < n_amostras + descartar and time.monotonic() < limite:
+        _, forca, _, cursor, _ = buffer.desde(cursor)
+        if len(forca):
+            partes.append(forca)
+            obtidas += len(forca)
+        else:
+            time.sleep(0.01)
+    amostras = np.concatenate(partes) if partes else np.empty(0)
+    return amostras[descartar:descartar + n_amostras]
+
+
+def ajustar_reta(cargas, leituras, desvios=None, amostras=None):
+    """Mínimos quadrados ponderados de ``leitura = inclinacao * carga + intercepto``.
+
+    O peso de cada ponto é o inverso da variância da sua média (``desvio²/n``);
+    sem desvios, todos os pontos pesam igual. Retorna um dicionário com os
+    coeficientes, os resíduos em unidades de carga e a não linearidade em % do
+    fundo de escala.
+    """
+    cargas = np.asarray(cargas, dtype=np.float64)
+    leituras = np.asarray(leituras, dtype=np.float64)
+    if len(cargas) < 2 or np.ptp(cargas) == 0:
+        raise ErroCalibracao("São necessários ao menos dois pesos diferentes")
+    pesos = np.ones_like(cargas)
+    if desvios is not None:
+        variancia = np.asarray(desvios, dtype=np.float64) ** 2
+        if amostras is not None:
+            variancia = variancia / np.maximum(np.asarray(amostras, dtype=np.float64), 1)
+        if np.all(variancia > 0):
+            pesos = 1.0 / variancia
+            pesos /= pesos.mean()
+    raiz = np.sqrt(pesos)
+    matriz = np.column_stack((cargas, np.ones_like(cargas))) * raiz[:, None]
+    (inclinacao, intercepto), *_ = np.linalg.lstsq(matriz, leituras * raiz, rcond=None)
+    if inclinacao == 0:
+        raise ErroCalibracao("As leituras não variam com a carga")
+    residuos = (leituras - (inclinacao * cargas + intercepto)) / inclinacao
+    fundo_escala = np.abs(cargas).max()
+    return {
+        'inclinacao': float(inclinacao),
+        'intercepto': float(intercepto),
+        'residuos': residuos.tolist(),
+        'residuo_maximo': float(np.abs(residuos).max()),
+        'nao_linearidade_pct': float(np.abs(residuos).max() / fundo_escala * 100),
+    }
+
+
+class PerfilCalibracao:
+    """Pontos medidos e reta ajustada para uma célula de carga.
+
+    ``escala_referencia`` é a escala do HX711 em uso quando os patamares foram
+    medidos; a nova escala a enviar ao ESP32 é ``escala_referencia * inclinacao``.
+    """
+
+    def __init__(self, celula, escala_referencia=1.0, pontos=None, versao=None, criado=None,
+                 descricao=''):
+        self.celula = celula
+        self.escala_referencia = float(escala_referencia)
+        self.pontos = list(pontos or [])  # dicts: carga, leitura, desvio, amostras, rejeitadas
+        self.versao = versao
+        self.criado = criado
+        self.descricao = descricao
+        self.ajuste = None
+
+    def adicionar_patamar(self, carga, amostras, limite=3.5):
+        leitura, desvio, usadas, rejeitadas = media_robusta(amostras, limite)
+        ponto = {'carga': float(carga), 'leitura': leitura, 'desvio': desvio,
+                 'amostras': usadas, 'rejeitadas': rejeitadas}
+        self.pontos.append(ponto)
+        self.ajuste = None
+        return ponto
+
+    def ajustar(self):
+        self.ajuste = ajustar_reta([p['carga'] for p in self.pontos], [p['leitura'] for p in self.pontos],
+                                   [p['desvio'] for p in self.pontos], [p['amostras'] for p in self.pontos])
+        return self.ajuste
+
+    @property
+    def fator_firmware(self):
+        if self.ajuste is None:
+            self.ajustar()
+        return self.escala_referencia * self.ajuste['inclinacao']
+
+    def aplicar(self, forca, escala_gravacao=None):
+        """Converte leituras gravadas em carga calibrada.
+
+        ``escala_gravacao`` é a escala do HX711 usada na gravação (o
+        ``fator_calibracao`` do cabeçalho .srun); se diferente da de referência,
+        as leituras são levadas primeiro à escala de referência.
+        """
+        if self.ajuste is None:
+            self.ajustar()
+        forca = np.asarray(forca, dtype=np.float64)
+        if escala_gravacao is not None and np.isfinite(escala_gravacao) and escala_gravacao != 0:
+            forca = forca * (escala_gravacao / self.escala_referencia)
+        return (forca - self.ajuste['intercepto']) / self.ajuste['inclinacao']
+
+    def para_dict(self):
+        if self.ajuste is None:
+            self.ajustar()
+        return {
+            'formato': VERSAO_FORMATO,
+            'celula': self.celula,
+            'versao': self.versao,
+            'criado': self.criado,
+            'descricao': self.descricao,
+            'escala_referencia': self.escala_referencia,
+            'fator_firmware': self.fator_firmware,
+            'pontos': self.pontos,
+            'ajuste': self.ajuste,
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        if dados.get('formato', 1) > VERSAO_FORMATO:
+            raise ErroCalibracao(f"Versão {dados['formato']} do perfil não suportada")
+        perfil = cls(dados['celula'], dados.get('escala_referencia', 1.0), dados['pontos'],
+                     dados.get('versao'), dados.get('criado'), dados.get('descricao', ''))
+        perfil.ajustar()
+        return perfil
+
+
+def _diretorio_celula(celula, diretorio):
+    return os.path.join(diretorio, celula)
+
+
+def listar_versoes(celula, diretorio=DIRETORIO_PERFIS):
+    pasta = _diretorio_celula(celula, diretorio)
+    if not os.path.isdir(pasta):
+        return []
+    return sorted(int(nome[1:-5]) for nome in os.listdir(pasta)
+                  if nome.startswith('v') and nome.endswith('.json') and nome[1:-5].isdigit())
+
+
+def salvar_perfil(perfil, diretorio=DIRETORIO_PERFIS):
+    """Grava o perfil como a próxima versão da célula e devolve o caminho."""
+    pasta = _diretorio_celula(perfil.celula, diretorio)
+    os.makedirs(pasta, exist_ok=True)
+    versoes = listar_versoes(perfil.celula, diretorio)
+    perfil.versao = (versoes[-1] + 1) if versoes else 1
+    perfil.criado = time.strftime('%Y-%m-%dT%H:%M:%S')
+    caminho = os.path.join(pasta, f"v{perfil.versao:04d}.json")
+    with open(caminho, 'x') as f:
+        json.dump(perfil.para_dict(), f, indent=2)
+    return caminho
+
+
+def carregar_perfil(celula, versao=None, diretorio=DIRETORIO_PERFIS):
+    """Carrega uma versão do perfil da célula (a mais recente se ``versao`` for ``None``)."""
+    if versao is None:
+        versoes = listar_versoes(celula, diretorio)
+        if not versoes:
+            raise ErroCalibracao(f"Nenhum perfil salvo para a célula {celula}")
+        versao = versoes[-1]
+    with open(os.path.join(_diretorio_celula(celula, diretorio), f"v{versao:04d}.json")) as f:
+        return PerfilCalibracao.de_dict(json.load(f))
+
+
+def recalibrar_corrida(caminho_entrada, caminho_saida, perfil, formato='calibracao'):
+    """Regrava uma corrida (``.srun`` ou texto) com a força corrigida pelo perfil e o impulso recalculado."""
+    from siriusgraph.formato import ErroFormato, EscritorCorrida, ler_cabecalho
+    from siriusgraph.impulso import integrar_trapezio
+    from siriusgraph.lote import carregar_tempo_forca
+
+    try:
+        escala = ler_cabecalho(caminho_entrada)['fator_calibracao']
+    except ErroFormato:
+        escala = None  # Texto: sem escala registrada, assume a de referência
+    tempo, forca = carregar_tempo_forca(caminho_entrada, formato)
+    forca = perfil.aplicar(forca, escala)
+    areas, acumulado = integrar_trapezio(tempo, forca)
+    with EscritorCorrida(caminho_saida, fator_calibracao=perfil.fator_firmware,
+                         firmware=f"recalibrado {perfil.celula} v{perfil.versao}") as escritor:
+        escritor.escrever(tempo=tempo, forca=forca, impulso=areas, impulso_total=acumulado)
+    return len(tempo)
+
+
+def main(argv=None):
+    import argparse
+
+    from siriusgraph.leitura import FORMATOS
+
+    parser = argparse.ArgumentParser(description="Reaplica um perfil de calibração a uma corrida gravada")
+    parser.add_argument('entrada')
+    parser.add_argument('saida', help="corrida .srun corrigida")
+    parser.add_argument('--celula', required=True)
+    parser.add_argument('--versao', type=int, default=None, help="versão do perfil (padrão: a mais recente)")
+    parser.add_argument('--perfis', default=DIRETORIO_PERFIS, help="diretório dos perfis")
+    parser.add_argument('--formato', default='calibracao', choices=sorted(FORMATOS))
+    args = parser.parse_args(argv)
+    perfil = carregar_perfil(args.celula, args.versao, args.perfis)
+    n = recalibrar_corrida(args.entrada, args.saida, perfil, args.formato)
+    print(f"{n} amostras recalibradas com {args.celula} v{perfil.versao} "
+          f"(não linearidade {perfil.ajuste['nao_linearidade_pct']:.3f}%): {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""Comparação de várias corridas: alinhamento na ignição, envelope e gráfico sobreposto.
+
+Cada corrida é alinhada no instante em que a força cruza o limiar de ignição
+(interpolado entre as duas amostras vizinhas) e reamostrada em uma grade de
+tempo comum, todas de uma vez (uma única chamada de ``np.interp``). Da matriz
+resultante saem a média, o desvio padrão e os extremos a cada instante.
+
+Os resumos por corrida (empuxo máximo, impulso total, tempo de queima, ignição
+e o SHA-256 da origem) ficam em cache em ``~/.siriusgraph/cache``, indexados
+pelo hash do arquivo e pelos parâmetros do cálculo: uma corrida só é relida se
+o conteúdo mudar. As curvas das corridas em texto também são guardadas em
+``.npy``, que carrega muito mais rápido que o texto.
+
+Uso::
+
+    python -m siriusgraph.comparacao dados/ --saida comparacao/ --limiar 0.05
+"""
+import argparse
+import concurrent.futures
+import csv
+import hashlib
+import json
+import os
+import warnings
+
+import numpy as np
+
+from siriusgraph.impulso import metricas_queima
+from siriusgraph.leitura import FORMATOS
+from siriusgraph.lote import COLUNAS_RESUMO, _eh_srun, carregar_tempo_forca, encontrar_corridas, nome_corrida
+
+DIRETORIO_CACHE = os.path.join(os.path.expanduser('~'), '.siriusgraph', 'cache')
+VERSAO_CACHE = 1  # Muda quando o conteúdo do resumo muda, invalidando o cache inteiro
+COLUNAS_COMPARACAO = COLUNAS_RESUMO + ('ignicao', 'sha256')
+
+
+def hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    """SHA-256 do conteúdo do arquivo, em hexadecimal."""
+    soma = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            soma.update(bloco)
+    return soma.hexdigest()
+
+
+def instante_ignicao(tempo, forca, limiar_relativo=0.05, limiar=None):
+    """Instante em que a força cruza o limiar pela primeira vez (NaN se nunca cruzar).
+
+    O limiar é ``limiar`` N ou, sem ele, ``limiar_relativo`` do empuxo máximo.
+    O cruzamento é interpolado linearmente entre as duas amostras vizinhas.
+    """
+    tempo = np.asarray(tempo, dtype=np.float64)
+    forca = np.asarray(forca, dtype=np.float64)
+    if len(forca) == 0:
+        return float('nan')
+    if limiar is None:
+        limiar = limiar_relativo * float(np.max(forca))
+    acima = np.flatnonzero(forca > limiar)
+    if len(acima) == 0:
+        return float('nan')
+    i = int(acima[0])
+    if i == 0:
+        return float(tempo[0])
+    f0, f1 = forca[i - 1], forca[i]
+    return float(tempo[i - 1] + (limiar - f0) / (f1 - f0) * (tempo[i] - tempo[i - 1]))
+
+
+class CacheCorridas:
+    """Resumos (em um único JSON) e curvas (``.npy``) das corridas, por hash do arquivo de origem."""
+
+    def __init__(self, diretorio=DIRETORIO_CACHE):
+        self.diretorio = diretorio
+        self.caminho_indice = os.path.join(diretorio, 'resumos.json')
+        self._resumos = {}
+        self._alterado = False
+        try:
+            with open(self.caminho_indice) as f:
+                dados = json.load(f)
+            if dados.get('versao') == VERSAO_CACHE:
+                self._resumos = dados['resumos']
+        except (OSError, ValueError, KeyError):
+            pass  # Sem cache ou cache corrompido: começa vazio
+
+    @staticmethod
+    def chave(sha256, **parametros):
+        return sha256 + ''.join(f';{nome}={parametros[nome]}' for nome in sorted(parametros))
+
+    def resumo(self, chave):
+        return self._resumos.get(chave)
+
+    def guardar_resumo(self, chave, resumo):
+        self._resumos[chave] = resumo
+        self._alterado = True
+
+    def _caminho_curva(self, sha256, formato):
+        return os.path.join(self.diretorio, 'curvas', f'{sha256}_{formato}.npy')
+
+    def curva(self, sha256, formato):
+        """``(tempo, forca)`` guardados para o arquivo, ou ``None``."""
+        try:
+            tempo, forca = np.load(self._caminho_curva(sha256, formato))
+        except (OSError, ValueError):
+            return None
+        return tempo, forca
+
+    def guardar_curva(self, sha256, formato, tempo, forca):
+        caminho = self._caminho_curva(sha256, formato)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        temporario = caminho + '.tmp.npy'
+        np.save(temporario, np.vstack((tempo, forca)))
+        os.replace(temporario, caminho)
+
+    def salvar(self):
+        if not self._alterado:
+            return
+        os.makedirs(self.diretorio, exist_ok=True)
+        temporario = self.caminho_indice + '.tmp'
+        with open(temporario, 'w') as f:
+            json.dump({'versao': VERSAO_CACHE, 'resumos': self._resumos}, f)
+        os.replace(temporario, self.caminho_indice)  # Nunca deixa um índice pela metade
+        self._alterado = False
+
+
+def resumir_corrida(caminho, formato, tempo, forca, sha256, limiar_relativo=0.05, limiar=None):
+    """Métricas da queima, ignição e hash de uma corrida já carregada."""
+    metricas = metricas_queima(tempo, forca, limiar_relativo=limiar_relativo, limiar=limiar)
+    return {'origem': caminho, 'formato': formato, 'sha256': sha256, 'amostras': int(len(tempo)),
+            'ignicao': instante_ignicao(tempo, forca, limiar_relativo, limiar), **metricas}
+
+
+def _carregar_e_resumir(caminho, formato, sha256, limiar_relativo, limiar):
+    # Roda no pool: lê a corrida e calcula o resumo
+    tempo, forca = carregar_tempo_forca(caminho, formato)
+    return tempo, forca, resumir_corrida(caminho, formato, tempo, forca, sha256, limiar_relativo, limiar)
+
+
+def carregar_corridas(corridas, limiar_relativo=0.05, limiar=None, cache=None, processos=None, curvas=True):
+    """Carrega ``[(caminho, formato)]`` e devolve ``[(resumo, tempo, forca)]``, na mesma ordem.
+
+    Com ``curvas=False`` só os resumos são necessários: corridas já no cache não
+    são lidas (``tempo`` e ``forca`` vêm ``None``). As que faltam no cache são
+    lidas em um pool de processos.
+    """
+    cache = cache if cache is not None else CacheCorridas()
+    parametros = {'limiar_relativo': limiar_relativo, 'limiar': limiar}
+    resultados = [None] * len(corridas)
+    faltando = []
+    for i, (caminho, formato) in enumerate(corridas):
+        sha256 = hash_arquivo(caminho)
+        resumo = cache.resumo(cache.chave(sha256, formato=formato, **parametros))
+        srun = caminho.endswith('.srun') or _eh_srun(caminho)
+        curva = None
+        if resumo is not None and curvas:
+            # O .srun abre por memória mapeada; o texto vem do .npy guardado
+            curva = carregar_tempo_forca(caminho, formato) if srun else cache.curva(sha256, formato)
+        if resumo is not None and (curva is not None or not curvas):
+            resumo = dict(resumo, origem=caminho)  # O mesmo conteúdo pode estar em outro lugar agora
+            resultados[i] = (resumo,) + (curva if curva is not None else (None, None))
+        else:
+            faltando.append((i, caminho, formato, sha256, srun))
+
+    if faltando:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processos) as pool:
+            futuros = {pool.submit(_carregar_e_resumir, caminho, formato, sha256, limiar_relativo, limiar):
+                       (i, formato, sha256, srun) for i, caminho, formato, sha256, srun in faltando}
+            for futuro in concurrent.futures.as_completed(futuros):
+                i, formato, sha256, srun = futuros[futuro]
+                tempo, forca, resumo = futuro.result()
+                cache.guardar_resumo(cache.chave(sha256, formato=formato, **parametros), resumo)
+                if not srun:
+                    cache.guardar_curva(sha256, formato, tempo, forca)
+                resultados[i] = (resumo, tempo, forca)
+        cache.salvar()
+    return resultados
+
+
+def reamostrar(curvas, passo=None, inicio=None, fim=None):
+    """Reamostra ``[(tempo, forca)]`` na grade ``inicio:fim:passo`` e devolve ``(grade, matriz)``.
+
+    A matriz tem uma linha por corrida, com NaN fora do intervalo medido de
+    cada uma. Sem ``passo``, usa a mediana dos intervalos de amostragem; sem
+    ``inicio``/``fim``, cobre da primeira à última amostra de todas as corridas.
+    Todas as corridas vão em uma única chamada de ``np.interp``: cada uma é
+    deslocada no tempo para depois da anterior, e a grade é repetida com os
+    mesmos deslocamentos.
+    """
+    curvas = [(np.asarray(t, dtype=np.float64), np.asarray(f, dtype=np.float64)) for t, f in curvas]
+    # Só os instantes estritamente crescentes (descarta repetições do relógio)
+    limpas = []
+    for tempo, forca in curvas:
+        if len(tempo):
+            manter = np.concatenate(([True], np.diff(tempo) > 0)) & np.isfinite(tempo)
+            tempo, forca = tempo[manter], forca[manter]
+        limpas.append((tempo, forca))
+    com_dados = [tempo for tempo, _ in limpas if len(tempo)]
+    if not com_dados:
+        return np.empty(0), np.full((len(limpas), 0), np.nan)
+    if passo is None:
+        passo = float(np.median(np.concatenate([np.diff(t) for t in com_dados if len(t) > 1] or [[1e-3]])))
+    inicio = min(t[0] for t in com_dados) if inicio is None else inicio
+    fim = max(t[-1] for t in com_dados) if fim is None else fim
+    grade = inicio + passo * np.arange(int(np.floor((fim - inicio) / passo + 1e-9)) + 1)
+
+    primeiros = np.array([t[0] if len(t) else np.inf for t, _ in limpas])
+    ultimos = np.array([t[-1] if len(t) else -np.inf for t, _ in limpas])
+    # Deslocamento maior que todo o intervalo envolvido, para que as corridas não se misturem
+    largura = max(fim, ultimos[np.isfinite(ultimos)].max()) - min(inicio, primeiros[np.isfinite(primeiros)].min())
+    deslocamentos = (largura + 1.0) * np.arange(len(limpas))
+    tempos = np.concatenate([t + d for (t, _), d in zip(limpas, deslocamentos)])
+    forcas = np.concatenate([f for _, f in limpas])
+    matriz = np.interp(grade[None, :] + deslocamentos[:, None], tempos, forcas) if len(tempos) \
+        else np.empty((len(limpas), len(grade)))
+    # Com folga de arredondamento: um ponto da grade sobre a primeira ou a última amostra conta como dentro
+    folga = 1e-9 * passo
+    fora = (grade[None, :] < primeiros[:, None] - folga) | (grade[None, :] > ultimos[:, None] + folga)
+    matriz[fora] = np.nan
+    return grade, matriz
+
+
+def envelope(matriz):
+    """Média, desvio padrão, mínimo, máximo e número de corridas em cada coluna da matriz."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # Colunas sem nenhuma corrida dão NaN
+        return {
+            'media': np.nanmean(matriz, axis=0),
+            'desvio': np.nanstd(matriz, axis=0),
+            'minimo': np.nanmin(matriz, axis=0),
+            'maximo': np.nanmax(matriz, axis=0),
+            'n': np.count_nonzero(np.isfinite(matriz), axis=0),
+        }
+
+
+def comparar_corridas(corridas, limiar_relativo=0.05, limiar=None, passo=None, antes=None, depois=None,
+                      cache=None, processos=None):
+    """Carrega, alinha na ignição e reamostra as corridas.
+
+    ``antes``/``depois`` limitam a grade a esse intervalo (s) em torno da
+    ignição. Devolve ``(resumos, grade, matriz, envelope)``; corridas que não
+    cruzam o limiar ficam só nos resumos, com ``ignicao`` NaN.
+    """
+    carregadas = carregar_corridas(corridas, limiar_relativo, limiar, cache, processos)
+    resumos = [resumo for resumo, _, _ in carregadas]
+    alinhadas = [(tempo - resumo['ignicao'], forca) for resumo, tempo, forca in carregadas
+                 if np.isfinite(resumo['ignicao'])]
+    inicio = -antes if antes is not None else None
+    grade, matriz = reamostrar(alinhadas, passo, inicio, depois)
+    return resumos, grade, matriz, envelope(matriz)
+
+
+def salvar_grafico_comparacao(caminho_png, grade, matriz, curvas_envelope, nomes=None, titulo='Comparação'):
+    """Corridas sobrepostas (finas) com a média e a faixa de ±1 desvio padrão."""
+    # Figure direta (sem pyplot), como no lote
+    from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(11, 6), dpi=100)
+    FigureCanvas(fig)
+    ax = fig.add_subplot()
+    legenda = nomes is not None and len(matriz) <= 10
+    for i, linha in enumerate(matriz):
+        ax.plot(grade, linha, linewidth=0.8, alpha=0.8 if legenda else 0.35,
+                label=nomes[i] if legenda else None)
+    media, desvio = curvas_envelope['media'], curvas_envelope['desvio']
+    ax.fill_between(grade, media - desvio, media + desvio, color='black', alpha=0.15, linewidth=0,
+                    label='±1 desvio padrão')
+    ax.plot(grade, media, color='black', linewidth=2, label=f'Média ({len(matriz)} corridas)')
+    ax.axvline(0.0, color='gray', linestyle='--', linewidth=0.8)
+    ax.set_title(titulo)
+    ax.set_xlabel('Tempo desde a ignição (s)')
+    ax.set_ylabel('Força (N)')
+    ax.grid(True)
+    ax.legend(loc='upper right', fontsize='small')
+    fig.savefig(caminho_png)
+
+
+def salvar_envelope_csv(caminho, grade, curvas_envelope):
+    colunas = ('media', 'desvio', 'minimo', 'maximo', 'n')
+    with open(caminho, 'w', newline='') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(('tempo',) + colunas)
+        for i, t in enumerate(grade):
+            escritor.writerow([f'{t:.6f}'] + [f'{curvas_envelope[c][i]:.6g}' for c in colunas])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara corridas alinhadas na ignição")
+    parser.add_argument('diretorios', nargs='+', help="diretórios (ou arquivos) com corridas")
+    parser.add_argument('--saida', default='comparacao', help="diretório do gráfico e das tabelas")
+    parser.add_argument('--formato', default='calibracao', choices=sorted(FORMATOS),
+                        help="formato dos arquivos de texto avulsos")
+    parser.add_argument('--limiar', type=float, default=0.05,
+                        help="fração do empuxo máximo de cada corrida que marca a ignição")
+    parser.add_argument('--limiar-absoluto', type=float, default=None,
+                        help="limiar de ignição em N (substitui --limiar)")
+    parser.add_argument('--passo', type=float, default=None, help="passo da grade comum em s (padrão: mediana)")
+    parser.add_argument('--antes', type=float, default=None, help="segundos antes da ignição no gráfico")
+    parser.add_argument('--depois', type=float, default=None, help="segundos depois da ignição no gráfico")
+    parser.add_argument('--cache', default=DIRETORIO_CACHE, help="diretório do cache de resumos e curvas")
+    parser.add_argument('--processos', type=int, default=None, help="processos do pool (padrão: núcleos)")
+    args = parser.parse_args(argv)
+
+    corridas = encontrar_corridas(args.diretorios, args.formato)
+    if not corridas:
+        print("Nenhuma corrida encontrada.")
+        return 1
+    base = os.path.commonpath([os.path.abspath(d) for d in args.diretorios])
+    if os.path.isfile(base):
+        base = os.path.dirname(base)
+    # Em ordem de nome, como no resumo do lote
+    nomeadas = sorted((nome_corrida(os.path.abspath(caminho), base), (caminho, formato))
+                      for caminho, formato in corridas)
+    nomes = [nome for nome, _ in nomeadas]
+    corridas = [corrida for _, corrida in nomeadas]
+
+    resumos, grade, matriz, curvas_envelope = comparar_corridas(
+        corridas, args.limiar, args.limiar_absoluto, args.passo, args.antes, args.depois,
+        CacheCorridas(args.cache), args.processos)
+
+    os.makedirs(args.saida, exist_ok=True)
+    for nome, resumo in zip(nomes, resumos):
+        resumo['corrida'] = nome
+    with open(os.path.join(args.saida, 'resumo.csv'), 'w', newline='') as f:
+        escritor = csv.DictWriter(f, fieldnames=COLUNAS_COMPARACAO, extrasaction='ignore')
+        escritor.writeheader()
+        escritor.writerows(resumos)
+    alinhados = [nome for nome, resumo in zip(nomes, resumos) if np.isfinite(resumo['ignicao'])]
+    if len(grade):
+        salvar_envelope_csv(os.path.join(args.saida, 'envelope.csv'), grade, curvas_envelope)
+        salvar_grafico_comparacao(os.path.join(args.saida, 'comparacao.png'), grade, matriz, curvas_envelope,
+                                  alinhados, f"{len(alinhados)} corridas alinhadas na ignição")
+
+    impulsos = np.array([resumo['impulso_total'] for resumo in resumos])
+    print(f"{len(resumos)} corridas ({len(alinhados)} alinhadas). Impulso total: "
+          f"{impulsos.mean():.2f} ± {impulsos.std():.2f} N.s. Saída em {args.saida}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
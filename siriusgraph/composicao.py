@@ -0,0 +1,79 @@
+"""Composição da marca d'água sobre os quadros da webcam.
+
+A marca d'água é redimensionada e pré-processada uma única vez: a cor já vem
+multiplicada pelo alfa (``cor * alfa``) e o alfa inverso (``255 - alfa``) fica
+guardado em uint16. A cada quadro a mistura da região é feita em aritmética
+inteira, em buffers pré-alocados, sem criar arrays temporários.
+"""
+import cv2
+import numpy as np
+
+
+def premultiplicar(imagem):
+    """Separa uma imagem BGRA em ``(cor * alfa + 128, 255 - alfa)`` em uint16, prontos para a mistura."""
+    alfa = imagem[:, :, 3:4].astype(np.uint16)
+    # Cor pré-multiplicada, já somada ao 128 do arredondamento da divisão por 255
+    cor_premultiplicada = imagem[:, :, :3].astype(np.uint16) * alfa + 128
+    # Contíguo (e não broadcast) para a multiplicação não ter passos irregulares
+    alfa_inverso = np.repeat(255 - alfa, 3, axis=2)
+    return cor_premultiplicada, alfa_inverso
+
+
+def misturar_premultiplicado(regiao, cor_premultiplicada, alfa_inverso, acumulador, auxiliar):
+    """Mistura no lugar ``regiao = (regiao * (255 - alfa) + cor * alfa) / 255``.
+
+    ``acumulador`` e ``auxiliar`` são buffers uint16 do tamanho da região. O
+    arredondamento é exato: para v = soma + 128, v / 255 arredondado é
+    (v + (v >> 8)) >> 8.
+    """
+    np.multiply(regiao, alfa_inverso, out=acumulador)
+    acumulador += cor_premultiplicada
+    np.right_shift(acumulador, 8, out=auxiliar)
+    acumulador += auxiliar
+    acumulador >>= 8
+    np.copyto(regiao, acumulador, casting='unsafe')
+
+
+class MarcaDagua:
+    def __init__(self, imagem, escala=(0.20, 0.25), margem=3):
+        # Redimensionar a marca d'água (largura 20% e altura 25% do original)
+        altura_marca, largura_marca = imagem.shape[:2]
+        self.largura = max(1, int(largura_marca * escala[0]))
+        self.altura = max(1, int(altura_marca * escala[1]))
+        self.margem = margem
+        imagem = cv2.resize(imagem, (self.largura, self.altura), interpolation=cv2.INTER_AREA)
+        if imagem.ndim == 2:
+            imagem = cv2.cvtColor(imagem, cv2.COLOR_GRAY2BGR)
+
+        self.tem_alfa = imagem.shape[2] == 4
+        if self.tem_alfa:
+            self.cor_premultiplicada, self.alfa_inverso = premultiplicar(imagem)
+            self._acumulador = np.empty((self.altura, self.largura, 3), dtype=np.uint16)
+            self._auxiliar = np.empty_like(self._acumulador)
+        else:
+            self.cor = np.ascontiguousarray(imagem[:, :, :3])
+
+    @classmethod
+    def carregar(cls, caminho, **kwargs):
+        # Carregar com canal alfa para transparência
+        imagem = cv2.imread(caminho, cv2.IMREAD_UNCHANGED)
+        if imagem is None:
+            return None
+        return cls(imagem, **kwargs)
+
+    def aplicar(self, frame):
+        """Sobrepõe a marca d'água no canto inferior direito de ``frame`` (no lugar)."""
+        altura, largura = frame.shape[:2]
+        y = altura - self.altura - self.margem
+        x = largura - self.largura - self.margem
+        if x < 0 or y < 0:
+            return frame  # Quadro menor que a marca d'água
+        regiao = frame[y:y + self.altura, x:x + self.largura]
+
+        if not self.tem_alfa:
+            regiao[...] = self.cor
+            return frame
+
+        misturar_premultiplicado(regiao, self.cor_premultiplicada, self.alfa_inverso,
+                                 self._acumulador, self._auxiliar)
+        return frame
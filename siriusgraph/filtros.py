@@ -0,0 +1,289 @@
+"""Filtros da força aplicados no computador, sobre as amostras cruas do ESP32.
+
+Cada filtro tem dois modos:
+
+- ``filtrar(valores)``: em blocos, como as amostras chegam da aquisição, com o
+  estado guardado entre um bloco e outro. É causal (só usa amostras passadas),
+  e o resultado é idêntico ao de ``filtrar`` sobre o sinal inteiro de uma vez,
+  qualquer que seja a divisão em blocos;
+- ``fase_zero(valores)``: sobre o arquivo inteiro, sem atraso (janela centrada
+  ou ida e volta), para análise depois da corrida.
+
+Filtros: ``FiltroMediaMovel``, ``FiltroExponencial`` (mesmo ``alfa`` do
+firmware), ``FiltroButterworth``, ``FiltroSavitzkyGolay`` e ``FiltroMediana``
+(rejeição de picos de Hampel). Tudo é vetorizado em NumPy; o SciPy, se
+instalado, acelera o filtro exponencial e é necessário para o Butterworth.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from scipy import signal as _signal
+except ImportError:  # O executável não inclui o SciPy
+    _signal = None
+
+
+def _trecho_exponencial(b):
+    # Trechos da forma fechada curtos o bastante para b^-j não estourar o float64
+    return max(1, min(4096, int(280 / -np.log10(b))))
+
+
+def _exponencial(valores, alfa, anterior):
+    # y[n] = alfa * x[n] + (1 - alfa) * y[n-1], partindo de y[-1] = anterior
+    b = 1.0 - alfa
+    if _signal is not None:
+        return _signal.lfilter([alfa], [1.0, -b], valores, zi=[b * anterior])[0]
+    if b == 0.0:
+        return valores.copy()
+    saida = np.empty_like(valores)
+    # Em forma fechada por trechos: y[k] = b^(k+1) y[-1] + alfa b^k Σ x[j] b^-j
+    trecho = _trecho_exponencial(b)
+    potencias = b ** np.arange(trecho + 1)
+    for inicio in range(0, len(valores), trecho):
+        x = valores[inicio:inicio + trecho]
+        p = potencias[:len(x) + 1]
+        saida[inicio:inicio + len(x)] = p[1:] * anterior + alfa * p[:-1] * np.cumsum(x / p[:-1])
+        anterior = saida[inicio + len(x) - 1]
+    return saida
+
+
+def _coeficientes_savgol(janela, grau, posicoes):
+    # Linha i: pesos que dão, a partir da janela, o polinômio ajustado avaliado em posicoes[i]
+    ajuste = np.linalg.pinv(np.vander(np.arange(janela, dtype=np.float64), grau + 1, increasing=True))
+    return np.vander(np.asarray(posicoes, dtype=np.float64), grau + 1, increasing=True) @ ajuste
+
+
+class _FiltroJanela:
+    # Base dos filtros de janela finita: guarda as últimas ``janela - 1`` entradas
+
+    def __init__(self, janela):
+        self.janela = int(janela)
+        if self.janela < 1:
+            raise ValueError("A janela precisa ter pelo menos uma amostra")
+        self.reiniciar()
+
+    def reiniciar(self):
+        self._cauda = None
+
+    def _estender(self, valores):
+        # Entradas anteriores + bloco; no início, a primeira amostra repetida
+        if self._cauda is None:
+            self._cauda = np.full(self.janela - 1, valores[0])
+        estendido = np.concatenate((self._cauda, valores))
+        self._cauda = estendido[len(estendido) - (self.janela - 1):]
+        return estendido
+
+    def filtrar(self, valores):
+        valores = np.asarray(valores, dtype=np.float64)
+        if len(valores) == 0:
+            return np.empty(0)
+        return self._aplicar_causal(self._estender(valores))
+
+
+class FiltroMediaMovel(_FiltroJanela):
+    """Média das últimas ``janela`` amostras (o firmware usa 10)."""
+
+    def __init__(self, janela=10):
+        super().__init__(janela)
+
+    def _aplicar_causal(self, estendido):
+        return sliding_window_view(estendido, self.janela).mean(axis=1)
+
+    def fase_zero(self, valores):
+        """Média na janela centrada; nas pontas, só das amostras que existem."""
+        valores = np.asarray(valores, dtype=np.float64)
+        if len(valores) == 0:
+            return np.empty(0)
+        nucleo = np.ones(self.janela)
+        soma = np.convolve(valores, nucleo, mode='full')
+        contagem = np.convolve(np.ones(len(valores)), nucleo, mode='full')
+        inicio = (self.janela - 1) // 2
+        return soma[inicio:inicio + len(valores)] / contagem[inicio:inicio + len(valores)]
+
+
+class FiltroExponencial:
+    """Média móvel exponencial: ``y = alfa * x + (1 - alfa) * y_anterior``, como no firmware."""
+
+    def __init__(self, alfa=0.94):
+        if not 0.0 < alfa <= 1.0:
+            raise ValueError("alfa precisa estar em (0, 1]")
+        self.alfa = float(alfa)
+        self.reiniciar()
+
+    def reiniciar(self):
+        self._anterior = None
+        self._pendentes = np.empty(0)  # Entradas do trecho da forma fechada ainda aberto
+
+    def filtrar(self, valores):
+        valores = np.asarray(valores, dtype=np.float64)
+        if len(valores) == 0:
+            return np.empty(0)
+        if self._anterior is None:
+            self._anterior = valores[0]
+        b = 1.0 - self.alfa
+        if _signal is not None or b == 0.0:
+            saida = _exponencial(valores, self.alfa, self._anterior)
+            self._anterior = saida[-1]
+            return saida
+        # Sem SciPy, a forma fechada arredonda conforme o início do trecho: o trecho
+        # aberto é refeito desde o começo para os cortes caírem nas mesmas amostras
+        # de uma passada única, e o estado fica na saída do último trecho fechado
+        estendido = np.concatenate((self._pendentes, valores))
+        saida = _exponencial(estendido, self.alfa, self._anterior)
+        trecho = _trecho_exponencial(b)
+        fechados = len(estendido) - len(estendido) % trecho
+        if fechados:
+            self._anterior = saida[fechados - 1]
+        self._pendentes = estendido[fechados:]
+        return saida[len(estendido) - len(valores):]
+
+    def fase_zero(self, valores):
+        """Ida e volta: o atraso da ida é desfeito pela volta."""
+        valores = np.asarray(valores, dtype=np.float64)
+        if len(valores) == 0:
+            return np.empty(0)
+        ida = _exponencial(valores, self.alfa, valores[0])
+        return _exponencial(ida[::-1], self.alfa, ida[-1])[::-1]
+
+
+class FiltroButterworth:
+    """Passa-baixas Butterworth de ``ordem`` com corte em ``corte`` Hz, para amostras a ``taxa`` Hz."""
+
+    def __init__(self, corte, taxa, ordem=4):
+        if _signal is None:
+            raise ImportError("O filtro Butterworth precisa do SciPy (pip install scipy)")
+        if not 0.0 < corte < taxa / 2:
+            raise ValueError("O corte precisa estar entre 0 e metade da taxa de amostragem")
+        self.corte = float(corte)
+        self.taxa = float(taxa)
+        self.ordem = int(ordem)
+        self.sos = _signal.butter(self.ordem, self.corte, fs=self.taxa, output='sos')
+        self._zi_unitario = _signal.sosfilt_zi(self.sos)
+        self.reiniciar()
+
+    def reiniciar(self):
+        self._zi = None
+
+    def filtrar(self, valores):
+        valores = np.asarray(valores, dtype=np.float64)
+        if len(valores) == 0:
+            return np.empty(0)
+        if self._zi is None:
+            self._zi = self._zi_unitario * valores[0]  # Parte do regime com a primeira amostra
+        saida, self._zi = _signal.sosfilt(self.sos, valores, zi=self._zi)
+        return saida
+
+    def fase_zero(self, valores):
+        valores = np.asarray(valores, dtype=np.float64)
+        if len(valores) <= 3 * (2 * len(self.sos) + 1):
+            return valores.copy()  # Curto demais para a ida e volta com as pontas estendidas
+        return _signal.sosfiltfilt(self.sos, valores)
+
+
+class FiltroSavitzkyGolay(_FiltroJanela):
+    """Polinômio de ``grau`` ajustado por mínimos quadrados em uma janela de ``janela`` amostras.
+
+    Ao vivo o valor é o do polinômio na última amostra da janela (sem atraso);
+    em ``fase_zero`` é o do centro, e nas pontas o polinômio da primeira ou da
+    última janela.
+    """
+
+    def __init__(self, janela=21, grau=3):
+        if grau >= janela:
+            raise ValueError("O grau precisa ser menor que a janela")
+        self.grau = int(grau)
+        super().__init__(janela)
+        self._pesos_fim = _coeficientes_savgol(self.janela, self.grau, [self.janela - 1])[0]
+
+    def _aplicar_causal(self, estendido):
+        return np.convolve(estendido, self._pesos_fim[::-1], mode='valid')
+
+    def fase_zero(self, valores):
+        valores = np.asarray(valores, dtype=np.float64)
+        n, janela = len(valores), self.janela
+        if n < janela:
+            return FiltroSavitzkyGolay(n if n % 2 else n - 1, min(self.grau, max(n - 2, 0))).fase_zero(valores) \
+                if n > 2 else valores.copy()
+        meio = janela // 2
+        centro = _coeficientes_savgol(janela, self.grau, [meio])[0]
+        saida = np.empty(n)
+        saida[meio:n - (janela - 1 - meio)] = np.convolve(valores, centro[::-1], mode='valid')
+        saida[:meio] = _coeficientes_savgol(janela, self.grau, np.arange(meio)) @ valores[:janela]
+        fim = janela - 1 - meio
+        if fim:
+            saida[n - fim:] = _coeficientes_savgol(janela, self.grau, np.arange(meio + 1, janela)) @ valores[-janela:]
+        return saida
+
+
+class FiltroMediana(_FiltroJanela):
+    """Rejeição de picos (Hampel): amostra a mais de ``limite`` desvios robustos da mediana vira a mediana.
+
+    O desvio robusto é 1,4826 × a mediana dos desvios absolutos da janela;
+    ``minimo`` (N) evita que ruído de quantização, com desvio zero, conte como pico.
+    Ao vivo a janela termina na amostra atual, e um degrau verdadeiro aparece
+    com ``janela // 2`` amostras de atraso; em ``fase_zero`` a janela é centrada.
+    """
+
+    def __init__(self, janela=7, limite=3.0, minimo=0.0):
+        super().__init__(janela)
+        self.limite = float(limite)
+        self.minimo = float(minimo)
+        self.substituidas = 0  # Amostras trocadas pela mediana (só em ``filtrar``)
+
+    def _rejeitar(self, janelas, valores):
+        mediana = np.median(janelas, axis=1)
+        desvio = 1.4826 * np.median(np.abs(janelas - mediana[:, None]), axis=1)
+        picos = np.abs(valores - mediana) > np.maximum(self.limite * desvio, self.minimo)
+        return np.where(picos, mediana, valores), int(np.count_nonzero(picos))
+
+    def _aplicar_causal(self, estendido):
+        saida, picos = self._rejeitar(sliding_window_view(estendido, self.janela), estendido[self.janela - 1:])
+        self.substituidas += picos
+        return saida
+
+    def fase_zero(self, valores):
+        valores = np.asarray(valores, dtype=np.float64)
+        if len(valores) == 0:
+            return np.empty(0)
+        meio = self.janela // 2
+        estendido = np.pad(valores, (meio, self.janela - 1 - meio), mode='edge')
+        return self._rejeitar(sliding_window_view(estendido, self.janela), valores)[0]
+
+
+class CadeiaFiltros:
+    """Aplica vários filtros em sequência (ex.: rejeição de picos e depois Butterworth)."""
+
+    def __init__(self, *filtros):
+        self.filtros = list(filtros)
+
+    def reiniciar(self):
+        for filtro in self.filtros:
+            filtro.reiniciar()
+
+    def filtrar(self, valores):
+        for filtro in self.filtros:
+            valores = filtro.filtrar(valores)
+        return np.asarray(valores, dtype=np.float64)
+
+    def fase_zero(self, valores):
+        for filtro in self.filtros:
+            valores = filtro.fase_zero(valores)
+        return np.asarray(valores, dtype=np.float64)
+
+
+FILTROS = {
+    'media': FiltroMediaMovel,
+    'exponencial': FiltroExponencial,
+    'butterworth': FiltroButterworth,
+    'savgol': FiltroSavitzkyGolay,
+    'mediana': FiltroMediana,
+}
+
+
+def criar_filtro(nome, **parametros):
+    """Filtro pelo nome de ``FILTROS`` (ex.: ``criar_filtro('butterworth', corte=30, taxa=1000)``)."""
+    try:
+        classe = FILTROS[nome]
+    except KeyError:
+        raise ValueError(f"Filtro desconhecido: {nome} (opções: {', '.join(FILTROS)})") from None
+    return classe(**parametros)
@@ -0,0 +1,248 @@
+"""Formato binário das corridas (``.srun``) e conversão de/para texto.
+
+O arquivo tem um cabeçalho fixo de 512 bytes seguido dos registros das
+amostras, gravados um atrás do outro conforme chegam. Cada registro é uma
+estrutura NumPy com as colunas declaradas no cabeçalho (por padrão tempo em
+float64, força em float32, impulso e impulso total em float64), então a leitura
+é um ``np.memmap``: ``corrida['forca'][1000:2000]`` é uma visão sobre o arquivo,
+sem cópia e sem interpretar texto.
+
+Cabeçalho (little-endian)::
+
+    0   8s   assinatura b'SIRIUSRN'
+    8   H    versão
+    10  H    tamanho do cabeçalho (512)
+    12  H    número de colunas
+    14  H    marcas (bit 0: corrida fechada)
+    16  d    fator de calibração
+    24  d    taxa de amostragem (Hz)
+    32  Q    número de amostras (0 enquanto a gravação não é fechada)
+    40  d    início da gravação (epoch Unix)
+    48  64s  firmware
+    112 ...  colunas: 16s nome + 4s dtype, para cada coluna
+"""
+import os
+import struct
+import time
+
+import numpy as np
+
+from siriusgraph.leitura import SeguidorArquivo
+
+ASSINATURA = b'SIRIUSRN'
+VERSAO = 1
+TAMANHO_CABECALHO = 512
+_CABECALHO = struct.Struct('<8sHHHHddQd64s')
+_COLUNA = struct.Struct('<16s4s')
+_POSICAO_MARCAS = 14
+_POSICAO_N_AMOSTRAS = 32
+MARCA_FECHADA = 0x0001  # Gravada por fechar(); sem ela a corrida foi interrompida
+
+COLUNAS_PADRAO = (('tempo', '<f8'), ('forca', '<f4'), ('impulso', '<f8'), ('impulso_total', '<f8'))
+FIRMWARE_PADRAO = 'ESP32 HX711 sistemaDeCaptacao/app.c'
+
+
+class ErroFormato(ValueError):
+    pass
+
+
+def _dtype_registro(colunas):
+    return np.dtype([(nome, tipo) for nome, tipo in colunas])
+
+
+class EscritorCorrida:
+    """Grava uma corrida incrementalmente; ``fechar()`` registra o total de amostras."""
+
+    def __init__(self, caminho, colunas=COLUNAS_PADRAO, fator_calibracao=float('nan'),
+                 taxa_amostragem=float('nan'), firmware=FIRMWARE_PADRAO, inicio=None):
+        self.caminho = caminho
+        self.colunas = tuple(colunas)
+        self.dtype = _dtype_registro(self.colunas)
+        self.n_amostras = 0
+        self._arquivo = open(caminho, 'wb')
+        cabecalho = _CABECALHO.pack(ASSINATURA, VERSAO, TAMANHO_CABECALHO, len(self.colunas), 0,
+                                    fator_calibracao, taxa_amostragem, 0,
+                                    time.time() if inicio is None else inicio,
+                                    firmware.encode('utf-8')[:64])
+        cabecalho += b''.join(_COLUNA.pack(nome.encode('ascii'), tipo.encode('ascii'))
+                              for nome, tipo in self.colunas)
+        if len(cabecalho) > TAMANHO_CABECALHO:
+            raise ErroFormato("Colunas demais para o cabeçalho")
+        self._arquivo.write(cabecalho.ljust(TAMANHO_CABECALHO, b'\0'))
+
+    @classmethod
+    def reabrir(cls, caminho):
+        """Reabre uma corrida existente para continuar gravando no fim dela.
+
+        Um registro incompleto no fim do arquivo (gravação interrompida no meio
+        de uma escrita) é descartado.
+        """
+        cabecalho = ler_cabecalho(caminho)
+        escritor = cls.__new__(cls)
+        escritor.caminho = caminho
+        escritor.colunas = cabecalho['colunas']
+        escritor.dtype = _dtype_registro(escritor.colunas)
+        tamanho_dados = os.path.getsize(caminho) - cabecalho['tamanho_cabecalho']
+        escritor.n_amostras = tamanho_dados // escritor.dtype.itemsize
+        escritor._arquivo = open(caminho, 'r+b')
+        escritor._arquivo.truncate(cabecalho['tamanho_cabecalho'] + escritor.n_amostras * escritor.dtype.itemsize)
+        # Volta a marcar a corrida como aberta até o próximo fechar()
+        escritor._arquivo.seek(_POSICAO_MARCAS)
+        escritor._arquivo.write(struct.pack('<H', 0))
+        escritor._arquivo.seek(_POSICAO_N_AMOSTRAS)
+        escritor._arquivo.write(struct.pack('<Q', 0))
+        escritor._arquivo.seek(0, os.SEEK_END)
+        return escritor
+
+    def escrever(self, **colunas):
+        """Acrescenta amostras; cada argumento é uma coluna (arrays do mesmo tamanho)."""
+        n = len(next(iter(colunas.values())))
+        if n == 0:
+            return 0
+        registros = np.zeros(n, dtype=self.dtype)
+        for nome, valores in colunas.items():
+            registros[nome] = valores
+        return self.escrever_registros(registros)
+
+    def escrever_registros(self, registros):
+        self._arquivo.write(np.ascontiguousarray(registros, dtype=self.dtype).tobytes())
+        self.n_amostras += len(registros)
+        return len(registros)
+
+    def flush(self, fsync=False):
+        self._arquivo.flush()
+        if fsync:
+            os.fsync(self._arquivo.fileno())
+
+    def fechar(self):
+        if self._arquivo.closed:
+            return
+        try:
+            self._arquivo.seek(_POSICAO_MARCAS)
+            self._arquivo.write(struct.pack('<H', MARCA_FECHADA))
+            self._arquivo.seek(_POSICAO_N_AMOSTRAS)
+            self._arquivo.write(struct.pack('<Q', self.n_amostras))
+        finally:
+            self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+def ler_cabecalho(caminho):
+    with open(caminho, 'rb') as f:
+        bruto = f.read(TAMANHO_CABECALHO)
+    if len(bruto) < TAMANHO_CABECALHO or not bruto.startswith(ASSINATURA):
+        raise ErroFormato(f"{caminho} não é uma corrida .srun")
+    (_, versao, tamanho, n_colunas, marcas, fator, taxa, n_amostras, inicio,
+     firmware) = _CABECALHO.unpack_from(bruto)
+    if versao > VERSAO:
+        raise ErroFormato(f"Versão {versao} do formato não suportada")
+    colunas = []
+    for i in range(n_colunas):
+        nome, tipo = _COLUNA.unpack_from(bruto, _CABECALHO.size + i * _COLUNA.size)
+        colunas.append((nome.rstrip(b'\0').decode('ascii'), tipo.rstrip(b'\0').decode('ascii')))
+    return {
+        'versao': versao,
+        'tamanho_cabecalho': tamanho,
+        'colunas': tuple(colunas),
+        'fator_calibracao': fator,
+        'taxa_amostragem': taxa,
+        'n_amostras': n_amostras,
+        # Arquivos anteriores à marca só tinham o total, gravado ao fechar
+        'fechada': bool(marcas & MARCA_FECHADA) or n_amostras > 0,
+        'inicio': inicio,
+        'firmware': firmware.rstrip(b'\0').decode('utf-8', errors='replace'),
+    }
+
+
+class Corrida:
+    """Corrida aberta por memória mapeada; ``corrida['forca']`` é uma visão sem cópia."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.cabecalho = ler_cabecalho(caminho)
+        self.dtype = _dtype_registro(self.cabecalho['colunas'])
+        # Registros completos presentes no arquivo (vale também para gravações
+        # interrompidas, em que o cabeçalho ainda diz 0 amostras)
+        disponiveis = (os.path.getsize(caminho) - self.cabecalho['tamanho_cabecalho']) // self.dtype.itemsize
+        self.completa = self.cabecalho['fechada']
+        n = self.cabecalho['n_amostras'] if self.completa else disponiveis
+        self.n_amostras = min(n, disponiveis)
+        if self.n_amostras:
+            self.dados = np.memmap(caminho, dtype=self.dtype, mode='r',
+                                   offset=self.cabecalho['tamanho_cabecalho'], shape=(self.n_amostras,))
+        else:
+            self.dados = np.zeros(0, dtype=self.dtype)
+
+    def __len__(self):
+        return self.n_amostras
+
+    def __getitem__(self, coluna):
+        return self.dados[coluna]
+
+    @property
+    def colunas(self):
+        return self.dtype.names
+
+
+def abrir_corrida(caminho):
+    return Corrida(caminho)
+
+
+def recuperar_corrida(caminho):
+    """Fecha corretamente uma corrida interrompida e devolve-a aberta para leitura."""
+    EscritorCorrida.reabrir(caminho).fechar()
+    return Corrida(caminho)
+
+
+def texto_para_binario(caminho_texto, caminho_binario, formato='calibracao', **cabecalho):
+    """Converte um arquivo de texto (ver ``leitura.FORMATOS``) em ``.srun``."""
+    seguidor = SeguidorArquivo(caminho_texto, formato=formato)
+    seguidor.ler_novos(ate_o_fim=True)
+    dados = seguidor.buffer
+    colunas = [(nome, tipo) for nome, tipo in COLUNAS_PADRAO if nome in dados.colunas]
+    colunas += [(nome, '<f8') for nome in dados.colunas if nome not in dict(colunas)]
+    with EscritorCorrida(caminho_binario, colunas=colunas, **cabecalho) as escritor:
+        escritor.escrever(**{nome: dados[nome] for nome, _ in colunas})
+    return len(dados)
+
+
+def binario_para_texto(caminho_binario, caminho_texto):
+    """Converte um ``.srun`` no texto de ``salvar_dados`` (colunas separadas por vírgula)."""
+    corrida = abrir_corrida(caminho_binario)
+    colunas = [corrida[nome].astype(np.float64) for nome in corrida.colunas]
+    # Colunas float32 com a precisão delas: 12.3456 sai como 12.3456, não 12.34560013
+    formatos = ['%.7g' if corrida.dtype[nome].itemsize == 4 else '%.10g' for nome in corrida.colunas]
+    with open(caminho_texto, 'w') as f:
+        if len(corrida):
+            np.savetxt(f, np.column_stack(colunas), delimiter=',', fmt=formatos)
+    return len(corrida)
+
+
+# Conversão pela linha de comando:
+#   python -m siriusgraph.formato calibration_data.txt calibration_data.srun
+#   python -m siriusgraph.formato calibration_data.srun calibration_data.txt
+def main(argv=None):
+    import argparse
+
+    from siriusgraph.leitura import FORMATOS
+
+    parser = argparse.ArgumentParser(description="Converte corridas entre texto e .srun")
+    parser.add_argument('entrada')
+    parser.add_argument('saida')
+    parser.add_argument('--formato', default='calibracao', choices=sorted(FORMATOS),
+                        help="formato do arquivo de texto de entrada")
+    args = parser.parse_args(argv)
+    if args.entrada.endswith('.srun'):
+        n = binario_para_texto(args.entrada, args.saida)
+    else:
+        n = texto_para_binario(args.entrada, args.saida, formato=args.formato)
+    print(f"{n} amostras convertidas: {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
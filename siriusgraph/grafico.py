@@ -0,0 +1,113 @@
+"""Gráfico Força vs. Tempo desenhado de forma incremental para sobrepor ao vídeo.
+
+A figura e os eixos são criados uma única vez. A cada quadro só os dados da
+``Line2D`` mudam: o fundo (eixos, grade, títulos) fica em cache e a linha é
+desenhada por cima dele (blitting). Os limites dos eixos crescem com folga, então
+o fundo só precisa ser redesenhado de vez em quando.
+"""
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
+from matplotlib.figure import Figure
+
+
+class GraficoOverlay:
+    def __init__(self, largura, altura, dpi=100, cor='purple', janela_inicial=10.0):
+        # Figure direta (sem pyplot) para não acumular figuras no estado global
+        self.fig = Figure(figsize=(largura / dpi, altura / dpi), dpi=dpi)
+        self.canvas = FigureCanvas(self.fig)
+        self.ax = self.fig.add_subplot()
+
+        # Configurações do gráfico
+        self.ax.set_title('Força vs. Tempo')
+        self.ax.set_xlabel('Tempo (s)')
+        self.ax.set_ylabel('Força (N)')
+        self.ax.grid(True)
+
+        # Tornar o gráfico transparente
+        self.ax.set_facecolor((0, 0, 0, 0))
+        self.fig.patch.set_alpha(0)
+
+        # Linha animada: não entra no desenho do fundo, só no blit
+        self.linha, = self.ax.plot([], [], color=cor, label='Força (N)', animated=True)
+
+        self.janela_inicial = janela_inicial
+        self._xlim = (0.0, janela_inicial)
+        self._ylim = (0.0, 1.0)
+        self.ax.set_xlim(*self._xlim)
+        self.ax.set_ylim(*self._ylim)
+        self._fundo = None
+        self._sem_dados = True
+        self.redesenhos_fundo = 0
+
+    def _redesenhar_fundo(self):
+        self.canvas.draw()
+        self._fundo = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.redesenhos_fundo += 1
+
+    def _ajustar_limites(self, tempo, forca):
+        # Só altera os limites quando os dados saem deles, com folga de 50%
+        mudou = False
+        t_min, t_max = float(tempo[0]), float(tempo[-1])
+        x0, x1 = self._xlim
+        if self._sem_dados:
+            # O relógio do ESP32 não começa em zero: ancora o eixo na primeira amostra
+            x0, x1 = t_min, t_min + self.janela_inicial
+            self._xlim = (x0, x1)
+            self.ax.set_xlim(x0, x1)
+            self._sem_dados = False
+            mudou = True
+        if t_min < x0 or t_max > x1:
+            x0 = min(x0, t_min)
+            x1 = x0 + max((t_max - x0) * 1.5, self.janela_inicial)
+            self._xlim = (x0, x1)
+            self.ax.set_xlim(x0, x1)
+            mudou = True
+        f_min, f_max = float(np.min(forca)), float(np.max(forca))
+        y0, y1 = self._ylim
+        if f_max > y1 or f_min < y0:
+            # Mantém o zero visível, como o gráfico original (0 a 1.2 × máximo)
+            y0 = min(y0, f_min * 1.5)
+            y1 = max(y1, f_max * 1.5)
+            self._ylim = (y0, y1)
+            self.ax.set_ylim(y0, y1)
+            mudou = True
+        return mudou
+
+    def reiniciar(self):
+        """Volta aos limites iniciais (ex.: ao começar uma nova queima)."""
+        self._xlim = (0.0, self.janela_inicial)
+        self._ylim = (0.0, 1.0)
+        self.ax.set_xlim(*self._xlim)
+        self.ax.set_ylim(*self._ylim)
+        self._fundo = None
+        self._sem_dados = True
+
+    def acompanhar(self, tempo, forca):
+        """Ajusta os limites dos eixos como ``atualizar``, sem desenhar.
+
+        Os limites dependem de todos os quadros anteriores; isto permite começar
+        a desenhar no meio de um vídeo com os mesmos eixos de quem veio do início.
+        """
+        tempo = np.asarray(tempo)
+        forca = np.asarray(forca)
+        if len(tempo) and self._ajustar_limites(tempo, forca):
+            self._fundo = None
+        return tempo, forca
+
+    def atualizar(self, tempo, forca):
+        """Atualiza a curva e retorna a imagem RGBA (visão do buffer, sem cópia).
+
+        A visão é reescrita na próxima chamada; copie-a se precisar guardá-la.
+        """
+        tempo, forca = self.acompanhar(tempo, forca)
+        if self._fundo is None:
+            self._redesenhar_fundo()
+
+        self.canvas.restore_region(self._fundo)
+        self.linha.set_data(tempo, forca)
+        self.ax.draw_artist(self.linha)
+        self.canvas.blit(self.fig.bbox)
+        return self.imagem()
+
+    def imagem(self):
+        return np.asarray(self.canvas.buffer_rgba())
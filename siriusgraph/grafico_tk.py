@@ -0,0 +1,221 @@
+"""Gráfico de empuxo ao vivo dentro da janela Tkinter.
+
+O gráfico é uma única linha de um ``tk.Canvas`` cujas coordenadas são trocadas
+a cada redesenho. Antes de desenhar, as amostras são reduzidas a um mínimo e um
+máximo por coluna de pixels, então o número de pontos desenhados nunca passa de
+duas vezes a largura do gráfico, seja a corrida de mil ou de cem mil amostras.
+
+Há dois modos: ``janela`` mostra os últimos segundos, lidos do buffer de
+aquisição; ``corrida`` mostra a corrida inteira a partir de um ``ResumoMinMax``,
+que guarda mínimos e máximos por blocos de tamanho crescente e por isso não
+depende do tamanho do buffer circular nem da duração da corrida.
+"""
+import tkinter as tk
+
+import numpy as np
+
+MODO_JANELA = 'janela'
+MODO_CORRIDA = 'corrida'
+
+
+def decimar_min_max(tempo, minimos, maximos, t_inicio, t_fim, colunas):
+    """Reduz amostras (``tempo`` crescente) a ``(coluna, minimo, maximo)`` por coluna de pixels."""
+    if len(tempo) == 0 or t_fim <= t_inicio:
+        vazio = np.empty(0)
+        return vazio.astype(np.int64), vazio, vazio
+    coluna = ((tempo - t_inicio) * (colunas / (t_fim - t_inicio))).astype(np.int64)
+    np.clip(coluna, 0, colunas - 1, out=coluna)
+    inicio = np.flatnonzero(np.concatenate(([True], coluna[1:] != coluna[:-1])))
+    return coluna[inicio], np.minimum.reduceat(minimos, inicio), np.maximum.reduceat(maximos, inicio)
+
+
+class ResumoMinMax:
+    """Mínimo e máximo da força por blocos de amostras, com memória fixa.
+
+    Quando os ``capacidade`` blocos enchem, blocos vizinhos são fundidos dois a
+    dois e o tamanho do bloco dobra; o custo por amostra é constante.
+    """
+
+    def __init__(self, capacidade=2048):
+        self.capacidade = capacidade - capacidade % 2
+        self.t_inicio = np.zeros(self.capacidade)
+        self.t_fim = np.zeros(self.capacidade)
+        self.minimo = np.zeros(self.capacidade)
+        self.maximo = np.zeros(self.capacidade)
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.tamanho_bloco = 1
+        self.n = 0  # Blocos completos
+        self._no_bloco = 0  # Amostras no bloco em preenchimento (índice n)
+
+    def adicionar(self, tempo, forca):
+        i, total = 0, len(tempo)
+        while i < total:
+            if self.tamanho_bloco == 1:
+                # Blocos de uma amostra: copia direto o que couber
+                k = min(total - i, self.capacidade - self.n)
+                fatia = slice(self.n, self.n + k)
+                self.t_inicio[fatia] = self.t_fim[fatia] = tempo[i:i + k]
+                self.minimo[fatia] = self.maximo[fatia] = forca[i:i + k]
+                self.n += k
+                i += k
+            else:
+                k = min(total - i, self.tamanho_bloco - self._no_bloco)
+                trecho = forca[i:i + k]
+                if self._no_bloco == 0:
+                    self.t_inicio[self.n] = tempo[i]
+                    self.minimo[self.n], self.maximo[self.n] = trecho.min(), trecho.max()
+                else:
+                    self.minimo[self.n] = min(self.minimo[self.n], trecho.min())
+                    self.maximo[self.n] = max(self.maximo[self.n], trecho.max())
+                self.t_fim[self.n] = tempo[i + k - 1]
+                self._no_bloco += k
+                i += k
+                if self._no_bloco == self.tamanho_bloco:
+                    self.n += 1
+                    self._no_bloco = 0
+            if self.n == self.capacidade:
+                self._compactar()
+
+    def _compactar(self):
+        metade = self.n // 2
+        self.t_inicio[:metade] = self.t_inicio[0:self.n:2]
+        self.t_fim[:metade] = self.t_fim[1:self.n:2]
+        self.minimo[:metade] = np.minimum(self.minimo[0:self.n:2], self.minimo[1:self.n:2])
+        self.maximo[:metade] = np.maximum(self.maximo[0:self.n:2], self.maximo[1:self.n:2])
+        self.n = metade
+        self.tamanho_bloco *= 2
+
+    def blocos(self):
+        """Retorna ``(t_inicio, t_fim, minimo, maximo)`` dos blocos, incluindo o incompleto."""
+        n = self.n + (1 if self._no_bloco else 0)
+        return self.t_inicio[:n], self.t_fim[:n], self.minimo[:n], self.maximo[:n]
+
+
+class GraficoTk(tk.Frame):
+    MARGEM_ESQUERDA = 50
+    MARGEM_INFERIOR = 20
+    MARGEM = 8
+
+    def __init__(self, master, largura=560, altura=260, janela=10.0, intervalo_ms=33, cor='purple',
+                 **opcoes):
+        super().__init__(master, **opcoes)
+        self.largura = largura
+        self.altura = altura
+        self.janela = janela
+        self.intervalo_ms = intervalo_ms
+        self.modo = tk.StringVar(value=MODO_JANELA)
+        self.canvas = tk.Canvas(self, width=largura, height=altura, bg='white', highlightthickness=0)
+        self.canvas.pack(side=tk.TOP)
+        barra = tk.Frame(self)
+        barra.pack(side=tk.TOP, fill=tk.X)
+        tk.Radiobutton(barra, text=f"Últimos {janela:g} s", variable=self.modo, value=MODO_JANELA,
+                       command=self.redesenhar).pack(side=tk.LEFT)
+        tk.Radiobutton(barra, text="Corrida inteira", variable=self.modo, value=MODO_CORRIDA,
+                       command=self.redesenhar).pack(side=tk.LEFT)
+
+        # Área do gráfico em pixels
+        self._x0, self._x1 = self.MARGEM_ESQUERDA, largura - self.MARGEM
+        self._y0, self._y1 = self.MARGEM, altura - self.MARGEM_INFERIOR
+        self.colunas = self._x1 - self._x0
+        self.canvas.create_rectangle(self._x0, self._y0, self._x1, self._y1, outline='#bbbbbb')
+        self._linha = self.canvas.create_line(0, 0, 0, 0, fill=cor, width=1)
+        self._textos = {
+            'y_max': self.canvas.create_text(self._x0 - 4, self._y0, anchor=tk.NE, font=('Arial', 8)),
+            'y_min': self.canvas.create_text(self._x0 - 4, self._y1, anchor=tk.SE, font=('Arial', 8)),
+            't_ini': self.canvas.create_text(self._x0, self._y1 + 3, anchor=tk.NW, font=('Arial', 8)),
+            't_fim': self.canvas.create_text(self._x1, self._y1 + 3, anchor=tk.NE, font=('Arial', 8)),
+        }
+        self._valores_textos = {}
+
+        self.resumo = ResumoMinMax()
+        self.buffer = None
+        self._cursor = 0
+        self._agendado = None
+        self._taxa = 200.0  # Limite superior da taxa de amostragem, até ser estimada
+        self.redesenhos = 0
+
+    def acompanhar(self, buffer):
+        """Passa a desenhar as amostras de ``buffer`` (um ``BufferCircular``) a partir de agora."""
+        self.parar()
+        self.buffer = buffer
+        self._cursor = buffer.escritos
+        self.resumo.reiniciar()
+        self._agendado = self.after(self.intervalo_ms, self._atualizar)
+
+    def parar(self):
+        if self._agendado is not None:
+            self.after_cancel(self._agendado)
+            self._agendado = None
+        self.buffer = None
+
+    def _atualizar(self):
+        self._agendado = None
+        if self.buffer is None:
+            return
+        if self.buffer.escritos != self._cursor:
+            tempos, forcas, _, self._cursor, _ = self.buffer.desde(self._cursor)
+            if len(tempos) > 1 and tempos[-1] > tempos[0]:
+                self._taxa = max(self._taxa, (len(tempos) - 1) / (tempos[-1] - tempos[0]))
+            self.resumo.adicionar(tempos, forcas)
+            self.redesenhar()
+        self._agendado = self.after(self.intervalo_ms, self._atualizar)
+
+    def _dados_janela(self):
+        # Só as amostras dos últimos ``janela`` segundos, com folga na estimativa da taxa
+        n = min(len(self.buffer), int(self.janela * self._taxa * 1.5) + 2)
+        tempos, forcas, _ = self.buffer.ultimas(n)
+        if len(tempos) == 0:
+            return None
+        t_fim = tempos[-1]
+        t_inicio = max(tempos[0], t_fim - self.janela)
+        if t_fim - t_inicio < self.janela:
+            t_inicio = t_fim - self.janela  # Enquanto a corrida é curta, a janela fica fixa à direita
+        corte = np.searchsorted(tempos, t_inicio)
+        tempos, forcas = tempos[corte:], forcas[corte:]
+        return decimar_min_max(tempos, forcas, forcas, t_inicio, t_fim, self.colunas), t_inicio, t_fim
+
+    def _dados_corrida(self):
+        t_inicio, t_fim, minimos, maximos = self.resumo.blocos()
+        if len(t_inicio) == 0:
+            return None
+        inicio, fim = t_inicio[0], max(t_fim[-1], t_inicio[0] + 1e-9)
+        return decimar_min_max(t_inicio, minimos, maximos, inicio, fim, self.colunas), inicio, fim
+
+    def redesenhar(self):
+        if self.buffer is None:
+            return
+        dados = self._dados_janela() if self.modo.get() == MODO_JANELA else self._dados_corrida()
+        if dados is None:
+            return
+        (colunas, minimos, maximos), t_inicio, t_fim = dados
+        if len(colunas) == 0:
+            return
+        y_min, y_max = float(minimos.min()), float(maximos.max())
+        margem = max((y_max - y_min) * 0.1, 1e-3)
+        y_min, y_max = y_min - margem, y_max + margem
+
+        # Zigue-zague mínimo→máximo em cada coluna: picos de uma amostra continuam visíveis
+        escala = (self._y1 - self._y0) / (y_max - y_min)
+        x = (self._x0 + colunas).astype(np.float64)
+        pontos = np.empty((len(colunas), 2, 2))
+        pontos[:, :, 0] = x[:, None]
+        pontos[:, 0, 1] = self._y1 - (minimos - y_min) * escala
+        pontos[:, 1, 1] = self._y1 - (maximos - y_min) * escala
+        pontos[1::2] = pontos[1::2, ::-1]
+        coordenadas = pontos.ravel()
+        if len(coordenadas) < 4:
+            coordenadas = np.tile(coordenadas, 2)
+        self.canvas.coords(self._linha, *np.round(coordenadas, 1).tolist())
+        self._texto('y_max', f"{y_max:.1f} N")
+        self._texto('y_min', f"{y_min:.1f} N")
+        self._texto('t_ini', f"{t_inicio:.1f} s")
+        self._texto('t_fim', f"{t_fim:.1f} s")
+        self.redesenhos += 1
+
+    def _texto(self, nome, texto):
+        # Só reconfigura o item quando o texto muda
+        if self._valores_textos.get(nome) != texto:
+            self.canvas.itemconfigure(self._textos[nome], text=texto)
+            self._valores_textos[nome] = texto
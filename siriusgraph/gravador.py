@@ -0,0 +1,134 @@
+"""Gravação das amostras em disco à medida que chegam, fora da thread da interface.
+
+Quem produz os dados só coloca blocos de amostras em uma fila limitada; a
+thread do ``GravadorCorrida`` junta esses blocos em lotes, acrescenta-os ao
+arquivo ``.srun`` e faz ``flush`` periodicamente. A memória usada não depende da
+duração da corrida, e uma queda do programa perde no máximo o último lote
+ainda não gravado: ``formato.recuperar_corrida`` reabre o arquivo incompleto.
+"""
+import queue
+import threading
+import time
+
+import numpy as np
+
+from siriusgraph.formato import COLUNAS_PADRAO, EscritorCorrida
+
+# Políticas de fsync
+FSYNC_NUNCA = 'nunca'  # Só flush; o sistema operacional decide quando ir ao disco
+FSYNC_LOTE = 'lote'  # fsync a cada flush periódico
+FSYNC_FECHAMENTO = 'fechamento'  # fsync apenas ao fechar a corrida
+
+_FIM = object()
+
+
+class GravadorCorrida(threading.Thread):
+    def __init__(self, caminho, colunas=COLUNAS_PADRAO, tamanho_lote=256, intervalo_flush=0.5,
+                 fsync=FSYNC_LOTE, capacidade_fila=1024, continuar=False, **cabecalho):
+        super().__init__(name='gravador-corrida', daemon=True)
+        if continuar:
+            # Recuperação: continua uma corrida interrompida no fim do arquivo existente
+            self.escritor = EscritorCorrida.reabrir(caminho)
+        else:
+            self.escritor = EscritorCorrida(caminho, colunas=colunas, **cabecalho)
+        self.caminho = caminho
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_flush = intervalo_flush
+        self.fsync = fsync
+        self._fila = queue.Queue(maxsize=capacidade_fila)
+        self._lote = np.zeros(tamanho_lote, dtype=self.escritor.dtype)
+        self._no_lote = 0
+        self.erro = None
+        self.lotes_gravados = 0
+        self.blocos_descartados = 0
+
+    @property
+    def amostras_gravadas(self):
+        return self.escritor.n_amostras
+
+    def iniciar(self):
+        self.start()
+        return self
+
+    def adicionar(self, timeout=1.0, **colunas):
+        """Enfileira um bloco de amostras (uma coluna por argumento)."""
+        try:
+            self._fila.put(colunas, timeout=timeout)
+        except queue.Full:
+            # O disco travou por mais de ``timeout``: melhor perder um bloco contado
+            # do que travar a composição do vídeo
+            self.blocos_descartados += 1
+
+    def fechar(self, timeout=10.0):
+        """Grava o que falta e fecha o arquivo, esperando no máximo ``timeout`` segundos.
+
+        Não trava quem chama se a fila estiver cheia ou a thread já tiver
+        morrido; se a gravação não terminar a tempo, ``erro`` diz isso.
+        """
+        limite = time.monotonic() + timeout
+        if self.is_alive():
+            try:
+                self._fila.put(_FIM, timeout=timeout)
+            except queue.Full:
+                pass
+            self.join(max(0.0, limite - time.monotonic()))
+        if self.is_alive() and self.erro is None:
+            self.erro = TimeoutError(f"a gravação de {self.caminho} não terminou em {timeout} s")
+
+    def run(self):
+        ultimo_flush = time.monotonic()
+        while True:
+            try:
+                bloco = self._fila.get(timeout=self.intervalo_flush)
+            except queue.Empty:
+                bloco = None
+            if bloco is _FIM:
+                break
+            if bloco is not None and self.erro is None:
+                self._acumular(bloco)
+            if time.monotonic() - ultimo_flush >= self.intervalo_flush:
+                self._gravar_lote()
+                self._flush(self.fsync == FSYNC_LOTE)
+                ultimo_flush = time.monotonic()
+        self._gravar_lote()
+        self._flush(self.fsync in (FSYNC_LOTE, FSYNC_FECHAMENTO))
+        try:
+            self.escritor.fechar()
+        except OSError as e:
+            if self.erro is None:
+                self.erro = e
+
+    def _acumular(self, bloco):
+        n = len(next(iter(bloco.values())))
+        inicio = 0
+        while inicio < n:
+            quantos = min(n - inicio, self.tamanho_lote - self._no_lote)
+            destino = self._lote[self._no_lote:self._no_lote + quantos]
+            for nome, valores in bloco.items():
+                destino[nome] = valores[inicio:inicio + quantos]
+            self._no_lote += quantos
+            inicio += quantos
+            if self._no_lote == self.tamanho_lote:
+                self._gravar_lote()
+
+    def _gravar_lote(self):
+        if not self._no_lote:
+            return
+        if self.erro is None:
+            try:
+                self.escritor.escrever_registros(self._lote[:self._no_lote])
+            except OSError as e:
+                self.erro = e
+            else:
+                self.lotes_gravados += 1
+        # Mesmo depois de um erro o lote é esvaziado, senão _acumular não avança
+        self._no_lote = 0
+        self._lote[:] = 0
+
+    def _flush(self, fsync):
+        if self.erro is not None:
+            return
+        try:
+            self.escritor.flush(fsync=fsync)
+        except OSError as e:
+            self.erro = e
@@ -0,0 +1,172 @@
+"""Leituras (tempo, força, impulso) desenhadas sobre o vídeo com texto UTF-8.
+
+O ``cv2.putText`` usa fontes Hershey, que não têm "ç" nem acentos, e
+rasteriza cada texto a cada quadro. ``HudLeituras`` desenha com o Pillow em
+uma imagem BGRA fixa: os rótulos uma única vez, e cada valor só quando o texto
+formatado muda (``12.34 N`` não é refeito enquanto a força não muda na
+segunda casa). Os caracteres dos valores são rasterizados uma vez cada e
+depois só copiados para a posição, e só os que mudaram. A imagem fica guardada já pré-multiplicada
+pelo alfa, e a composição no quadro é uma única mistura inteira, como a da
+marca d'água.
+"""
+import os
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from siriusgraph.composicao import misturar_premultiplicado, premultiplicar
+
+# (rótulo, formato do valor)
+CAMPOS_PADRAO = (
+    ('Tempo', '{:.2f} s'),
+    ('Força', '{:.2f} N'),
+    ('Impulso', '{:.2f} N.s'),
+    ('Impulso Total', '{:.2f} N.s'),
+)
+FONTES_CANDIDATAS = ('DejaVuSans-Bold.ttf', 'arialbd.ttf', 'Arial Bold.ttf', 'DejaVuSans.ttf', 'arial.ttf')
+
+
+def carregar_fonte(tamanho, caminho=None):
+    """Fonte TrueType com acentos: ``caminho``, a DejaVu do Matplotlib ou uma do sistema."""
+    candidatas = [caminho] if caminho else []
+    try:
+        import matplotlib
+
+        candidatas.append(os.path.join(matplotlib.get_data_path(), 'fonts', 'ttf', 'DejaVuSans-Bold.ttf'))
+    except ImportError:
+        pass
+    candidatas += FONTES_CANDIDATAS
+    for candidata in candidatas:
+        try:
+            return ImageFont.truetype(candidata, tamanho)
+        except OSError:
+            continue
+    return ImageFont.load_default(tamanho)
+
+
+class HudLeituras:
+    """Rótulos e valores empilhados a partir de ``origem`` (linha de base do primeiro rótulo).
+
+    ``cor`` é BGR, como no OpenCV. A posição dos textos repete a dos antigos
+    ``cv2.putText``: rótulo na linha de base ``y``, valor em ``y + deslocamento_valor``
+    e o próximo campo ``espacamento`` pixels abaixo.
+    """
+
+    def __init__(self, campos=CAMPOS_PADRAO, origem=(10, 30), espacamento=50, deslocamento_valor=20,
+                 tamanho_rotulo=17, tamanho_valor=22, cor=(255, 255, 255), contorno=1, fonte=None):
+        self.campos = tuple(campos)
+        self.fonte_rotulo = carregar_fonte(tamanho_rotulo, fonte)
+        self.fonte_valor = carregar_fonte(tamanho_valor, fonte)
+        self.cor = tuple(cor) + (255,)  # A imagem é BGRA: a ordem dos canais passa direto
+        self.contorno = contorno  # Borda escura que mantém o texto legível sobre fundo claro
+        self.renderizacoes = 0  # Caracteres de valores copiados para a imagem
+
+        ascendente_rotulo = self.fonte_rotulo.getmetrics()[0]
+        ascendente_valor, descendente_valor = self.fonte_valor.getmetrics()
+        margem = contorno + 1
+        # Topo da imagem no quadro e linhas de base dentro dela
+        self.x = origem[0] - margem
+        self.y = origem[1] - ascendente_rotulo - margem
+        base = ascendente_rotulo + margem
+        self._bases_rotulo = [base + i * espacamento for i in range(len(self.campos))]
+        self._bases_valor = [b + deslocamento_valor for b in self._bases_rotulo]
+        altura = self._bases_valor[-1] + descendente_valor + margem
+
+        # Largura suficiente para o maior rótulo e para valores de até 6 dígitos inteiros
+        largura = 0
+        for rotulo, formato in self.campos:
+            largura = max(largura, self.fonte_rotulo.getlength(rotulo),
+                          self.fonte_valor.getlength(formato.format(-888888.88)))
+        self.largura = int(np.ceil(largura)) + 2 * margem
+        self.altura = int(altura)
+        self._margem = margem
+
+        # Faixa de linhas de cada valor na imagem
+        self._faixas_valor = [(b - ascendente_valor - margem, min(self.altura, b + descendente_valor + margem))
+                              for b in self._bases_valor]
+
+        imagem = Image.new('RGBA', (self.largura, self.altura), (0, 0, 0, 0))
+        desenho = ImageDraw.Draw(imagem)
+        for (rotulo, _), base in zip(self.campos, self._bases_rotulo):
+            self._desenhar(desenho, (margem, base), rotulo, self.fonte_rotulo)
+        self._textos = [None] * len(self.campos)
+        self.cor_premultiplicada, self.alfa_inverso = premultiplicar(np.asarray(imagem))
+        self._acumulador = np.empty((self.altura, self.largura, 3), dtype=np.uint16)
+        self._auxiliar = np.empty_like(self._acumulador)
+
+        # Caracteres dos valores rasterizados, cada um com a largura do seu avanço (sem
+        # sobreposição), e o que cada faixa de valor mostra: [(coluna, caractere)]
+        topo, fundo = self._faixas_valor[0]
+        self._altura_faixa = fundo - topo
+        self._base_glifo = self._bases_valor[0] - topo
+        self._glifos = {}  # caractere → (cor pré-multiplicada, alfa inverso)
+        # Os rótulos podem descer para dentro da faixa do valor (ex.: "ç", "p"): cada glifo
+        # é combinado com esta cópia da camada dos rótulos em vez de sobrescrevê-la
+        self._fundos = [(self.cor_premultiplicada[t:f].copy(), self.alfa_inverso[t:f].copy())
+                        for t, f in self._faixas_valor]
+        self._celulas = [[] for _ in self.campos]
+        self._fins = [margem] * len(self.campos)  # Coluna onde termina o texto de cada valor
+
+    def _desenhar(self, desenho, posicao, texto, fonte):
+        desenho.text(posicao, texto, font=fonte, fill=self.cor, anchor='ls',
+                     stroke_width=self.contorno, stroke_fill=(0, 0, 0, 160))
+
+    def _glifo(self, caractere):
+        # Cada caractere é rasterizado uma única vez
+        glifo = self._glifos.get(caractere)
+        if glifo is None:
+            largura = max(1, int(round(self.fonte_valor.getlength(caractere))))
+            imagem = Image.new('RGBA', (largura, self._altura_faixa), (0, 0, 0, 0))
+            self._desenhar(ImageDraw.Draw(imagem), (0, self._base_glifo), caractere, self.fonte_valor)
+            glifo = self._glifos[caractere] = premultiplicar(np.asarray(imagem))
+        return glifo
+
+    def atualizar(self, valores):
+        """Recompõe os valores cujo texto mudou; devolve quantos caracteres foram copiados.
+
+        Só os caracteres que mudaram (ou mudaram de coluna) são copiados: de
+        ``12.34 s`` para ``12.37 s`` vai um glifo só.
+        """
+        copiados = 0
+        for i, ((_, formato), valor) in enumerate(zip(self.campos, valores)):
+            texto = formato.format(valor)
+            if texto == self._textos[i]:
+                continue
+            self._textos[i] = texto
+            topo, fundo = self._faixas_valor[i]
+            cor, alfa_inverso = self.cor_premultiplicada[topo:fundo], self.alfa_inverso[topo:fundo]
+            cor_fundo, alfa_fundo = self._fundos[i]
+            anteriores, celulas = self._celulas[i], []
+            x = self._margem
+            for k, caractere in enumerate(texto):
+                if x >= self.largura:
+                    break
+                celulas.append((x, caractere))
+                cor_glifo, alfa_glifo = self._glifo(caractere)
+                fim = min(x + cor_glifo.shape[1], self.largura)
+                if k >= len(anteriores) or anteriores[k] != (x, caractere):
+                    # Onde glifo e rótulo se sobrepõem fica o mais claro e o mais opaco
+                    np.maximum(cor_fundo[:, x:fim], cor_glifo[:, :fim - x], out=cor[:, x:fim])
+                    np.minimum(alfa_fundo[:, x:fim], alfa_glifo[:, :fim - x], out=alfa_inverso[:, x:fim])
+                    copiados += 1
+                x = fim
+            if self._fins[i] > x:
+                # O texto anterior era mais longo: o que sobrou volta a ser só a camada dos rótulos
+                cor[:, x:self._fins[i]] = cor_fundo[:, x:self._fins[i]]
+                alfa_inverso[:, x:self._fins[i]] = alfa_fundo[:, x:self._fins[i]]
+            self._celulas[i], self._fins[i] = celulas, x
+        self.renderizacoes += copiados
+        return copiados
+
+    def aplicar(self, frame, valores=None):
+        """Atualiza os valores (se dados) e compõe o HUD sobre ``frame`` BGR, no lugar."""
+        if valores is not None:
+            self.atualizar(valores)
+        altura, largura = frame.shape[:2]
+        x, y = max(self.x, 0), max(self.y, 0)
+        if x + self.largura > largura or y + self.altura > altura:
+            return frame  # Quadro menor que o HUD
+        regiao = frame[y:y + self.altura, x:x + self.largura]
+        misturar_premultiplicado(regiao, self.cor_premultiplicada, self.alfa_inverso,
+                                 self._acumulador, self._auxiliar)
+        return frame
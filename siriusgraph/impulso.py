@@ -0,0 +1,149 @@
+"""Cálculo de impulso e métricas da queima.
+
+O impulso é a integral da força no tempo, calculada pela regra do trapézio (ou,
+opcionalmente, Simpson) em uma única passada vetorizada. ``AcumuladorImpulso``
+faz o mesmo cálculo em blocos, carregando o estado entre eles: como a soma
+acumulada é feita na mesma ordem, o resultado ao vivo é idêntico, bit a bit, ao
+cálculo offline sobre o arquivo inteiro.
+"""
+import numpy as np
+
+# Classes de impulso total (N.s): A vai até 2,5 N.s e cada letra seguinte dobra
+LETRAS_CLASSE = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def integrar_trapezio(tempo, forca, tempo_anterior=None, forca_anterior=None, total=0.0):
+    """Retorna ``(impulso de cada intervalo, impulso acumulado)`` por amostra.
+
+    Se houver uma amostra anterior (bloco já processado), o primeiro intervalo
+    parte dela e o acumulado continua de ``total``.
+    """
+    tempo = np.asarray(tempo, dtype=np.float64)
+    forca = np.asarray(forca, dtype=np.float64)
+    n = len(tempo)
+    if tempo_anterior is None:
+        t = tempo
+        f = forca
+        areas = np.empty(n, dtype=np.float64)
+        if n:
+            areas[0] = 0.0
+        areas[1:] = 0.5 * (f[1:] + f[:-1]) * (t[1:] - t[:-1])
+    else:
+        t = np.concatenate(([tempo_anterior], tempo))
+        f = np.concatenate(([forca_anterior], forca))
+        areas = 0.5 * (f[1:] + f[:-1]) * (t[1:] - t[:-1])
+    # A soma acumulada começa pelo total anterior para preservar a ordem das somas
+    acumulado = np.cumsum(np.concatenate(([total], areas)))[1:]
+    return areas, acumulado
+
+
+def _areas_simpson(tempo, forca):
+    # Integral de cada intervalo pela parábola que passa por três pontos vizinhos
+    # (pontos i, i+1, i+2; o último intervalo usa os pontos n-3, n-2, n-1).
+    t = np.asarray(tempo, dtype=np.float64)
+    f = np.asarray(forca, dtype=np.float64)
+    h = np.diff(t)
+    areas = np.empty(len(t), dtype=np.float64)
+    areas[0] = 0.0
+
+    h1, h2 = h[:-1], h[1:]
+    H = h1 + h2
+    w0 = h1 / 2 - h1 ** 2 / (6 * H)
+    w1 = h1 * (3 * H - 2 * h1) / (6 * h2)
+    w2 = -h1 ** 3 / (6 * H * h2)
+    areas[1:-1] = w0 * f[:-2] + w1 * f[1:-1] + w2 * f[2:]
+
+    # Último intervalo: segundo trecho da parábola dos três últimos pontos
+    h1, h2 = h[-2], h[-1]
+    H = h1 + h2
+    areas[-1] = (-h2 ** 3 / (6 * H * h1) * f[-3]
+                 + h2 * (3 * H - 2 * h2) / (6 * h1) * f[-2]
+                 + (h2 / 2 - h2 ** 2 / (6 * H)) * f[-1])
+    return areas
+
+
+def impulso_acumulado(tempo, forca, metodo='trapezio'):
+    """Impulso acumulado (N.s) em cada amostra, começando em zero."""
+    if metodo == 'trapezio':
+        return integrar_trapezio(tempo, forca)[1]
+    if metodo == 'simpson':
+        if len(tempo) < 3:
+            return integrar_trapezio(tempo, forca)[1]
+        return np.cumsum(_areas_simpson(tempo, forca))
+    raise ValueError(f"Método de integração desconhecido: {metodo}")
+
+
+def impulso_total(tempo, forca, metodo='trapezio'):
+    acumulado = impulso_acumulado(tempo, forca, metodo)
+    return float(acumulado[-1]) if len(acumulado) else 0.0
+
+
+class AcumuladorImpulso:
+    """Integra a força em blocos, mantendo o estado entre um bloco e outro."""
+
+    def __init__(self):
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.tempo_anterior = None
+        self.forca_anterior = None
+        self.total = 0.0
+
+    def adicionar(self, tempo, forca):
+        """Retorna ``(impulso, impulso_total)`` para cada amostra do bloco."""
+        if len(tempo) == 0:
+            vazio = np.empty(0, dtype=np.float64)
+            return vazio, vazio.copy()
+        areas, acumulado = integrar_trapezio(tempo, forca, self.tempo_anterior, self.forca_anterior, self.total)
+        self.tempo_anterior = float(tempo[-1])
+        self.forca_anterior = float(forca[-1])
+        self.total = float(acumulado[-1])
+        return areas, acumulado
+
+
+def classe_impulso(total):
+    """Classe do motor pelo impulso total (ex.: 'G'; '1/2A' abaixo de 1,25 N.s)."""
+    if total <= 0:
+        return '-'
+    indice = int(np.ceil(np.log2(total / 2.5)))
+    if indice >= 0:
+        return LETRAS_CLASSE[min(indice, len(LETRAS_CLASSE) - 1)]
+    return f"1/{2 ** -indice}A"
+
+
+def metricas_queima(tempo, forca, limiar_relativo=0.05, limiar=None):
+    """Empuxo máximo, tempo de queima, empuxo médio, impulso total e classe.
+
+    A queima vai da primeira à última amostra com força acima do limiar
+    (por padrão, 5% do empuxo máximo).
+    """
+    tempo = np.asarray(tempo, dtype=np.float64)
+    forca = np.asarray(forca, dtype=np.float64)
+    if len(tempo) == 0:
+        return {'empuxo_maximo': 0.0, 'tempo_pico': 0.0, 'inicio_queima': 0.0, 'fim_queima': 0.0,
+                'tempo_queima': 0.0, 'empuxo_medio': 0.0, 'impulso_total': 0.0, 'classe': '-'}
+
+    i_pico = int(np.argmax(forca))
+    empuxo_maximo = float(forca[i_pico])
+    if limiar is None:
+        limiar = limiar_relativo * empuxo_maximo
+    acima = np.flatnonzero(forca > limiar)
+    acumulado = impulso_acumulado(tempo, forca)
+    total = float(acumulado[-1])
+    if len(acima):
+        i0, i1 = acima[0], acima[-1]
+        inicio, fim = float(tempo[i0]), float(tempo[i1])
+        impulso_queima = float(acumulado[i1] - acumulado[i0])
+    else:
+        inicio = fim = impulso_queima = 0.0
+    duracao = fim - inicio
+    return {
+        'empuxo_maximo': empuxo_maximo,
+        'tempo_pico': float(tempo[i_pico]),
+        'inicio_queima': inicio,
+        'fim_queima': fim,
+        'tempo_queima': duracao,
+        'empuxo_medio': impulso_queima / duracao if duracao > 0 else 0.0,
+        'impulso_total': total,
+        'classe': classe_impulso(total),
+    }
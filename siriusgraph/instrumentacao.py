@@ -0,0 +1,225 @@
+"""Tempos por etapa e contadores do laço de vídeo ao vivo, para achar o que engasga.
+
+Uso::
+
+    instrumentacao = Instrumentacao()
+    with instrumentacao.etapa('grafico'):
+        imagem = grafico.atualizar(tempos, forcas)
+    instrumentacao.contar('amostras', len(tempos))
+    ...
+    instrumentacao.exportar('desempenho.json')  # ou .csv
+
+Cada etapa guarda as últimas ``janela`` durações em um array circular, de onde
+saem p50/p95/p99, e, com ``rastro``, as últimas ``tamanho_rastro`` medidas
+(início e duração) para exportar no fim; o padrão cobre 10 min a 30 quadros/s
+e limita a memória de sessões longas. Contadores dão o total e a taxa por segundo dos
+últimos ``janela_taxa`` segundos (quadros/s, amostras/s). Cada medida custa
+cerca de 1 µs; desligada, ``DESLIGADA`` aceita as mesmas chamadas sem fazer nada.
+
+Uma mesma etapa deve ser medida por uma única thread por vez; etapas
+diferentes podem ser medidas em threads diferentes.
+"""
+import collections
+import contextlib
+import csv
+import json
+import time
+
+import numpy as np
+
+
+class _Cronometro:
+    # Gerenciador de contexto reaproveitado por etapa, para não alocar a cada medida
+    __slots__ = ('_instrumentacao', '_nome', '_inicio')
+
+    def __init__(self, instrumentacao, nome):
+        self._instrumentacao = instrumentacao
+        self._nome = nome
+        self._inicio = 0.0
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excecao):
+        fim = time.perf_counter()
+        self._instrumentacao.registrar(self._nome, fim - self._inicio, self._inicio)
+        return False
+
+
+class _Etapa:
+    __slots__ = ('duracoes', 'n', 'rastro')
+
+    def __init__(self, janela, tamanho_rastro):
+        self.duracoes = np.zeros(janela, dtype=np.float64)
+        self.n = 0
+        self.rastro = collections.deque(maxlen=tamanho_rastro)  # (início, duração)
+
+
+class Instrumentacao:
+    ativa = True
+
+    def __init__(self, janela=300, janela_taxa=2.0, rastro=True, tamanho_rastro=18000):
+        self.janela = int(janela)
+        self.janela_taxa = float(janela_taxa)
+        self.rastro = rastro
+        self.tamanho_rastro = int(tamanho_rastro)
+        self.origem = time.perf_counter()  # Zero dos instantes exportados
+        self._etapas = {}
+        self._cronometros = {}
+        self._contadores = {}  # nome → [total, deque de (instante, quantidade)]
+
+    def etapa(self, nome):
+        """Gerenciador de contexto que mede o bloco ``with`` como a etapa ``nome``."""
+        cronometro = self._cronometros.get(nome)
+        if cronometro is None:
+            cronometro = self._cronometros[nome] = _Cronometro(self, nome)
+        return cronometro
+
+    def registrar(self, nome, duracao, inicio=None):
+        """Registra uma duração (s) já medida; ``inicio`` é um ``time.perf_counter()``."""
+        etapa = self._etapas.get(nome)
+        if etapa is None:
+            etapa = self._etapas[nome] = _Etapa(self.janela, self.tamanho_rastro)
+        etapa.duracoes[etapa.n % self.janela] = duracao
+        etapa.n += 1
+        if self.rastro:
+            etapa.rastro.append((time.perf_counter() - duracao if inicio is None else inicio, duracao))
+
+    def contar(self, nome, quantidade=1):
+        contador = self._contadores.get(nome)
+        if contador is None:
+            contador = self._contadores[nome] = [0, collections.deque()]
+        agora = time.perf_counter()
+        contador[0] += quantidade
+        recentes = contador[1]
+        recentes.append((agora, quantidade))
+        while recentes[0][0] < agora - self.janela_taxa:
+            recentes.popleft()
+
+    def taxa(self, nome):
+        """Quantidade por segundo do contador ``nome`` nos últimos ``janela_taxa`` segundos."""
+        contador = self._contadores.get(nome)
+        if contador is None:
+            return 0.0
+        limite = time.perf_counter() - self.janela_taxa
+        recentes = [(t, q) for t, q in list(contador[1]) if t >= limite]
+        if len(recentes) < 2:
+            return 0.0
+        # O primeiro evento só marca o início do intervalo
+        return sum(q for _, q in recentes[1:]) / (recentes[-1][0] - recentes[0][0])
+
+    def percentis(self, nome):
+        """(p50, p95, p99, máximo) em ms das últimas ``janela`` medidas de ``nome``."""
+        etapa = self._etapas.get(nome)
+        if etapa is None or etapa.n == 0:
+            return 0.0, 0.0, 0.0, 0.0
+        duracoes = etapa.duracoes[:min(etapa.n, self.janela)] * 1e3
+        p50, p95, p99 = np.percentile(duracoes, (50, 95, 99))
+        return float(p50), float(p95), float(p99), float(duracoes.max())
+
+    def resumo(self):
+        etapas = {}
+        for nome, etapa in list(self._etapas.items()):
+            p50, p95, p99, maximo = self.percentis(nome)
+            etapas[nome] = {'medidas': etapa.n, 'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'max_ms': maximo}
+        contadores = {nome: {'total': contador[0], 'por_segundo': self.taxa(nome)}
+                      for nome, contador in list(self._contadores.items())}
+        return {'etapas': etapas, 'contadores': contadores}
+
+    def eventos(self):
+        """Medidas do rastro, ordenadas: [(etapa, início em s desde ``origem``, duração em ms)]."""
+        eventos = [(nome, inicio - self.origem, duracao * 1e3)
+                   for nome, etapa in list(self._etapas.items()) for inicio, duracao in list(etapa.rastro)]
+        eventos.sort(key=lambda evento: evento[1])
+        return eventos
+
+    def exportar(self, caminho, **extras):
+        """Grava o rastro em CSV (uma linha por medida) ou JSON (resumo, ``extras`` e medidas)."""
+        if caminho.lower().endswith('.csv'):
+            with open(caminho, 'w', newline='') as f:
+                escritor = csv.writer(f)
+                escritor.writerow(('etapa', 'inicio_s', 'duracao_ms'))
+                escritor.writerows((nome, f"{inicio:.6f}", f"{duracao:.4f}")
+                                   for nome, inicio, duracao in self.eventos())
+        else:
+            dados = dict(self.resumo(), **extras)
+            dados['eventos'] = [{'etapa': nome, 'inicio_s': round(inicio, 6), 'duracao_ms': round(duracao, 4)}
+                                for nome, inicio, duracao in self.eventos()]
+            with open(caminho, 'w') as f:
+                json.dump(dados, f, indent=1)
+        return caminho
+
+
+class InstrumentacaoDesligada:
+    """Mesma interface da ``Instrumentacao``, sem medir nada."""
+
+    ativa = False
+    _nulo = contextlib.nullcontext()
+
+    def etapa(self, nome):
+        return self._nulo
+
+    def registrar(self, nome, duracao, inicio=None):
+        pass
+
+    def contar(self, nome, quantidade=1):
+        pass
+
+    def taxa(self, nome):
+        return 0.0
+
+    def percentis(self, nome):
+        return 0.0, 0.0, 0.0, 0.0
+
+    def resumo(self):
+        return {'etapas': {}, 'contadores': {}}
+
+    def eventos(self):
+        return []
+
+
+DESLIGADA = InstrumentacaoDesligada()
+
+
+class HudDepuracao:
+    """Tabela de p50/p95/p99 por etapa e das taxas dos contadores, desenhada sobre o quadro.
+
+    O texto é recalculado a cada ``intervalo`` segundos, não a cada quadro.
+    """
+
+    COLUNAS = (0, 110, 170, 230)  # x de cada coluna da tabela, em pixels
+
+    def __init__(self, instrumentacao, intervalo=0.5, origem=(10, 250), altura_linha=18):
+        self.instrumentacao = instrumentacao
+        self.intervalo = intervalo
+        self.origem = origem
+        self.altura_linha = altura_linha
+        self._linhas = []
+        self._atualizado = 0.0
+
+    def linhas(self):
+        """Células de cada linha: taxas dos contadores, cabeçalho e uma linha por etapa."""
+        resumo = self.instrumentacao.resumo()
+        linhas = [("  ".join(f"{nome} {c['por_segundo']:.1f}/s" for nome, c in resumo['contadores'].items()),),
+                  ('etapa (ms)', 'p50', 'p95', 'p99')]
+        for nome, e in resumo['etapas'].items():
+            linhas.append((nome, f"{e['p50_ms']:.2f}", f"{e['p95_ms']:.2f}", f"{e['p99_ms']:.2f}"))
+        return linhas
+
+    def aplicar(self, frame):
+        import cv2
+
+        agora = time.perf_counter()
+        if agora - self._atualizado >= self.intervalo:
+            self._linhas = self.linhas()
+            self._atualizado = agora
+        x, y = self.origem
+        for linha in self._linhas:
+            for coluna, texto in zip(self.COLUNAS, linha):
+                # Contorno preto e texto amarelo, legíveis sobre qualquer fundo
+                posicao = (x + coluna, y)
+                cv2.putText(frame, texto, posicao, cv2.FONT_HERSHEY_PLAIN, 1.0, (0, 0, 0), 3, cv2.LINE_AA)
+                cv2.putText(frame, texto, posicao, cv2.FONT_HERSHEY_PLAIN, 1.0, (0, 255, 255), 1, cv2.LINE_AA)
+            y += self.altura_linha
+        return frame
@@ -0,0 +1,221 @@
+"""Leitura dos arquivos de dados da bancada.
+
+``ler_dados_arquivo`` lê um arquivo inteiro de uma vez (análise offline). Para o
+vídeo ao vivo, ``SeguidorArquivo`` acompanha o arquivo enquanto ele cresce:
+guarda a posição em bytes já lida e interpreta só as linhas novas, acumulando-as
+em um ``BufferColunar``.
+"""
+import os
+
+import numpy as np
+
+from siriusgraph.impulso import integrar_trapezio
+
+# Formatos de arquivo conhecidos:
+# - 'bancada': colunas tempo forca pressao separadas por espaço, sem cabeçalho (certo.py)
+# - 'log': logs da bancada com uma linha de cabeçalho em latin1 (bin/main.py)
+# - 'calibracao': calibration_data.txt gravado pela interface (tempo,forca,impulso,impulso_total)
+# Só tempo e força são obrigatórios; colunas extras ausentes viram NaN.
+FORMATOS = {
+    'bancada': {'colunas': ('tempo', 'forca', 'pressao'), 'linhas_cabecalho': 0, 'encoding': 'utf-8'},
+    'log': {'colunas': ('tempo', 'forca'), 'linhas_cabecalho': 1, 'encoding': 'latin1'},
+    'calibracao': {'colunas': ('tempo', 'forca', 'impulso', 'impulso_total'), 'linhas_cabecalho': 0,
+                   'encoding': 'utf-8'},
+}
+
+
+# Função para ler os dados do arquivo inteiro e gerar o dataset
+def ler_dados_arquivo(caminho_arquivo, formato='bancada'):
+    import pandas as pd  # Só a análise offline precisa do pandas; o acompanhamento ao vivo não
+
+    config = FORMATOS[formato]
+    try:
+        df = pd.read_csv(caminho_arquivo, sep=r'[\s,]+', engine='python', header=None,
+                         skiprows=config['linhas_cabecalho'], encoding=config['encoding'],
+                         names=list(config['colunas']))
+        return df
+    except Exception as e:
+        print(f"Erro ao ler o arquivo: {e}")
+        return None
+
+
+class BufferColunar:
+    """Colunas NumPy que crescem por duplicação (custo amortizado O(1) por linha)."""
+
+    def __init__(self, colunas, capacidade=4096):
+        self.colunas = tuple(colunas)
+        self.tamanho = 0
+        self._dados = {nome: np.zeros(capacidade, dtype=np.float64) for nome in self.colunas}
+
+    def __len__(self):
+        return self.tamanho
+
+    def __getitem__(self, nome):
+        # Visão (sem cópia) das linhas válidas da coluna
+        return self._dados[nome][:self.tamanho]
+
+    def __contains__(self, nome):
+        return nome in self._dados
+
+    def adicionar_coluna(self, nome):
+        if nome not in self._dados:
+            self._dados[nome] = np.zeros(len(next(iter(self._dados.values()))), dtype=np.float64)
+            self.colunas += (nome,)
+
+    def _garantir_capacidade(self, necessario):
+        capacidade = len(next(iter(self._dados.values())))
+        if necessario <= capacidade:
+            return
+        while capacidade < necessario:
+            capacidade *= 2
+        for nome, coluna in self._dados.items():
+            nova = np.zeros(capacidade, dtype=np.float64)
+            nova[:self.tamanho] = coluna[:self.tamanho]
+            self._dados[nome] = nova
+
+    def adicionar(self, **colunas):
+        """Acrescenta linhas; colunas omitidas ficam com zero."""
+        n = len(next(iter(colunas.values())))
+        self._garantir_capacidade(self.tamanho + n)
+        for nome, valores in colunas.items():
+            self._dados[nome][self.tamanho:self.tamanho + n] = valores
+        self.tamanho += n
+        return n
+
+    def limpar(self):
+        self.tamanho = 0
+
+    def para_dataframe(self):
+        import pandas as pd
+
+        return pd.DataFrame({nome: self[nome].copy() for nome in self.colunas})
+
+
+class SeguidorArquivo:
+    """Acompanha um arquivo de dados que está sendo escrito (como ``tail -f``)."""
+
+    def __init__(self, caminho_arquivo, formato='bancada', buffer=None):
+        config = FORMATOS[formato]
+        self.caminho = caminho_arquivo
+        self.colunas = config['colunas']
+        self.encoding = config['encoding']
+        self.linhas_cabecalho = config['linhas_cabecalho']
+        self.buffer = buffer if buffer is not None else BufferColunar(self.colunas)
+        self.posicao = 0  # Bytes já consumidos do arquivo
+        self._cabecalho_restante = self.linhas_cabecalho
+        self._resto = b''  # Linha parcial (ainda sem '\n') do fim do arquivo
+        self.linhas_invalidas = 0
+
+    def reiniciar(self):
+        self.posicao = 0
+        self._cabecalho_restante = self.linhas_cabecalho
+        self._resto = b''
+        self.buffer.limpar()
+
+    def ler_novos(self, ate_o_fim=False):
+        """Lê o que foi acrescentado desde a última chamada; retorna quantas linhas entraram.
+
+        Com ``ate_o_fim=True`` a linha final sem '\\n' também é lida (arquivo já fechado).
+        """
+        try:
+            tamanho = os.path.getsize(self.caminho)
+        except OSError:
+            return 0
+        if tamanho < self.posicao:
+            # Arquivo truncado ou recriado: recomeça do início
+            self.reiniciar()
+        bloco = b''
+        if tamanho > self.posicao:
+            with open(self.caminho, 'rb') as f:
+                f.seek(self.posicao)
+                bloco = f.read(tamanho - self.posicao)
+            self.posicao += len(bloco)
+
+        bloco = self._resto + bloco
+        if ate_o_fim and bloco and not bloco.endswith(b'\n'):
+            bloco += b'\n'
+        corte = bloco.rfind(b'\n')
+        if corte < 0:
+            self._resto = bloco
+            return 0
+        self._resto = bloco[corte + 1:]
+        linhas = bloco[:corte].splitlines()
+
+        if self._cabecalho_restante:
+            pular = min(self._cabecalho_restante, len(linhas))
+            linhas = linhas[pular:]
+            self._cabecalho_restante -= pular
+        if not linhas:
+            return 0
+        return self._interpretar(linhas)
+
+    def _interpretar(self, linhas):
+        # Linhas em branco não são dados e desalinhariam a contagem dos caminhos rápidos
+        linhas = [linha for linha in linhas if linha.strip()]
+        if not linhas:
+            return 0
+        ncol = len(self.colunas)
+        # Os caminhos rápidos só valem se todas as linhas têm o mesmo número de campos:
+        # com 1 + 3 ou 2 + 4 campos o total bate, mas o reshape desalinharia tempo e força
+        bloco = b'\n'.join(linhas).replace(b',', b' ')
+        larguras = _campos_por_linha(bloco)
+        largura = int(larguras[0]) if (larguras == larguras[0]).all() else None
+        valores = None
+        if largura == ncol or (largura == 2 and ncol > 2):
+            try:
+                valores = np.array(bloco.decode(self.encoding, errors='replace').split(), dtype=np.float64)
+            except ValueError:
+                valores = None
+        if valores is not None and largura == 2 and ncol > 2:
+            # Arquivo só com tempo e força (ex.: bin/dados.txt)
+            matriz = valores.reshape(-1, 2)
+            return self.buffer.adicionar(tempo=matriz[:, 0], forca=matriz[:, 1],
+                                         **{nome: np.nan for nome in self.colunas[2:]})
+        if valores is None:
+            # Caminho lento: há linhas com lixo ou com número errado de colunas
+            validas = []
+            for linha in linhas:
+                campos = linha.replace(b',', b' ').split()
+                if len(campos) < 2:
+                    self.linhas_invalidas += 1
+                    continue
+                campos = campos[:ncol] + [b'nan'] * (ncol - len(campos))
+                try:
+                    validas.append([float(c) for c in campos])
+                except ValueError:
+                    self.linhas_invalidas += 1
+            if not validas:
+                return 0
+            valores = np.array(validas, dtype=np.float64)
+        matriz = valores.reshape(-1, ncol)
+        return self.buffer.adicionar(**{nome: matriz[:, i] for i, nome in enumerate(self.colunas)})
+
+
+def _campos_por_linha(bloco):
+    # Número de campos de cada linha de ``bloco`` (separadas por \n, campos por espaços),
+    # contando os inícios de campo antes de cada quebra em NumPy em vez de dividir linha a linha
+    caracteres = np.frombuffer(bloco, dtype=np.uint8)
+    separador = caracteres <= 32  # Espaço, tabulação e quebras de linha
+    inicio = ~separador
+    inicio[1:] &= separador[:-1]
+    inicios = np.flatnonzero(inicio)
+    antes = np.searchsorted(inicios, np.flatnonzero(caracteres == 10))
+    return np.diff(antes, prepend=0, append=len(inicios))
+
+
+# Função para calcular impulso e total de impulso apenas nas linhas novas
+def calcular_impulso(buffer, inicio=0):
+    for nome in ('impulso', 'impulso_total'):
+        buffer.adicionar_coluna(nome)
+    if inicio >= len(buffer):
+        return buffer
+    tempo, forca = buffer['tempo'], buffer['forca']
+    if inicio > 0:
+        # Continua a integração a partir da última linha já calculada
+        anterior = (tempo[inicio - 1], forca[inicio - 1], buffer['impulso_total'][inicio - 1])
+    else:
+        anterior = (None, None, 0.0)
+    impulso, impulso_total = integrar_trapezio(tempo[inicio:], forca[inicio:], *anterior)
+    buffer['impulso'][inicio:] = impulso
+    buffer['impulso_total'][inicio:] = impulso_total
+    return buffer
@@ -0,0 +1,187 @@
+"""Pós-processamento em lote das corridas, sem interface gráfica.
+
+Procura corridas nos diretórios indicados (arquivos ``.srun`` e os
+``calibration_data.txt`` das pastas ``calibration_data_AAAAMMDD_HHMMSS``, além de
+outros ``.txt`` no formato escolhido), calcula as métricas da queima de cada uma
+em um pool de processos e grava, no diretório de saída, um PNG com a curva de
+empuxo e um JSON com as métricas por corrida, mais a tabela ``resumo.csv``.
+Corridas cujas saídas são mais novas que o arquivo de origem e foram calculadas
+com o mesmo limiar não são refeitas.
+
+Uso::
+
+    python -m siriusgraph.lote dados/ --saida relatorio/ --processos 8
+"""
+import argparse
+import concurrent.futures
+import csv
+import json
+import os
+
+import numpy as np
+
+from siriusgraph.formato import ASSINATURA, abrir_corrida
+from siriusgraph.impulso import metricas_queima
+from siriusgraph.leitura import FORMATOS, SeguidorArquivo
+
+COLUNAS_RESUMO = ('corrida', 'origem', 'amostras', 'empuxo_maximo', 'tempo_pico', 'tempo_queima',
+                  'empuxo_medio', 'impulso_total', 'classe')
+
+
+def _eh_srun(caminho):
+    with open(caminho, 'rb') as f:
+        return f.read(len(ASSINATURA)) == ASSINATURA
+
+
+def carregar_tempo_forca(caminho, formato='calibracao'):
+    """Retorna ``(tempo, forca)`` de uma corrida ``.srun`` ou de texto."""
+    if caminho.endswith('.srun') or _eh_srun(caminho):
+        corrida = abrir_corrida(caminho)
+        return np.asarray(corrida['tempo'], dtype=np.float64), np.asarray(corrida['forca'], dtype=np.float64)
+    seguidor = SeguidorArquivo(caminho, formato=formato)
+    seguidor.ler_novos(ate_o_fim=True)
+    return seguidor.buffer['tempo'].copy(), seguidor.buffer['forca'].copy()
+
+
+def encontrar_corridas(diretorios, formato='calibracao'):
+    """Lista ``(caminho, formato)`` das corridas encontradas, sem repetir a mesma corrida."""
+    corridas = []
+    for diretorio in diretorios:
+        if os.path.isfile(diretorio):
+            corridas.append((diretorio, formato))
+            continue
+        for raiz, _, arquivos in os.walk(diretorio):
+            arquivos = set(arquivos)
+            # Na pasta de uma gravação da interface, o .srun é a fonte; o .txt é só exportação
+            if 'calibration_data.srun' in arquivos:
+                arquivos.discard('calibration_data.txt')
+            for nome in sorted(arquivos):
+                caminho = os.path.join(raiz, nome)
+                if nome.endswith('.srun'):
+                    corridas.append((caminho, formato))
+                elif nome == 'calibration_data.txt':
+                    corridas.append((caminho, 'calibracao'))
+                elif nome.endswith('.txt') and formato != 'calibracao':
+                    corridas.append((caminho, formato))
+    return corridas
+
+
+def nome_corrida(caminho, base):
+    relativo = os.path.relpath(caminho, base) if base else os.path.basename(caminho)
+    return os.path.splitext(relativo)[0].replace(os.sep, '__').replace('/', '__')
+
+
+def _atualizado(origem, saidas):
+    try:
+        referencia = os.path.getmtime(origem)
+        return all(os.path.getmtime(saida) >= referencia for saida in saidas)
+    except OSError:
+        return False
+
+
+def salvar_grafico(caminho_png, tempo, forca, titulo, metricas):
+    # Figure direta (sem pyplot), segura dentro dos processos do pool
+    from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 5), dpi=100)
+    FigureCanvas(fig)
+    ax = fig.add_subplot()
+    ax.plot(tempo, forca, color='purple', label='Força (N)')
+    if metricas['tempo_queima'] > 0:
+        ax.axvspan(metricas['inicio_queima'], metricas['fim_queima'], color='orange', alpha=0.15,
+                   label='Queima')
+    ax.set_title(f"{titulo} — {metricas['impulso_total']:.2f} N.s ({metricas['classe']})")
+    ax.set_xlabel('Tempo (s)')
+    ax.set_ylabel('Força (N)')
+    ax.grid(True)
+    ax.legend(loc='upper right')
+    fig.savefig(caminho_png)
+
+
+def _resultado_anterior(caminho, caminho_json, caminho_png, limiar_relativo):
+    # Linha já calculada com o mesmo limiar e mais nova que a corrida, ou None
+    if not _atualizado(caminho, (caminho_json,)):
+        return None
+    try:
+        with open(caminho_json) as f:
+            linha = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if linha.get('limiar_relativo') != limiar_relativo:
+        return None
+    if linha.get('amostras') and not _atualizado(caminho, (caminho_png,)):
+        return None  # Corridas vazias não têm gráfico
+    return linha
+
+
+def processar_corrida(caminho, formato, saida, nome, forcar=False, limiar_relativo=0.05):
+    """Processa uma corrida (roda dentro do pool); retorna a linha do resumo."""
+    caminho_json = os.path.join(saida, nome + '.json')
+    caminho_png = os.path.join(saida, nome + '.png')
+    if not forcar:
+        linha = _resultado_anterior(caminho, caminho_json, caminho_png, limiar_relativo)
+        if linha is not None:
+            return linha
+
+    tempo, forca = carregar_tempo_forca(caminho, formato)
+    metricas = metricas_queima(tempo, forca, limiar_relativo=limiar_relativo)
+    linha = {'corrida': nome, 'origem': caminho, 'amostras': int(len(tempo)), **metricas,
+             'limiar_relativo': limiar_relativo}
+    if len(tempo):
+        salvar_grafico(caminho_png, tempo, forca, nome, metricas)
+    with open(caminho_json, 'w') as f:
+        json.dump(linha, f, indent=2)
+    return linha
+
+
+def processar_lote(diretorios, saida, formato='calibracao', processos=None, forcar=False,
+                   limiar_relativo=0.05):
+    os.makedirs(saida, exist_ok=True)
+    corridas = encontrar_corridas(diretorios, formato)
+    base = os.path.commonpath([os.path.abspath(d) for d in diretorios]) if diretorios else None
+    if base and os.path.isfile(base):
+        base = os.path.dirname(base)
+    linhas, erros = [], []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processos) as pool:
+        futuros = {
+            pool.submit(processar_corrida, caminho, fmt, saida,
+                        nome_corrida(os.path.abspath(caminho), base), forcar, limiar_relativo): caminho
+            for caminho, fmt in corridas
+        }
+        for futuro in concurrent.futures.as_completed(futuros):
+            try:
+                linhas.append(futuro.result())
+            except Exception as e:
+                erros.append((futuros[futuro], e))
+                print(f"Erro ao processar {futuros[futuro]}: {e}")
+
+    linhas.sort(key=lambda linha: linha['corrida'])
+    with open(os.path.join(saida, 'resumo.csv'), 'w', newline='') as f:
+        escritor = csv.DictWriter(f, fieldnames=COLUNAS_RESUMO, extrasaction='ignore')
+        escritor.writeheader()
+        escritor.writerows(linhas)
+    return linhas, erros
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calcula métricas e gráficos de todas as corridas")
+    parser.add_argument('diretorios', nargs='+', help="diretórios (ou arquivos) com corridas")
+    parser.add_argument('--saida', default='relatorio', help="diretório dos PNGs, JSONs e resumo.csv")
+    parser.add_argument('--formato', default='calibracao', choices=sorted(FORMATOS),
+                        help="formato dos arquivos de texto avulsos")
+    parser.add_argument('--processos', type=int, default=None, help="processos do pool (padrão: núcleos)")
+    parser.add_argument('--limiar', type=float, default=0.05,
+                        help="fração do empuxo máximo que define o início e o fim da queima")
+    parser.add_argument('--forcar', action='store_true', help="refaz corridas já processadas")
+    args = parser.parse_args(argv)
+
+    linhas, erros = processar_lote(args.diretorios, args.saida, args.formato, args.processos,
+                                   args.forcar, args.limiar)
+    print(f"{len(linhas)} corridas processadas, {len(erros)} com erro. Resumo em "
+          f"{os.path.join(args.saida, 'resumo.csv')}")
+    return 1 if erros else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
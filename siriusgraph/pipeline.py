@@ -0,0 +1,294 @@
+"""Pipeline de vídeo em etapas: captura → composição → exibição / gravação.
+
+Cada etapa roda na sua própria thread e conversa com a seguinte por uma fila
+limitada. A política de cada fila define o que acontece quando ela enche:
+
+- ``descartar_antigo``: o item mais velho sai para dar lugar ao novo (exibição,
+  onde só importa o quadro mais recente);
+- ``bloquear``: quem produz espera (tudo o que vai para a gravação, que nunca
+  pode perder quadros: com gravação, a fila da composição também bloqueia, e
+  uma composição lenta segura a captura em vez de descartar quadros).
+
+Latência por etapa e profundidade das filas ficam disponíveis em ``metricas()``;
+com uma ``Instrumentacao``, as durações de cada etapa também vão para ela. Um
+item que falha em uma etapa é pulado e a falha fica contada; ``novos_erros()``
+entrega cada erro diferente uma vez, para a interface avisar o usuário.
+"""
+import collections
+import threading
+import time
+
+import numpy as np
+
+from siriusgraph.instrumentacao import DESLIGADA
+
+DESCARTAR_ANTIGO = 'descartar_antigo'
+BLOQUEAR = 'bloquear'
+
+FIM = object()  # Sentinela que encerra as etapas em cascata
+
+
+class Quadro:
+    """Quadro da câmera com o instante de captura (relógio monotônico).
+
+    ``exibicao`` é a imagem para a tela quando ``imagem`` não serve para isso
+    (ex.: o JPEG da captura bruta, gravado sem decodificar).
+    """
+
+    __slots__ = ('indice', 'instante', 'imagem', 'dados', 'exibicao')
+
+    def __init__(self, indice, instante, imagem, dados=None):
+        self.indice = indice
+        self.instante = instante
+        self.imagem = imagem
+        self.dados = dados
+        self.exibicao = None
+
+
+class FilaLimitada:
+    def __init__(self, capacidade, politica=BLOQUEAR):
+        self.capacidade = capacidade
+        self.politica = politica
+        self._itens = collections.deque()
+        self._condicao = threading.Condition()
+        self.descartados = 0
+        self.esperas = 0  # Vezes em que quem produz esperou a fila esvaziar
+        self.profundidade_maxima = 0
+
+    def __len__(self):
+        return len(self._itens)
+
+    def colocar(self, item):
+        with self._condicao:
+            if item is not FIM:
+                if self.politica == DESCARTAR_ANTIGO:
+                    while len(self._itens) >= self.capacidade:
+                        self._itens.popleft()
+                        self.descartados += 1
+                elif len(self._itens) >= self.capacidade:
+                    self.esperas += 1
+                    while len(self._itens) >= self.capacidade:
+                        self._condicao.wait()
+            self._itens.append(item)
+            self.profundidade_maxima = max(self.profundidade_maxima, len(self._itens))
+            self._condicao.notify_all()
+
+    def retirar(self, timeout=None):
+        """Retira o próximo item; retorna ``None`` se o tempo acabar."""
+        with self._condicao:
+            if not self._itens and not self._condicao.wait_for(lambda: self._itens, timeout):
+                return None
+            item = self._itens.popleft()
+            self._condicao.notify_all()
+            return item
+
+    def retirar_mais_recente(self):
+        """Descarta o que estiver atrasado e devolve só o último item (ou ``None``)."""
+        with self._condicao:
+            if not self._itens:
+                return None
+            item = self._itens.pop()
+            if item is not FIM:
+                self.descartados += len(self._itens)
+                self._itens.clear()
+            self._condicao.notify_all()
+            return item
+
+
+class MetricasEtapa:
+    def __init__(self, janela=300):
+        self.duracoes = collections.deque(maxlen=janela)
+        self.processados = 0
+        self._inicio = time.monotonic()
+
+    def registrar(self, duracao):
+        self.duracoes.append(duracao)
+        self.processados += 1
+
+    def resumo(self):
+        duracoes = np.fromiter(self.duracoes, dtype=np.float64) * 1e3
+        decorrido = time.monotonic() - self._inicio
+        if len(duracoes):
+            p50, p95, p99 = np.percentile(duracoes, (50, 95, 99))
+        else:
+            p50 = p95 = p99 = 0.0
+        return {
+            'processados': self.processados,
+            'por_segundo': self.processados / decorrido if decorrido > 0 else 0.0,
+            'latencia_p50_ms': float(p50),
+            'latencia_p95_ms': float(p95),
+            'latencia_p99_ms': float(p99),
+        }
+
+
+class Etapa(threading.Thread):
+    """Aplica ``funcao`` a cada item da fila de entrada e repassa o resultado.
+
+    Se ``funcao`` retornar ``None`` o item não segue adiante. Se levantar uma
+    exceção, só aquele item se perde: ``falhas`` é incrementado, a exceção fica
+    em ``erro`` e a etapa segue com o próximo.
+    """
+
+    def __init__(self, nome, funcao, entrada, saidas=(), instrumentacao=DESLIGADA):
+        super().__init__(name=nome, daemon=True)
+        self.nome = nome
+        self.funcao = funcao
+        self.entrada = entrada
+        self.saidas = list(saidas)
+        self.metricas = MetricasEtapa()
+        self.instrumentacao = instrumentacao
+        self.erro = None  # Última exceção de ``funcao``
+        self.falhas = 0
+
+    def run(self):
+        while True:
+            item = self.entrada.retirar()
+            if item is FIM:
+                break
+            inicio = time.perf_counter()
+            try:
+                resultado = self.funcao(item)
+            except Exception as e:
+                self.erro = e
+                self.falhas += 1
+                continue
+            duracao = time.perf_counter() - inicio
+            self.metricas.registrar(duracao)
+            self.instrumentacao.registrar(self.nome, duracao, inicio)
+            if resultado is not None:
+                for saida in self.saidas:
+                    saida.colocar(resultado)
+        for saida in self.saidas:
+            saida.colocar(FIM)
+
+
+class EtapaCaptura(threading.Thread):
+    """Lê quadros da câmera o mais rápido possível e os carimba com o horário."""
+
+    def __init__(self, captura, saidas, instrumentacao=DESLIGADA):
+        super().__init__(name='captura', daemon=True)
+        self.nome = 'captura'
+        self.captura = captura
+        self.saidas = list(saidas)
+        self.metricas = MetricasEtapa()
+        self.instrumentacao = instrumentacao
+        self._parar = threading.Event()
+
+    def parar(self):
+        self._parar.set()
+
+    def run(self):
+        indice = 0
+        while not self._parar.is_set():
+            inicio = time.perf_counter()
+            ret, imagem = self.captura.read()
+            instante = time.monotonic()
+            if not ret:
+                break
+            duracao = time.perf_counter() - inicio
+            self.metricas.registrar(duracao)
+            self.instrumentacao.registrar(self.nome, duracao, inicio)
+            self.instrumentacao.contar('quadros_capturados')
+            quadro = Quadro(indice, instante, imagem)
+            for saida in self.saidas:
+                saida.colocar(quadro)
+            indice += 1
+        for saida in self.saidas:
+            saida.colocar(FIM)
+
+
+class PipelineVideo:
+    """Monta captura → composição → (exibição, gravação).
+
+    ``compor(quadro)`` recebe um ``Quadro`` e deve devolvê-lo com ``imagem``
+    já composta. ``gravar(quadro)`` roda na etapa de gravação e recebe todos os
+    quadros capturados, compostos e na ordem, sem descarte: com ``gravar`` a
+    fila da composição bloqueia (até ``capacidade_composicao`` quadros absorvem
+    picos da composição; além disso a captura espera, contado em
+    ``esperas_captura``). Só a exibição descarta, ficando com o quadro mais
+    recente; ela é consumida pela thread da interface com
+    ``quadro_para_exibir()`` (o OpenCV/Tk exigem a thread principal).
+    """
+
+    def __init__(self, captura, compor, gravar=None, capacidade_gravacao=120, instrumentacao=DESLIGADA,
+                 capacidade_composicao=30):
+        if gravar is not None:
+            self.fila_composicao = FilaLimitada(capacidade_composicao, BLOQUEAR)
+        else:
+            self.fila_composicao = FilaLimitada(2, DESCARTAR_ANTIGO)
+        self.fila_exibicao = FilaLimitada(2, DESCARTAR_ANTIGO)
+        saidas = [self.fila_exibicao]
+        self.fila_gravacao = None
+        if gravar is not None:
+            self.fila_gravacao = FilaLimitada(capacidade_gravacao, BLOQUEAR)
+            saidas.append(self.fila_gravacao)
+
+        self.instrumentacao = instrumentacao
+        self.captura = EtapaCaptura(captura, [self.fila_composicao], instrumentacao)
+        self.composicao = Etapa('composicao', compor, self.fila_composicao, saidas, instrumentacao)
+        self.etapas = [self.captura, self.composicao]
+        if gravar is not None:
+            self.gravacao = Etapa('gravacao', gravar, self.fila_gravacao, instrumentacao=instrumentacao)
+            self.etapas.append(self.gravacao)
+        self.metricas_exibicao = MetricasEtapa()
+        self._erros_avisados = set()
+
+    def iniciar(self):
+        for etapa in self.etapas:
+            etapa.start()
+        return self
+
+    def parar(self, timeout=5.0):
+        # A captura para e a sentinela FIM esvazia as filas em cascata, então a
+        # gravação termina de escrever tudo o que já estava na fila
+        self.captura.parar()
+        for etapa in self.etapas:
+            etapa.join(timeout)
+
+    def quadro_para_exibir(self):
+        """Quadro composto mais recente, ``FIM`` quando a câmera acabar, ou ``None``."""
+        return self.fila_exibicao.retirar_mais_recente()
+
+    def registrar_exibicao(self, duracao):
+        self.metricas_exibicao.registrar(duracao)
+        self.instrumentacao.registrar('exibicao', duracao)
+        self.instrumentacao.contar('quadros_exibidos')
+
+    @property
+    def quadros_perdidos(self):
+        """Quadros capturados descartados antes da composição (só sem gravação)."""
+        return self.fila_composicao.descartados
+
+    @property
+    def esperas_captura(self):
+        """Vezes em que a captura esperou a composição (com gravação, em vez de descartar)."""
+        return self.fila_composicao.esperas
+
+    def novos_erros(self):
+        """``[(etapa, exceção)]`` com os erros de etapa ainda não entregues (cada mensagem uma vez)."""
+        novos = []
+        for etapa in self.etapas:
+            erro = getattr(etapa, 'erro', None)
+            if erro is not None and (etapa.nome, repr(erro)) not in self._erros_avisados:
+                self._erros_avisados.add((etapa.nome, repr(erro)))
+                novos.append((etapa.nome, erro))
+        return novos
+
+    def metricas(self):
+        etapas = {etapa.nome: etapa.metricas.resumo() for etapa in self.etapas}
+        for etapa in self.etapas:
+            if isinstance(etapa, Etapa):
+                etapas[etapa.nome]['falhas'] = etapa.falhas
+                etapas[etapa.nome]['erro'] = repr(etapa.erro) if etapa.erro is not None else None
+        etapas['exibicao'] = self.metricas_exibicao.resumo()
+        filas = {'composicao': self.fila_composicao, 'exibicao': self.fila_exibicao}
+        if self.fila_gravacao is not None:
+            filas['gravacao'] = self.fila_gravacao
+        return {
+            'etapas': etapas,
+            'quadros_perdidos': self.quadros_perdidos,
+            'esperas_captura': self.esperas_captura,
+            'filas': {nome: {'profundidade': len(fila), 'profundidade_maxima': fila.profundidade_maxima,
+                             'descartados': fila.descartados, 'esperas': fila.esperas}
+                      for nome, fila in filas.items()},
+        }
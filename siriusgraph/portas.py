@@ -0,0 +1,145 @@
+"""Descoberta da porta serial da bancada.
+
+Todas as portas de ``serial.tools.list_ports.comports()`` são sondadas ao mesmo
+tempo, cada uma em uma thread: a sonda envia ``g`` e só aceita a porta se
+receber a resposta ``<2,escala>`` do firmware. O ``g`` é reenviado algumas
+vezes, porque o ESP32 reinicia ao ter a porta aberta e demora a responder. A
+busca inteira leva no máximo um ``timeout`` de sonda, e termina antes se a
+bancada responder.
+
+A última porta encontrada (nome, VID:PID e número de série) fica em
+``~/.siriusgraph/porta.json``; ela é sondada primeiro e sugerida na interface
+mesmo que o adaptador volte com outro nome (ex.: COM5 → COM7).
+"""
+import concurrent.futures
+import json
+import os
+import threading
+import time
+
+import serial
+import serial.tools.list_ports
+
+ARQUIVO_CACHE = os.path.join(os.path.expanduser('~'), '.siriusgraph', 'porta.json')
+
+
+def _vid_pid(info):
+    if info is None or info.vid is None:
+        return None
+    return f"{info.vid:04X}:{info.pid:04X}"
+
+
+def listar_portas():
+    """Lista as portas (``ListPortInfo``) presentes no computador."""
+    return list(serial.tools.list_ports.comports())
+
+
+def sondar_porta(porta, baudrate=115200, timeout=2.0, reenvio=0.25, cancelar=None):
+    """Retorna a escala informada pela bancada em ``porta``, ou ``None`` se não for ela."""
+    from siriusgraph.protocolo import QUADRO_ESCALA, ProtocoloSerial  # NumPy só quando há sondagem
+
+    limite = time.monotonic() + timeout
+    respostas = []
+    protocolo = ProtocoloSerial()
+    protocolo.registrar(QUADRO_ESCALA, respostas.append)
+    try:
+        conexao = serial.serial_for_url(porta, baudrate, timeout=0.05, write_timeout=0.5)
+    except (serial.SerialException, OSError, ValueError):
+        return None
+    try:
+        proximo_envio = 0.0
+        while time.monotonic() < limite and not (cancelar is not None and cancelar.is_set()):
+            if time.monotonic() >= proximo_envio:
+                conexao.write(b'g\n')
+                proximo_envio = time.monotonic() + reenvio
+            dados = conexao.read(conexao.in_waiting or 1)
+            if dados:
+                protocolo.alimentar(dados)
+                if respostas and respostas[0]:
+                    return respostas[0][0]
+    except (serial.SerialException, OSError):
+        return None
+    finally:
+        conexao.close()
+    return None
+
+
+def carregar_cache(caminho=ARQUIVO_CACHE):
+    try:
+        with open(caminho) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def salvar_cache(porta, info=None, caminho=ARQUIVO_CACHE):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    cache = {'porta': porta, 'vid_pid': _vid_pid(info),
+             'serie': getattr(info, 'serial_number', None), 'data': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    with open(caminho, 'w') as f:
+        json.dump(cache, f, indent=2)
+    return cache
+
+
+def porta_em_cache(portas=None, caminho=ARQUIVO_CACHE):
+    """Nome atual da última porta boa, se o adaptador estiver conectado; senão ``None``."""
+    cache = carregar_cache(caminho)
+    if not cache:
+        return None
+    portas = listar_portas() if portas is None else portas
+    # Mesmo adaptador (VID:PID e série) vale mais que o mesmo nome
+    for info in portas:
+        if cache.get('vid_pid') and _vid_pid(info) == cache['vid_pid'] and \
+                (not cache.get('serie') or info.serial_number == cache['serie']):
+            return info.device
+    for info in portas:
+        if info.device == cache.get('porta'):
+            return info.device
+    return None
+
+
+def descobrir_portas(baudrate=115200, timeout=2.0, portas=None, primeira=True, caminho_cache=ARQUIVO_CACHE):
+    """Sonda as portas em paralelo; retorna ``[(porta, escala)]`` das que são a bancada.
+
+    ``portas`` aceita nomes ou URLs do pyserial além das de ``comports()``. Com
+    ``primeira=True`` a busca termina na primeira bancada encontrada. A porta
+    encontrada é gravada no cache.
+    """
+    infos = {info.device: info for info in listar_portas()}
+    nomes = list(infos) if portas is None else list(portas)
+    em_cache = porta_em_cache(list(infos.values()), caminho_cache)
+    if em_cache in nomes:
+        nomes.remove(em_cache)
+        nomes.insert(0, em_cache)
+    if not nomes:
+        return []
+
+    encontradas = []
+    cancelar = threading.Event()
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(nomes), thread_name_prefix='sonda-porta')
+    try:
+        futuros = {executor.submit(sondar_porta, nome, baudrate, timeout, cancelar=cancelar): nome for nome in nomes}
+        try:
+            for futuro in concurrent.futures.as_completed(futuros, timeout=timeout + 1.0):
+                escala = futuro.result()
+                if escala is not None:
+                    encontradas.append((futuros[futuro], escala))
+                    if primeira:
+                        break
+        except concurrent.futures.TimeoutError:
+            pass
+    finally:
+        cancelar.set()  # As sondas que ainda rodam fecham suas portas e saem
+        executor.shutdown(wait=False)
+
+    # Mantém a ordem de preferência (porta do cache primeiro)
+    encontradas.sort(key=lambda par: nomes.index(par[0]))
+    if encontradas:
+        salvar_cache(encontradas[0][0], infos.get(encontradas[0][0]), caminho_cache)
+    return encontradas
+
+
+def encontrar_bancada(baudrate=115200, timeout=2.0, portas=None):
+    """Porta da bancada (a primeira que responder) ou ``None``."""
+    encontradas = descobrir_portas(baudrate, timeout, portas)
+    return encontradas[0][0] if encontradas else None
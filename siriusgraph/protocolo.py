@@ -0,0 +1,105 @@
+"""Interpretação do protocolo serial do ESP32 em blocos de bytes.
+
+O firmware envia quadros delimitados por ``<`` e ``>``, com o tipo do quadro
+no primeiro campo: ``<1,tempo,forca>`` (dados) e ``<2,escala>`` (resposta ao
+comando ``g``). ``ProtocoloSerial.alimentar`` recebe o que ``read(in_waiting)``
+devolveu, guarda o quadro incompleto do fim para o próximo bloco e devolve os
+quadros de dados já convertidos em arrays NumPy. Os demais tipos vão para a
+função registrada para eles.
+
+Lixo entre quadros, quadros truncados e campos não numéricos são descartados
+sem exceções: a leitura volta a se alinhar no próximo ``<`` e os quadros
+perdidos ficam em ``quadros_malformados``.
+"""
+import re
+
+import numpy as np
+
+# Tipos de quadro enviados pelo firmware
+QUADRO_DADOS = 1
+QUADRO_ESCALA = 2
+
+_NUMERO = rb'[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)'
+_DADOS = re.compile(rb'<1,(' + _NUMERO + rb'),(' + _NUMERO + rb')>')
+_QUADRO = re.compile(rb'<([^<>]*)>')
+_CAMPOS = re.compile(rb'([0-9]+)((?:,' + _NUMERO + rb')*)')
+
+
+class ProtocoloSerial:
+    def __init__(self, tamanho_maximo=256):
+        self.tamanho_maximo = tamanho_maximo  # Bytes sem '>' a partir dos quais o resto é descartado
+        self.tratadores = {}  # tipo → função(campos)
+        self._resto = b''
+
+        # Contadores
+        self.bytes_recebidos = 0
+        self.bytes_descartados = 0
+        self.quadros_dados = 0
+        self.quadros_outros = 0
+        self.quadros_desconhecidos = 0  # Bem formados, mas de um tipo sem tratador
+        self.quadros_malformados = 0
+
+    def registrar(self, tipo, funcao):
+        """Chama ``funcao(campos)`` para cada quadro de ``tipo`` (``campos`` sem o tipo, como floats)."""
+        self.tratadores[tipo] = funcao
+
+    def reiniciar(self):
+        self._resto = b''
+
+    def alimentar(self, dados):
+        """Interpreta mais um bloco de bytes; retorna ``(tempos, forcas)`` dos quadros de dados completos."""
+        self.bytes_recebidos += len(dados)
+        bloco = self._resto + dados
+        fim = bloco.rfind(b'>') + 1
+        completo, self._resto = bloco[:fim], bloco[fim:]
+        if len(self._resto) > self.tamanho_maximo:
+            # Nenhum quadro fecha há muito tempo: fica só a partir do último '<'
+            inicio = self._resto.rfind(b'<')
+            inicio = inicio if inicio >= 0 and len(self._resto) - inicio <= self.tamanho_maximo else len(self._resto)
+            self.bytes_descartados += inicio
+            self._resto = self._resto[inicio:]
+        if not completo:
+            return np.empty(0), np.empty(0)
+
+        encontrados = _DADOS.findall(completo)
+        iniciados = completo.count(b'<')
+        outros = 0
+        if iniciados != completo.count(b'<1,'):
+            # Há quadros que não começam como dados (respostas ou lixo com '<')
+            outros = self._outros_quadros(completo)
+        self.quadros_malformados += iniciados - len(encontrados) - outros
+        self.quadros_dados += len(encontrados)
+        if not encontrados:
+            return np.empty(0), np.empty(0)
+        valores = np.array(encontrados, dtype=np.float64)
+        return valores[:, 0], valores[:, 1]
+
+    def _outros_quadros(self, completo):
+        # Quadros bem formados que não são de dados; devolve quantos foram aceitos
+        aceitos = 0
+        for corpo in _QUADRO.findall(completo):
+            if corpo.startswith(b'1,'):
+                continue
+            campos = _CAMPOS.fullmatch(corpo)
+            if campos is None:
+                continue
+            aceitos += 1
+            tipo = int(campos.group(1))
+            valores = [float(v) for v in campos.group(2).split(b',')[1:]]
+            tratador = self.tratadores.get(tipo)
+            if tratador is None:
+                self.quadros_desconhecidos += 1
+            else:
+                self.quadros_outros += 1
+                tratador(valores)
+        return aceitos
+
+    def estatisticas(self):
+        return {
+            'bytes_recebidos': self.bytes_recebidos,
+            'bytes_descartados': self.bytes_descartados,
+            'quadros_dados': self.quadros_dados,
+            'quadros_outros': self.quadros_outros,
+            'quadros_desconhecidos': self.quadros_desconhecidos,
+            'quadros_malformados': self.quadros_malformados,
+        }
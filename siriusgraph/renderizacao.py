@@ -0,0 +1,352 @@
+"""Renderização do vídeo com gráfico, leituras e marca d'água depois da corrida.
+
+Com a gravação de vídeo limpo, a interface grava só a imagem da câmera; o
+índice ``calibration_video_indice.csv`` (instante de captura e intervalo do
+relógio do ESP32 de cada quadro) e as amostras em ``calibration_data.srun``
+bastam para refazer a sobreposição quadro a quadro. Cada quadro mostra as
+amostras medidas até o instante em que a imagem foi capturada, sem o atraso da
+serial nem amostras perdidas pela composição ao vivo.
+
+Os quadros são divididos em trechos contíguos renderizados em um pool de
+processos; cada processo acompanha os limites do gráfico desde o primeiro
+quadro (sem desenhar), então o resultado não depende de onde os trechos são
+cortados. As partes são unidas no fim sem recodificar (FFmpeg ``concat``).
+
+Uso::
+
+    python -m siriusgraph.renderizacao calibration_data_20260101_120000/ --marca-dagua logo.png
+"""
+import argparse
+import concurrent.futures
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from siriusgraph.composicao import MarcaDagua
+from siriusgraph.filtros import criar_filtro
+from siriusgraph.grafico import GraficoOverlay
+from siriusgraph.hud import HudLeituras
+from siriusgraph.impulso import integrar_trapezio
+from siriusgraph.leitura import FORMATOS
+from siriusgraph.lote import carregar_tempo_forca
+from siriusgraph.sincronizacao import carregar_indice
+from siriusgraph.video import (CODEC_AUTO, CODEC_MJPG_DIRETO, CODECS_OPENCV, CODIFICADORES_FFMPEG, ErroVideo,
+                               abrir_escritor, escolher_codec, localizar_ffmpeg)
+
+NOME_VIDEO = 'calibration_video'
+NOME_INDICE = 'calibration_video_indice.csv'
+NOMES_DADOS = ('calibration_data.srun', 'calibration_data.txt')
+NOME_SAIDA = 'calibration_video_sobreposto'
+EXTENSOES_VIDEO = ('.mkv', '.avi', '.mp4', '.mjpeg')
+AMOSTRAS_GRAFICO = 2000  # Janela do gráfico, a mesma da composição ao vivo
+QUADROS_POR_TRECHO = 150  # Menos que isso não compensa abrir outro processo e codificador
+
+
+def carregar_dados(caminho, formato='calibracao', filtro=None):
+    """Amostras da corrida com o impulso integrado como ao vivo (trapézio sobre a força crua).
+
+    Com ``filtro``, a curva do gráfico (``forca_grafico``) passa pelo filtro de
+    fase zero; as leituras e o impulso continuam com a força crua.
+    """
+    tempo, forca = carregar_tempo_forca(caminho, formato)
+    impulso, impulso_total = integrar_trapezio(tempo, forca)
+    forca_grafico = np.asarray(filtro.fase_zero(forca), dtype=np.float64) if filtro is not None else forca
+    return {'tempo': tempo, 'forca': forca, 'forca_grafico': forca_grafico,
+            'impulso': impulso, 'impulso_total': impulso_total}
+
+
+def amostras_exibidas(indice, tempos):
+    """Para cada quadro do vídeo, quantas amostras foram medidas até a captura da imagem.
+
+    O índice traz o intervalo do relógio do ESP32 de cada posição do vídeo; como a
+    conversão entre os relógios é linear, o instante de captura é levado ao
+    tempo do ESP32 por interpolação dentro desse intervalo. Quadros sem tempo do
+    ESP32 (antes da primeira amostra) não mostram dados.
+    """
+    inicio, fim = indice['instante_inicio'], indice['instante_fim']
+    t_ini, t_fim = indice['tempo_dispositivo_inicio'], indice['tempo_dispositivo_fim']
+    t_captura = t_ini + (indice['instante_captura'] - inicio) * (t_fim - t_ini) / (fim - inicio)
+    n = np.searchsorted(tempos, t_captura, side='right')
+    n[np.isnan(t_captura)] = 0
+    return n
+
+
+class CompositorSobreposicao:
+    """Gráfico, leituras e marca d'água sobre os quadros limpos, como na composição ao vivo.
+
+    Cada quadro é composto com as ``n`` primeiras amostras de ``dados`` (ver
+    ``carregar_dados``): o gráfico com as últimas ``amostras`` delas (``None``:
+    todas) e as leituras da última.
+    """
+
+    def __init__(self, dados, largura, altura, marca_dagua=None, amostras=AMOSTRAS_GRAFICO, hud=None):
+        self.dados = dados
+        self.amostras = amostras
+        self.marca_dagua = marca_dagua
+        self.grafico = GraficoOverlay(largura, altura)
+        self.hud = hud if hud is not None else HudLeituras()
+        # Com a corrida inteira no gráfico: mínimo e máximo da força até ``_cursor``
+        self._cursor = 0
+        self._minimo, self._maximo = np.inf, -np.inf
+
+    def _janela(self, n):
+        inicio = max(0, n - self.amostras) if self.amostras else 0
+        return self.dados['tempo'][inicio:n], self.dados['forca_grafico'][inicio:n]
+
+    def acompanhar(self, n):
+        """Avança o estado do gráfico por um quadro sem compô-lo."""
+        if not n:
+            return
+        if self.amostras:
+            self.grafico.acompanhar(*self._janela(n))
+            return
+        # Corrida inteira: os limites só dependem das pontas do tempo e do mínimo e do
+        # máximo da força, acumulados desde o quadro anterior em vez de varrer tudo de novo
+        if n < self._cursor:
+            self._cursor, self._minimo, self._maximo = 0, np.inf, -np.inf
+        if n > self._cursor:
+            novas = self.dados['forca_grafico'][self._cursor:n]
+            self._minimo = np.minimum(self._minimo, novas.min())
+            self._maximo = np.maximum(self._maximo, novas.max())
+            self._cursor = n
+        tempo = self.dados['tempo']
+        self.grafico.acompanhar((tempo[0], tempo[n - 1]), (self._minimo, self._maximo))
+
+    def compor(self, frame, n):
+        altura, largura = frame.shape[:2]
+        if n:
+            grafico_img = cv2.cvtColor(self.grafico.atualizar(*self._janela(n)), cv2.COLOR_RGBA2BGR)
+            if grafico_img.shape[:2] != (altura, largura):
+                grafico_img = cv2.resize(grafico_img, (largura, altura))
+            frame = cv2.addWeighted(frame, 0.7, grafico_img, 0.3, 0)
+            i = n - 1
+            self.hud.aplicar(frame, (self.dados['tempo'][i], self.dados['forca'][i],
+                                     self.dados['impulso'][i], self.dados['impulso_total'][i]))
+        if self.marca_dagua is not None:
+            self.marca_dagua.aplicar(frame)
+        return frame
+
+
+def _buscar(captura, quadro):
+    # O OpenCV (FFmpeg) volta ao quadro-chave anterior e decodifica só dali até ``quadro``
+    return captura.set(cv2.CAP_PROP_POS_FRAMES, quadro) and int(captura.get(cv2.CAP_PROP_POS_FRAMES)) == quadro
+
+
+def permite_busca(caminho, quadro):
+    """Se o vídeo pode ser aberto direto no ``quadro`` (contêiner com índice ou marcas de tempo)."""
+    captura = cv2.VideoCapture(caminho)
+    try:
+        return captura.isOpened() and _buscar(captura, quadro)
+    finally:
+        captura.release()
+
+
+def abrir_video(caminho, inicio=0):
+    """Abre o vídeo posicionado no quadro ``inicio``.
+
+    A busca vale para qualquer codec com contêiner (MJPG no AVI, H.264 no MKV...):
+    só o trecho desde o quadro-chave anterior é decodificado. Num ``.mjpeg``
+    (JPEGs em sequência, sem índice) os quadros anteriores são lidos e descartados.
+    """
+    captura = cv2.VideoCapture(caminho)
+    if not captura.isOpened():
+        raise ErroVideo(f"O OpenCV não abriu {caminho}")
+    if inicio and not _buscar(captura, inicio):
+        captura.release()
+        captura = cv2.VideoCapture(caminho)
+        for _ in range(inicio):
+            if not captura.grab():
+                break
+    return captura
+
+
+def _renderizar_trecho(caminho_video, caminho_dados, formato_dados, n_amostras, inicio, fim, caminho_base,
+                       fps, tamanho, codec, qualidade, marca_dagua, amostras, filtro):
+    # Roda no pool: compõe os quadros [inicio, fim) e grava a parte em ``caminho_base`` + extensão
+    dados = carregar_dados(caminho_dados, formato_dados, filtro)
+    marca = MarcaDagua.carregar(marca_dagua) if marca_dagua else None
+    compositor = CompositorSobreposicao(dados, *tamanho, marca_dagua=marca, amostras=amostras)
+    for k in range(inicio):
+        compositor.acompanhar(n_amostras[k])
+    captura = abrir_video(caminho_video, inicio)
+    escritor = abrir_escritor(caminho_base, fps, tamanho, codec, qualidade)
+    try:
+        for k in range(inicio, fim):
+            ok, frame = captura.read()
+            if not ok:
+                break
+            escritor.write(compositor.compor(frame, n_amostras[k]))
+    finally:
+        captura.release()
+        escritor.release()
+    return escritor.caminho, escritor.quadros
+
+
+def dividir_trechos(n_quadros, partes):
+    """``partes`` faixas ``(inicio, fim)`` contíguas e de tamanhos parecidos cobrindo os quadros."""
+    limites = np.linspace(0, n_quadros, max(1, partes) + 1).round().astype(int)
+    return [(int(a), int(b)) for a, b in zip(limites[:-1], limites[1:]) if b > a]
+
+
+def concatenar_videos(partes, caminho_base, fps, tamanho, qualidade=90):
+    """Une as partes em ``caminho_base`` + extensão e devolve o caminho do vídeo final.
+
+    Partes do mesmo contêiner são unidas pelo FFmpeg sem recodificar; sem FFmpeg,
+    ``.mjpeg`` (JPEGs em sequência) são só emendados. Nos demais casos (ex.:
+    uma parte caiu para o MJPG do OpenCV) os quadros são recodificados em MJPG.
+    """
+    extensoes = {os.path.splitext(parte)[1] for parte in partes}
+    if len(partes) == 1 or len(extensoes) == 1:
+        extensao = extensoes.pop()
+        destino = caminho_base + extensao
+        if len(partes) == 1:
+            shutil.move(partes[0], destino)
+            return destino
+        if extensao == '.mjpeg':
+            with open(destino, 'wb') as saida:
+                for parte in partes:
+                    with open(parte, 'rb') as entrada:
+                        shutil.copyfileobj(entrada, saida)
+            return destino
+        ffmpeg = localizar_ffmpeg()
+        if ffmpeg:
+            with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as lista:
+                for parte in partes:
+                    caminho = os.path.abspath(parte).replace("'", "'\\''")
+                    lista.write(f"file '{caminho}'\n")
+            try:
+                resultado = subprocess.run(
+                    [ffmpeg, '-hide_banner', '-loglevel', 'error', '-y', '-f', 'concat', '-safe', '0',
+                     '-i', lista.name, '-c', 'copy', destino], capture_output=True, text=True)
+            finally:
+                os.remove(lista.name)
+            if resultado.returncode == 0:
+                return destino
+            print(f"O FFmpeg não uniu as partes ({resultado.stderr.strip()}); recodificando em MJPG")
+    escritor = abrir_escritor(caminho_base, fps, tamanho, 'mjpg', qualidade)
+    try:
+        for parte in partes:
+            captura = cv2.VideoCapture(parte)
+            ok, frame = captura.read()
+            while ok:
+                escritor.write(frame)
+                ok, frame = captura.read()
+            captura.release()
+    finally:
+        escritor.release()
+    return escritor.caminho
+
+
+def renderizar(caminho_video, caminho_indice, caminho_dados, caminho_base, formato_dados='calibracao',
+               marca_dagua=None, amostras=AMOSTRAS_GRAFICO, filtro=None, codec=CODEC_AUTO, qualidade=90,
+               processos=None):
+    """Renderiza o vídeo limpo com a sobreposição; devolve um resumo com o arquivo criado.
+
+    ``marca_dagua`` é o caminho da imagem (``None``: sem marca d'água) e
+    ``filtro`` um filtro de ``siriusgraph.filtros`` aplicado em fase zero à curva.
+    """
+    inicio_total = time.perf_counter()
+    indice = {nome: np.atleast_1d(valores) for nome, valores in carregar_indice(caminho_indice).items()}
+    tempo, _ = carregar_tempo_forca(caminho_dados, formato_dados)
+    n_amostras = amostras_exibidas(indice, tempo)
+    fps = round(1.0 / float(np.median(indice['instante_fim'] - indice['instante_inicio'])), 3)
+
+    captura = cv2.VideoCapture(caminho_video)
+    if not captura.isOpened():
+        raise ErroVideo(f"O OpenCV não abriu {caminho_video}")
+    tamanho = (int(captura.get(cv2.CAP_PROP_FRAME_WIDTH)), int(captura.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    captura.release()
+
+    codec = escolher_codec(codec)  # Uma vez aqui, e não em cada processo
+    n_quadros = len(n_amostras)
+    partes = min(processos or os.cpu_count() or 1, max(1, n_quadros // QUADROS_POR_TRECHO))
+    if partes > 1 and not permite_busca(caminho_video, n_quadros // 2):
+        # Sem busca cada processo decodificaria todos os quadros antes do seu trecho
+        partes = 1
+    trechos = dividir_trechos(n_quadros, partes)
+    with tempfile.TemporaryDirectory(prefix='renderizacao_', dir=os.path.dirname(os.path.abspath(caminho_base))) \
+            as pasta:
+        argumentos = [(caminho_video, caminho_dados, formato_dados, n_amostras, inicio, fim,
+                       os.path.join(pasta, f'parte_{i:03d}'), fps, tamanho, codec, qualidade, marca_dagua,
+                       amostras, filtro) for i, (inicio, fim) in enumerate(trechos)]
+        if len(argumentos) == 1:
+            resultados = [_renderizar_trecho(*argumentos[0])]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=len(argumentos)) as pool:
+                resultados = list(pool.map(_renderizar_trecho, *zip(*argumentos)))
+        caminho = concatenar_videos([parte for parte, _ in resultados], caminho_base, fps, tamanho, qualidade)
+    return {
+        'arquivo': caminho,
+        'codec': codec,
+        'quadros': sum(quadros for _, quadros in resultados),
+        'quadros_indice': n_quadros,
+        'trechos': len(trechos),
+        'segundos': time.perf_counter() - inicio_total,
+    }
+
+
+def localizar_arquivos(pasta):
+    """``(video, indice, dados)`` de uma pasta ``calibration_data_*``; ``None`` no que faltar."""
+    video = next((os.path.join(pasta, NOME_VIDEO + extensao) for extensao in EXTENSOES_VIDEO
+                  if os.path.exists(os.path.join(pasta, NOME_VIDEO + extensao))), None)
+    indice = os.path.join(pasta, NOME_INDICE)
+    dados = next((os.path.join(pasta, nome) for nome in NOMES_DADOS if os.path.exists(os.path.join(pasta, nome))),
+                 None)
+    return video, indice if os.path.exists(indice) else None, dados
+
+
+def _parametro(texto):
+    nome, _, valor = texto.partition('=')
+    if not nome or not valor:
+        raise argparse.ArgumentTypeError(f"esperado nome=valor: {texto}")
+    return nome, float(valor)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sobrepõe gráfico, leituras e marca d'água ao vídeo limpo")
+    parser.add_argument('pasta', help="pasta da corrida (calibration_data_AAAAMMDD_HHMMSS)")
+    parser.add_argument('--video', help=f"vídeo limpo (padrão: {NOME_VIDEO}.* da pasta)")
+    parser.add_argument('--indice', help=f"índice dos quadros (padrão: {NOME_INDICE} da pasta)")
+    parser.add_argument('--dados', help="amostras da corrida (padrão: calibration_data.srun ou .txt da pasta)")
+    parser.add_argument('--formato', default='calibracao', choices=sorted(FORMATOS),
+                        help="formato dos dados, se forem texto")
+    parser.add_argument('--saida', help=f"vídeo gerado, sem extensão (padrão: {NOME_SAIDA} na pasta)")
+    parser.add_argument('--marca-dagua', help="imagem da marca d'água (PNG com transparência)")
+    parser.add_argument('--amostras', type=int, default=AMOSTRAS_GRAFICO,
+                        help="amostras mais recentes no gráfico; 0 mostra a corrida inteira (padrão: 2000)")
+    parser.add_argument('--filtro', help="filtro de fase zero da curva (ex.: mediana, savgol, butterworth)")
+    parser.add_argument('--parametro', type=_parametro, action='append', default=[], metavar='NOME=VALOR',
+                        help="parâmetro do filtro (ex.: --parametro corte=30 --parametro taxa=1000)")
+    parser.add_argument('--codec', default=CODEC_AUTO,
+                        choices=[CODEC_AUTO, *CODIFICADORES_FFMPEG, *CODECS_OPENCV, CODEC_MJPG_DIRETO])
+    parser.add_argument('--qualidade', type=int, default=90, help="0 (menor arquivo) a 100 (padrão: 90)")
+    parser.add_argument('--processos', type=int, default=None, help="processos do pool (padrão: núcleos)")
+    args = parser.parse_args(argv)
+
+    video, indice, dados = localizar_arquivos(args.pasta)
+    video, indice, dados = args.video or video, args.indice or indice, args.dados or dados
+    faltando = [nome for nome, caminho in (('vídeo', video), ('índice', indice), ('dados', dados)) if not caminho]
+    if faltando:
+        parser.error(f"não encontrado em {args.pasta}: {', '.join(faltando)}")
+    filtro = None
+    if args.filtro:
+        try:
+            filtro = criar_filtro(args.filtro, **dict(args.parametro))
+        except (ValueError, TypeError) as e:
+            parser.error(str(e))
+
+    resumo = renderizar(video, indice, dados, args.saida or os.path.join(args.pasta, NOME_SAIDA), args.formato,
+                        args.marca_dagua, args.amostras or None, filtro, args.codec, args.qualidade,
+                        args.processos)
+    print(f"{resumo['quadros']} quadros em {resumo['trechos']} trechos ({resumo['codec']}), "
+          f"{resumo['segundos']:.1f} s. Vídeo em {resumo['arquivo']}")
+    return 0 if resumo['quadros'] == resumo['quadros_indice'] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,290 @@
+"""Simulador do ESP32 da bancada (``bin/sistemaDeCaptacao/app.c``) para testes sem hardware.
+
+Fala o mesmo protocolo do firmware: envia ``<1,tempo,forca>`` continuamente,
+responde ``<2,escala>`` ao comando ``g`` e troca a escala com ``s<fator>`` (a
+força enviada é dividida pela escala, como no HX711). A conexão é um
+pseudoterminal (POSIX) ou um socket TCP local, abertos pela aquisição como
+qualquer porta serial::
+
+    python -m siriusgraph.simulador --taxa 1000 --ruido 0.2 --corrupcao 0.01
+    python -m siriusgraph.simulador --arquivo bin/dados.txt --formato bancada --transporte socket
+
+A força vem de uma função do tempo do dispositivo: uma curva de motor
+sintética (``curva_motor``) ou a repetição de uma corrida gravada
+(``repetir_corrida``). Os quadros são enviados em lotes a cada ``intervalo``
+segundos, então taxas de vários kHz são possíveis.
+"""
+import os
+import re
+import select
+import socket
+import threading
+import time
+
+import numpy as np
+
+TRANSPORTE_PTY = 'pty'
+TRANSPORTE_SOCKET = 'socket'
+
+_COMANDO_ESCALA = re.compile(rb's\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)(?=[^0-9eE.+-])')
+
+
+def curva_motor(empuxo_maximo=100.0, ignicao=1.0, subida=0.1, queima=2.0, descida=0.3, ciclo=6.0):
+    """Curva de empuxo trapezoidal que se repete a cada ``ciclo`` segundos."""
+    pontos_t = np.array([0.0, ignicao, ignicao + subida, ignicao + subida + queima,
+                         ignicao + subida + queima + descida, ciclo])
+    pontos_f = np.array([0.0, 0.0, empuxo_maximo, empuxo_maximo * 0.8, 0.0, 0.0])
+
+    def forca(tempo):
+        return np.interp(np.mod(tempo, ciclo), pontos_t, pontos_f)
+
+    return forca
+
+
+def repetir_corrida(caminho, formato='bancada', velocidade=1.0):
+    """Repete em laço a força de uma corrida gravada (texto ou ``.srun``), no ritmo dos tempos do arquivo."""
+    from siriusgraph.lote import carregar_tempo_forca
+
+    tempo, forca_gravada = carregar_tempo_forca(caminho, formato)
+    if len(tempo) == 0:
+        raise ValueError(f"{caminho} não tem amostras")
+    tempo = (tempo - tempo[0]) / velocidade
+    # Um passo médio depois da última amostra antes de recomeçar
+    duracao = tempo[-1] + (tempo[-1] / (len(tempo) - 1) if len(tempo) > 1 else 1.0)
+
+    def forca(t):
+        return np.interp(np.mod(t, duracao), tempo, forca_gravada)
+
+    return forca
+
+
+class _TransportePty:
+    def __init__(self):
+        import tty
+
+        self._mestre, self._escravo = os.openpty()
+        tty.setraw(self._escravo)  # Sem eco nem tradução de fim de linha, como uma serial USB
+        self.url = os.ttyname(self._escravo)
+
+    def aguardar_conexao(self, parar):
+        return True  # O pseudoterminal já existe; quem abrir a porta começa a ler
+
+    def ler(self, timeout):
+        pronto, _, _ = select.select([self._mestre], [], [], timeout)
+        return os.read(self._mestre, 4096) if pronto else b''
+
+    def escrever(self, dados):
+        visao = memoryview(dados)
+        while visao:
+            visao = visao[os.write(self._mestre, visao):]
+
+    def fechar(self):
+        for fd in (self._mestre, self._escravo):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class _TransporteSocket:
+    def __init__(self, host='127.0.0.1', porta=0):
+        self._servidor = socket.create_server((host, porta))
+        self._servidor.settimeout(0.1)
+        host, porta = self._servidor.getsockname()[:2]
+        self.url = f"socket://{host}:{porta}"
+        self._conexao = None
+
+    def aguardar_conexao(self, parar):
+        while not parar.is_set():
+            try:
+                self._conexao, _ = self._servidor.accept()
+            except socket.timeout:
+                continue
+            self._conexao.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return True
+        return False
+
+    def ler(self, timeout):
+        pronto, _, _ = select.select([self._conexao], [], [], timeout)
+        if not pronto:
+            return b''
+        dados = self._conexao.recv(4096)
+        if not dados:
+            raise ConnectionError("A aquisição fechou a conexão")
+        return dados
+
+    def escrever(self, dados):
+        self._conexao.sendall(dados)
+
+    def fechar(self):
+        for s in (self._conexao, self._servidor):
+            if s is not None:
+                s.close()
+
+
+class SimuladorSerial(threading.Thread):
+    """ESP32 simulado; ``url`` é o que se passa para ``AquisicaoSerial``.
+
+    ``taxa`` é a taxa de quadros de dados (o firmware real faz ~80 Hz),
+    ``ruido`` o desvio padrão somado à força e ``corrupcao`` a fração de quadros
+    enviados estragados (truncados, sem delimitador, com lixo ou campos não numéricos).
+    """
+
+    def __init__(self, forca=None, taxa=80.0, transporte=TRANSPORTE_PTY, ruido=0.0, corrupcao=0.0,
+                 escala=1.0, intervalo=0.005, casas_tempo=None, semente=None):
+        super().__init__(name='simulador-serial', daemon=True)
+        self.forca = forca if forca is not None else curva_motor()
+        self.taxa = float(taxa)
+        self.ruido = ruido
+        self.corrupcao = corrupcao
+        self.escala = float(escala)
+        self._escala_inicial = float(escala)
+        self.intervalo = intervalo
+        # millis()*1e-3 com 3 casas, como o firmware; acima de 1 kHz isso repetiria tempos
+        self.casas_tempo = casas_tempo if casas_tempo is not None else (3 if self.taxa <= 1000 else 6)
+        self._aleatorio = np.random.default_rng(semente)
+        self._transporte = _TransportePty() if transporte == TRANSPORTE_PTY else _TransporteSocket()
+        self.url = self._transporte.url
+        self._parar = threading.Event()
+        self._comandos = b''
+        self.erro = None
+
+        # Contadores
+        self.quadros_enviados = 0
+        self.quadros_corrompidos = 0
+        self.bytes_enviados = 0
+        self.comandos_recebidos = 0
+        self.atraso_maximo = 0.0  # Quanto o envio chegou a ficar atrás do relógio (s)
+
+    def iniciar(self):
+        self.start()
+        return self
+
+    def parar(self, timeout=2.0):
+        self._parar.set()
+        if self.is_alive():
+            self.join(timeout)
+        self._transporte.fechar()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+    def run(self):
+        try:
+            if not self._transporte.aguardar_conexao(self._parar):
+                return
+            inicio = time.monotonic()
+            enviados = 0
+            while not self._parar.is_set():
+                self._tratar_comandos(self._transporte.ler(self.intervalo))
+                decorrido = time.monotonic() - inicio
+                devidos = int(decorrido * self.taxa) - enviados
+                if devidos > 0:
+                    tempos = (enviados + np.arange(devidos)) / self.taxa
+                    self._transporte.escrever(self._quadros(tempos))
+                    enviados += devidos
+                    self.atraso_maximo = max(self.atraso_maximo, time.monotonic() - inicio - tempos[-1])
+        except (OSError, ConnectionError) as e:
+            if not self._parar.is_set():
+                self.erro = e
+
+    def _quadros(self, tempos):
+        forcas = self.forca(tempos) * (self._escala_inicial / self.escala)
+        if self.ruido:
+            forcas = forcas + self._aleatorio.normal(0.0, self.ruido, len(tempos))
+        formato = f"<1,{{:.{self.casas_tempo}f}},{{:.4f}}>\r\n"
+        linhas = [formato.format(t, f) for t, f in zip(tempos.tolist(), forcas.tolist())]
+        if self.corrupcao:
+            for i in np.flatnonzero(self._aleatorio.random(len(linhas)) < self.corrupcao):
+                linhas[i] = self._corromper(linhas[i])
+                self.quadros_corrompidos += 1
+        dados = ''.join(linhas).encode('ascii', errors='replace')
+        self.quadros_enviados += len(linhas)
+        self.bytes_enviados += len(dados)
+        return dados
+
+    def _corromper(self, linha):
+        tipo = self._aleatorio.integers(4)
+        if tipo == 0:
+            return linha[:self._aleatorio.integers(1, len(linha) - 2)]  # Truncado (sem '>' nem fim de linha)
+        if tipo == 1:
+            return linha.replace('>', '', 1)  # Sem delimitador final
+        if tipo == 2:
+            lixo = self._aleatorio.integers(33, 127, self._aleatorio.integers(1, 12))
+            return ''.join(map(chr, lixo)) + linha  # Lixo antes do quadro
+        return linha.replace(',', ',x', 1)  # Campo não numérico
+
+    def _tratar_comandos(self, dados):
+        # Como o firmware: 'g' responde a escala, 's<número>' troca a escala, o resto é ignorado
+        self._comandos += dados
+        while self._comandos:
+            i_g, i_s = self._comandos.find(b'g'), self._comandos.find(b's')
+            if i_g < 0 and i_s < 0:
+                self._comandos = b''
+                return
+            if i_s < 0 or 0 <= i_g < i_s:
+                self.comandos_recebidos += 1
+                self._transporte.escrever(f"<2,{self.escala:.5f}>\r\n".encode())
+                self._comandos = self._comandos[i_g + 1:]
+                continue
+            encontrado = _COMANDO_ESCALA.match(self._comandos, i_s)
+            if encontrado is None:
+                if re.fullmatch(rb's\s*[-+0-9.eE]*', self._comandos[i_s:]):
+                    self._comandos = self._comandos[i_s:]  # Número ainda chegando
+                    return
+                self._comandos = self._comandos[i_s + 1:]
+                continue
+            self.comandos_recebidos += 1
+            escala = float(encontrado.group(1))
+            if escala:
+                self.escala = escala
+            self._comandos = self._comandos[encontrado.end():]
+
+    def estatisticas(self):
+        return {
+            'quadros_enviados': self.quadros_enviados,
+            'quadros_corrompidos': self.quadros_corrompidos,
+            'bytes_enviados': self.bytes_enviados,
+            'comandos_recebidos': self.comandos_recebidos,
+            'atraso_maximo': float(self.atraso_maximo),
+        }
+
+
+def main(argv=None):
+    import argparse
+
+    from siriusgraph.leitura import FORMATOS
+
+    parser = argparse.ArgumentParser(description="Simula o ESP32 da bancada em uma porta serial virtual")
+    parser.add_argument('--taxa', type=float, default=80.0, help="quadros de dados por segundo")
+    parser.add_argument('--transporte', choices=(TRANSPORTE_PTY, TRANSPORTE_SOCKET),
+                        default=TRANSPORTE_PTY if os.name == 'posix' else TRANSPORTE_SOCKET)
+    parser.add_argument('--arquivo', help="corrida gravada a repetir (senão, curva sintética)")
+    parser.add_argument('--formato', default='bancada', choices=sorted(FORMATOS))
+    parser.add_argument('--velocidade', type=float, default=1.0, help="velocidade da repetição do arquivo")
+    parser.add_argument('--empuxo', type=float, default=100.0, help="empuxo máximo da curva sintética")
+    parser.add_argument('--ruido', type=float, default=0.0, help="desvio padrão do ruído na força")
+    parser.add_argument('--corrupcao', type=float, default=0.0, help="fração de quadros corrompidos")
+    parser.add_argument('--escala', type=float, default=1.0, help="escala inicial do HX711")
+    args = parser.parse_args(argv)
+
+    forca = (repetir_corrida(args.arquivo, args.formato, args.velocidade) if args.arquivo
+             else curva_motor(args.empuxo))
+    simulador = SimuladorSerial(forca, args.taxa, args.transporte, args.ruido, args.corrupcao,
+                                args.escala).iniciar()
+    print(f"Simulador em {simulador.url} ({args.taxa:g} quadros/s). Ctrl+C para sair.")
+    try:
+        while simulador.is_alive():
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulador.parar()
+        print(simulador.estatisticas())
+
+
+if __name__ == "__main__":
+    main()
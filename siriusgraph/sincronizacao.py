@@ -0,0 +1,148 @@
+"""Sincronização entre os quadros de vídeo e as amostras do ESP32.
+
+Os quadros são carimbados com ``time.monotonic()`` na captura. As amostras
+trazem o ``millis()`` do ESP32; ``RelogioDispositivo`` estima o deslocamento e
+a deriva entre os dois relógios, para levar o tempo do dispositivo ao relógio
+do computador e vice-versa.
+
+``GravadorSincronizado`` grava vídeo a uma taxa de quadros constante: cada
+posição do vídeo recebe o quadro mais recente capturado até aquele instante,
+duplicando ou descartando quadros de forma determinística, e um índice CSV ao
+lado do vídeo diz qual intervalo de tempo do ESP32 cada quadro cobre.
+"""
+import csv
+import collections
+
+import numpy as np
+
+
+class RelogioDispositivo:
+    """Estima ``host = dispositivo + deslocamento + deriva * dispositivo``.
+
+    A diferença ``host - dispositivo`` de cada amostra é o deslocamento real mais
+    o atraso da serial, que só pode ser positivo. Por isso, em cada bloco de
+    ``janela`` segundos do dispositivo, fica só a menor diferença (a amostra que
+    chegou mais rápido), e a reta é ajustada por mínimos quadrados sobre esses
+    mínimos.
+    """
+
+    def __init__(self, janela=1.0, blocos=120):
+        self.janela = janela
+        self._minimos = collections.deque(maxlen=blocos)  # (t_dispositivo, diferença)
+        self._bloco = None
+        self._minimo_bloco = None
+        self.deslocamento = None
+        self.deriva = 0.0
+
+    def registrar(self, tempo_dispositivo, instante_host):
+        diferenca = instante_host - tempo_dispositivo
+        bloco = int(tempo_dispositivo // self.janela)
+        if bloco != self._bloco:
+            if self._minimo_bloco is not None:
+                self._minimos.append(self._minimo_bloco)
+                self._ajustar()
+            self._bloco = bloco
+            self._minimo_bloco = None
+        if self._minimo_bloco is None or diferenca < self._minimo_bloco[1]:
+            self._minimo_bloco = (tempo_dispositivo, diferenca)
+        if not self._minimos and (self.deslocamento is None or diferenca < self.deslocamento):
+            # Antes do primeiro ajuste, o melhor palpite é a menor diferença vista
+            self.deslocamento = diferenca
+
+    def _ajustar(self):
+        pontos = list(self._minimos)
+        if self._minimo_bloco is not None:
+            pontos.append(self._minimo_bloco)
+        t, d = np.array(pontos).T
+        if len(t) >= 2 and np.ptp(t) > 0:
+            self.deriva, self.deslocamento = np.polyfit(t, d, 1)
+        else:
+            self.deriva, self.deslocamento = 0.0, float(d.min())
+
+    def para_host(self, tempo_dispositivo):
+        return np.asarray(tempo_dispositivo) * (1.0 + self.deriva) + self.deslocamento
+
+    def para_dispositivo(self, instante_host):
+        return (np.asarray(instante_host) - self.deslocamento) / (1.0 + self.deriva)
+
+
+class GravadorSincronizado:
+    """Grava quadros a taxa constante a partir dos instantes de captura.
+
+    ``escritor`` é qualquer objeto com ``write(imagem)`` (ex.: ``cv2.VideoWriter``).
+    A posição ``k`` do vídeo corresponde ao intervalo ``[t0 + k/fps, t0 + (k+1)/fps)``
+    do relógio do computador e mostra o último quadro capturado antes do fim
+    desse intervalo.
+    """
+
+    COLUNAS_INDICE = ('quadro', 'instante_inicio', 'instante_fim', 'quadro_captura',
+                      'instante_captura', 'tempo_dispositivo_inicio', 'tempo_dispositivo_fim', 'duplicado')
+
+    def __init__(self, escritor, fps, caminho_indice=None, relogio=None):
+        self.escritor = escritor
+        self.fps = float(fps)
+        self.relogio = relogio
+        self.t0 = None
+        self.proximo = 0  # Próxima posição do vídeo a ser escrita
+        self._pendente = None  # (quadro_captura, instante, imagem) aguardando sua posição
+        self._pendente_escrito = False
+        self.duplicados = 0
+        self.descartados = 0
+        self._arquivo_indice = open(caminho_indice, 'w', newline='') if caminho_indice else None
+        self._indice = csv.writer(self._arquivo_indice) if self._arquivo_indice else None
+        if self._indice:
+            self._indice.writerow(self.COLUNAS_INDICE)
+
+    def _escrever_posicao(self):
+        indice_captura, instante, imagem = self._pendente
+        duplicado = self._pendente_escrito
+        self.escritor.write(imagem)
+        if duplicado:
+            self.duplicados += 1
+        if self._indice:
+            inicio = self.t0 + self.proximo / self.fps
+            fim = inicio + 1.0 / self.fps
+            if self.relogio is not None and self.relogio.deslocamento is not None:
+                t_ini, t_fim = self.relogio.para_dispositivo((inicio, fim))
+            else:
+                t_ini = t_fim = float('nan')
+            self._indice.writerow((self.proximo, f"{inicio:.6f}", f"{fim:.6f}", indice_captura,
+                                   f"{instante:.6f}", f"{t_ini:.6f}", f"{t_fim:.6f}", int(duplicado)))
+        self._pendente_escrito = True
+        self.proximo += 1
+
+    def escrever(self, imagem, instante, indice_captura=-1):
+        if self.t0 is None:
+            self.t0 = instante
+        posicao = int(np.floor((instante - self.t0) * self.fps))
+        # Fecha as posições que terminaram antes deste quadro com o quadro pendente
+        while self._pendente is not None and self.proximo < posicao:
+            self._escrever_posicao()
+        if self._pendente is not None and not self._pendente_escrito:
+            # Dois quadros na mesma posição: o mais antigo nunca chega ao vídeo
+            self.descartados += 1
+        self._pendente = (indice_captura, instante, imagem)
+        self._pendente_escrito = False
+
+    def fechar(self):
+        if self._pendente is not None and not self._pendente_escrito:
+            self._escrever_posicao()
+        if self._arquivo_indice:
+            self._arquivo_indice.close()
+            self._arquivo_indice = None
+
+    def estatisticas(self):
+        return {'quadros_escritos': self.proximo, 'duplicados': self.duplicados, 'descartados': self.descartados}
+
+
+def carregar_indice(caminho_indice):
+    """Lê o índice CSV do vídeo como um dicionário de arrays NumPy."""
+    dados = np.genfromtxt(caminho_indice, delimiter=',', names=True)
+    return {nome: dados[nome] for nome in dados.dtype.names}
+
+
+def amostras_por_quadro(indice, tempos_amostras):
+    """Para cada quadro, a faixa ``[inicio, fim)`` de amostras (tempos do ESP32 ordenados)."""
+    inicio = np.searchsorted(tempos_amostras, indice['tempo_dispositivo_inicio'], side='left')
+    fim = np.searchsorted(tempos_amostras, indice['tempo_dispositivo_fim'], side='left')
+    return inicio, fim
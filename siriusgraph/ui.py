@@ -0,0 +1,115 @@
+"""Atualização da interface Tkinter guiada por eventos.
+
+``FundoRedimensionavel`` mantém a imagem de fundo do canvas: os eventos de
+redimensionamento são agrupados (só o último tamanho de uma rajada é
+processado), cada tamanho é redimensionado uma única vez e guardado em cache, e
+o canvas tem um único item de imagem, que só troca de foto.
+
+``PainelLeituras`` mostra tempo, força e impulso lidos do buffer de aquisição a
+uma taxa limitada, e só reconfigura um rótulo quando o texto dele muda. Sem
+aquisição, nada fica agendado no ``after`` e a interface parada não gasta CPU.
+"""
+import collections
+import tkinter as tk
+
+from PIL import Image, ImageTk
+
+
+class FundoRedimensionavel:
+    def __init__(self, canvas, imagem, atraso_ms=120, tamanho_cache=8):
+        self.canvas = canvas
+        self.imagem = imagem
+        self.atraso_ms = atraso_ms
+        self.tamanho_cache = tamanho_cache
+        self._cache = collections.OrderedDict()  # (largura, altura) → PhotoImage
+        self._item = None
+        self._agendado = None
+        self._tamanho = None
+        self.redimensionamentos = 0  # Quantas vezes a imagem foi de fato redimensionada
+        canvas.bind('<Configure>', self._ao_configurar, add='+')
+
+    def _ao_configurar(self, evento):
+        # Uma rajada de eventos (arrastar a borda da janela) vira um único redesenho
+        if self._agendado is not None:
+            self.canvas.after_cancel(self._agendado)
+        self._agendado = self.canvas.after(self.atraso_ms, self._aplicar, evento.width, evento.height)
+
+    def _foto(self, tamanho):
+        foto = self._cache.get(tamanho)
+        if foto is not None:
+            self._cache.move_to_end(tamanho)
+            return foto
+        foto = ImageTk.PhotoImage(self.imagem.resize(tamanho, Image.Resampling.LANCZOS))
+        self.redimensionamentos += 1
+        self._cache[tamanho] = foto
+        if len(self._cache) > self.tamanho_cache:
+            self._cache.popitem(last=False)
+        return foto
+
+    def _aplicar(self, largura, altura):
+        self._agendado = None
+        tamanho = (max(1, largura), max(1, altura))
+        if self.imagem is None or tamanho == self._tamanho:
+            return
+        self._tamanho = tamanho
+        foto = self._foto(tamanho)
+        if self._item is None:
+            self._item = self.canvas.create_image(0, 0, anchor=tk.NW, image=foto)
+            self.canvas.tag_lower(self._item)
+        else:
+            self.canvas.itemconfigure(self._item, image=foto)
+
+
+class PainelLeituras(tk.Frame):
+    # (rótulo, formato do valor) na ordem de (tempo, força, impulso, impulso total)
+    CAMPOS = (('Tempo', '{:.2f} s'), ('Força', '{:.2f} N'), ('Impulso', '{:.2f} N.s'),
+              ('Impulso Total', '{:.2f} N.s'))
+
+    def __init__(self, master, intervalo_ms=100, **opcoes):
+        super().__init__(master, **opcoes)
+        self.intervalo_ms = intervalo_ms  # 100 ms = no máximo 10 atualizações por segundo
+        self._valores = []
+        self._textos = [None] * len(self.CAMPOS)
+        for linha, (rotulo, _) in enumerate(self.CAMPOS):
+            tk.Label(self, text=rotulo, font=('Arial', 10)).grid(row=linha, column=0, sticky='w', padx=(0, 8))
+            valor = tk.Label(self, text='--', font=('Arial', 12, 'bold'), width=12, anchor='e')
+            valor.grid(row=linha, column=1, sticky='e')
+            self._valores.append(valor)
+        self.buffer = None
+        self._cursor = 0
+        self._acumulador = None
+        self._agendado = None
+
+    def acompanhar(self, buffer):
+        """Passa a mostrar as amostras novas de ``buffer`` (um ``BufferCircular``)."""
+        from siriusgraph.impulso import AcumuladorImpulso
+
+        self.parar()
+        self.buffer = buffer
+        self._cursor = buffer.escritos
+        self._acumulador = AcumuladorImpulso()
+        self._agendado = self.after(self.intervalo_ms, self._atualizar)
+
+    def parar(self):
+        if self._agendado is not None:
+            self.after_cancel(self._agendado)
+            self._agendado = None
+        self.buffer = None
+
+    def mostrar(self, valores):
+        for i, (rotulo, valor) in enumerate(zip(self._valores, valores)):
+            texto = self.CAMPOS[i][1].format(valor)
+            if texto != self._textos[i]:
+                rotulo.configure(text=texto)
+                self._textos[i] = texto
+
+    def _atualizar(self):
+        self._agendado = None
+        if self.buffer is None:
+            return
+        if self.buffer.escritos != self._cursor:
+            tempos, forcas, _, self._cursor, _ = self.buffer.desde(self._cursor)
+            if len(tempos):
+                impulsos, totais = self._acumulador.adicionar(tempos, forcas)
+                self.mostrar((tempos[-1], forcas[-1], impulsos[-1], totais[-1]))
+        self._agendado = self.after(self.intervalo_ms, self._atualizar)
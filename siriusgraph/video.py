@@ -0,0 +1,311 @@
+"""Câmera e codificadores de vídeo para a gravação das corridas.
+
+``abrir_camera`` pede à câmera a resolução, a taxa e o formato desejados e
+devolve o que ela realmente aceitou; é com esses valores que o vídeo é criado.
+``abrir_escritor`` escolhe o codificador e devolve um escritor com a mesma
+interface do ``cv2.VideoWriter`` (``write``/``release``), usado pelo
+``GravadorSincronizado`` na etapa de gravação do pipeline:
+
+- ``h264_nvenc``, ``h264_qsv``, ``h264_videotoolbox``, ``h264_amf``: H.264 na
+  GPU, via FFmpeg, quando o codificador existe e funciona nesta máquina;
+- ``x264``: H.264 em software (libx264), via FFmpeg;
+- ``mjpg``, ``xvid``, ``mp4v``: ``cv2.VideoWriter``, sem dependências externas;
+- ``mjpg_direto``: os JPEGs que a câmera já entrega vão para o arquivo sem
+  decodificar nem recodificar (só serve para o vídeo limpo, sem sobreposição).
+
+``auto`` usa o primeiro H.264 em GPU disponível, depois ``x264`` e por fim
+``mjpg``. O FFmpeg grava em ``.mkv``, que continua legível se o programa cair
+no meio da corrida. Quadros de tamanho diferente do vídeo são redimensionados
+uma única vez antes de codificar (e contados), em vez de serem descartados em
+silêncio pelo ``VideoWriter``.
+"""
+import functools
+import shutil
+import subprocess
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from siriusgraph.pipeline import MetricasEtapa
+
+CODEC_AUTO = 'auto'
+CODEC_MJPG_DIRETO = 'mjpg_direto'
+CODECS_OPENCV = {'mjpg': ('MJPG', '.avi'), 'xvid': ('XVID', '.avi'), 'mp4v': ('mp4v', '.mp4')}
+CODIFICADORES_GPU = ('h264_nvenc', 'h264_qsv', 'h264_videotoolbox', 'h264_amf')
+CODIFICADORES_FFMPEG = {'x264': 'libx264', **{nome: nome for nome in CODIFICADORES_GPU}}
+
+
+class ErroVideo(RuntimeError):
+    pass
+
+
+def localizar_ffmpeg():
+    return shutil.which('ffmpeg')
+
+
+@functools.lru_cache(maxsize=None)
+def codificador_disponivel(codificador, ffmpeg=None):
+    """Testa se o FFmpeg consegue codificar um quadro com ``codificador`` nesta máquina.
+
+    Um codificador de GPU pode estar compilado no FFmpeg sem haver a placa, por
+    isso não basta procurá-lo em ``ffmpeg -encoders``.
+    """
+    ffmpeg = ffmpeg or localizar_ffmpeg()
+    if not ffmpeg:
+        return False
+    try:
+        resultado = subprocess.run(
+            [ffmpeg, '-hide_banner', '-loglevel', 'error', '-f', 'lavfi', '-i', 'color=size=256x256:rate=1',
+             '-frames:v', '1', '-c:v', codificador, '-f', 'null', '-'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return resultado.returncode == 0
+
+
+def escolher_codec(codec=CODEC_AUTO):
+    """Resolve ``auto`` para o melhor codec disponível; os demais são devolvidos como estão."""
+    if codec != CODEC_AUTO:
+        return codec
+    for nome in CODIFICADORES_GPU + ('x264',):
+        if codificador_disponivel(CODIFICADORES_FFMPEG[nome]):
+            return nome
+    return 'mjpg'
+
+
+def abrir_camera(indice=0, largura=1280, altura=720, fps=30.0, mjpg=True, bruto=False):
+    """Abre a câmera pedindo resolução, taxa e MJPG; devolve ``(captura, formato)``.
+
+    ``formato`` traz o que a câmera aceitou (``largura``, ``altura``, ``fps``,
+    ``fourcc``), que pode diferir do pedido. Com ``bruto=True`` a captura devolve
+    os JPEGs sem decodificar (para ``mjpg_direto``), onde o backend permitir.
+    """
+    captura = cv2.VideoCapture(indice)
+    if mjpg:
+        captura.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    captura.set(cv2.CAP_PROP_FRAME_WIDTH, largura)
+    captura.set(cv2.CAP_PROP_FRAME_HEIGHT, altura)
+    captura.set(cv2.CAP_PROP_FPS, fps)
+    if bruto:
+        captura.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+    codigo = int(captura.get(cv2.CAP_PROP_FOURCC))
+    formato = {
+        'largura': int(captura.get(cv2.CAP_PROP_FRAME_WIDTH)) or largura,
+        'altura': int(captura.get(cv2.CAP_PROP_FRAME_HEIGHT)) or altura,
+        'fps': captura.get(cv2.CAP_PROP_FPS) or fps,  # Algumas câmeras informam 0
+        'fourcc': ''.join(chr((codigo >> 8 * i) & 0xFF) for i in range(4)) if codigo else '',
+    }
+    return captura, formato
+
+
+def eh_jpeg(imagem):
+    """``True`` se ``imagem`` é um JPEG ainda codificado (captura com ``bruto=True``)."""
+    return imagem.ndim == 1 and len(imagem) > 2 and imagem[0] == 0xFF and imagem[1] == 0xD8
+
+
+def _qualidade_ffmpeg(codificador, qualidade):
+    # ``qualidade`` vai de 0 (menor arquivo) a 100 (melhor imagem)
+    if codificador == 'h264_videotoolbox':
+        return ['-q:v', str(int(qualidade))]
+    nivel = str(round(40 - 0.25 * qualidade))  # 75 → CRF 21
+    if codificador == 'libx264':
+        return ['-preset', 'veryfast', '-crf', nivel]
+    if codificador == 'h264_nvenc':
+        return ['-preset', 'p2', '-rc', 'vbr', '-cq', nivel]
+    if codificador == 'h264_qsv':
+        return ['-global_quality', nivel]
+    return ['-qp_i', nivel, '-qp_p', nivel]  # h264_amf
+
+
+class EscritorVideo:
+    """Base dos escritores: redimensiona se preciso, codifica e mede a latência por quadro."""
+
+    extensao = '.avi'
+    aceita_jpeg = False  # Se JPEGs da captura bruta podem ser gravados sem decodificar
+
+    def __init__(self, caminho, fps, tamanho):
+        self.caminho = caminho
+        self.fps = float(fps)
+        self.tamanho = (int(tamanho[0]), int(tamanho[1]))  # (largura, altura)
+        self.metricas = MetricasEtapa()
+        self.quadros = 0
+        self.redimensionados = 0
+
+    def write(self, imagem):
+        inicio = time.perf_counter()
+        if imagem.ndim == 1 and not self.aceita_jpeg:
+            imagem = cv2.imdecode(imagem, cv2.IMREAD_COLOR)  # JPEG da câmera (captura bruta)
+        if imagem.ndim == 3 and (imagem.shape[1], imagem.shape[0]) != self.tamanho:
+            imagem = cv2.resize(imagem, self.tamanho, interpolation=cv2.INTER_AREA)
+            self.redimensionados += 1
+        self._escrever(imagem)
+        self.metricas.registrar(time.perf_counter() - inicio)
+        self.quadros += 1
+
+    def release(self):
+        self._fechar()
+
+    def estatisticas(self):
+        resumo = self.metricas.resumo()
+        return {
+            'arquivo': self.caminho,
+            'codec': self.codec,
+            'quadros': self.quadros,
+            'redimensionados': self.redimensionados,
+            'codificacao_p50_ms': resumo['latencia_p50_ms'],
+            'codificacao_p95_ms': resumo['latencia_p95_ms'],
+        }
+
+
+class EscritorOpenCV(EscritorVideo):
+    def __init__(self, caminho, fps, tamanho, codec='mjpg', qualidade=75):
+        super().__init__(caminho, fps, tamanho)
+        self.codec = codec
+        fourcc, self.extensao = CODECS_OPENCV[codec]
+        self._escritor = cv2.VideoWriter(caminho, cv2.VideoWriter_fourcc(*fourcc), self.fps, self.tamanho)
+        if not self._escritor.isOpened():
+            raise ErroVideo(f"O OpenCV não abriu {caminho} com o codec {fourcc}")
+        self._escritor.set(cv2.VIDEOWRITER_PROP_QUALITY, qualidade)  # Só o MJPG usa
+
+    def _escrever(self, imagem):
+        self._escritor.write(imagem)
+
+    def _fechar(self):
+        self._escritor.release()
+
+
+class _EscritorFFmpeg(EscritorVideo):
+    # Processo FFmpeg lendo da entrada padrão; a codificação roda em paralelo a este processo
+
+    def __init__(self, caminho, fps, tamanho, argumentos_entrada, argumentos_saida, ffmpeg=None):
+        super().__init__(caminho, fps, tamanho)
+        ffmpeg = ffmpeg or localizar_ffmpeg()
+        if not ffmpeg:
+            raise ErroVideo("FFmpeg não encontrado no PATH")
+        self._erros = tempfile.TemporaryFile()
+        self._processo = subprocess.Popen(
+            [ffmpeg, '-hide_banner', '-loglevel', 'error', '-y', *argumentos_entrada, '-i', '-',
+             *argumentos_saida, caminho],
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._erros)
+
+    def _enviar(self, dados):
+        try:
+            self._processo.stdin.write(dados)
+        except (BrokenPipeError, OSError) as e:
+            raise ErroVideo(f"O FFmpeg parou de gravar {self.caminho}: {self._mensagem_erro()}") from e
+
+    def _mensagem_erro(self):
+        self._erros.seek(0)
+        return self._erros.read().decode(errors='replace').strip()
+
+    def _fechar(self, timeout=30.0):
+        try:
+            self._processo.stdin.close()
+        except OSError:
+            pass
+        try:
+            codigo = self._processo.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self._processo.kill()
+            codigo = self._processo.wait()
+        mensagem = self._mensagem_erro()
+        self._erros.close()
+        if codigo != 0:
+            raise ErroVideo(f"O FFmpeg terminou com código {codigo}: {mensagem}")
+
+
+class EscritorFFmpeg(_EscritorFFmpeg):
+    """Quadros BGR enviados crus ao FFmpeg, que os codifica (x264 ou H.264 na GPU)."""
+
+    extensao = '.mkv'
+
+    def __init__(self, caminho, fps, tamanho, codec='x264', qualidade=75, ffmpeg=None):
+        self.codec = codec
+        codificador = CODIFICADORES_FFMPEG[codec]
+        largura, altura = int(tamanho[0]), int(tamanho[1])
+        entrada = ['-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{largura}x{altura}', '-r', f'{float(fps):g}']
+        saida = ['-c:v', codificador, *_qualidade_ffmpeg(codificador, qualidade), '-pix_fmt', 'yuv420p']
+        super().__init__(caminho, fps, tamanho, entrada, saida, ffmpeg)
+
+    def _escrever(self, imagem):
+        self._enviar(memoryview(np.ascontiguousarray(imagem)).cast('B'))
+
+
+class EscritorMJPGDireto(EscritorVideo):
+    """Grava os JPEGs da câmera como estão; quadros BGR são comprimidos em JPEG uma vez.
+
+    Com FFmpeg o resultado é um ``.avi`` (``-c copy``, sem recodificar); sem ele,
+    um ``.mjpeg`` com os JPEGs em sequência, que o FFmpeg e o VLC abrem.
+    """
+
+    aceita_jpeg = True
+
+    def __init__(self, caminho, fps, tamanho, qualidade=75, ffmpeg=None):
+        super().__init__(caminho, fps, tamanho)
+        self.codec = CODEC_MJPG_DIRETO
+        self.qualidade = int(qualidade)
+        self.copiados = 0  # Quadros que já vieram em JPEG da câmera
+        ffmpeg = ffmpeg or localizar_ffmpeg()
+        if ffmpeg:
+            self.extensao = '.avi'
+            self._ffmpeg = _EscritorFFmpeg(caminho, fps, tamanho, ['-f', 'mjpeg', '-framerate', f'{float(fps):g}'],
+                                           ['-c:v', 'copy'], ffmpeg)
+            self._arquivo = None
+        else:
+            self.extensao = '.mjpeg'
+            self._ffmpeg = None
+            self._arquivo = open(caminho, 'wb')
+
+    def _escrever(self, imagem):
+        if eh_jpeg(imagem):
+            dados = imagem
+            self.copiados += 1
+        else:
+            ok, dados = cv2.imencode('.jpg', imagem, (cv2.IMWRITE_JPEG_QUALITY, self.qualidade))
+            if not ok:
+                raise ErroVideo("Falha ao comprimir o quadro em JPEG")
+        if self._ffmpeg is not None:
+            self._ffmpeg._enviar(memoryview(dados).cast('B'))
+        else:
+            self._arquivo.write(memoryview(dados).cast('B'))
+
+    def _fechar(self):
+        if self._ffmpeg is not None:
+            self._ffmpeg._fechar()
+        else:
+            self._arquivo.close()
+
+    def estatisticas(self):
+        return {**super().estatisticas(), 'copiados': self.copiados}
+
+
+def extensao_codec(codec):
+    """Extensão do arquivo que ``abrir_escritor`` cria para ``codec`` (já resolvido)."""
+    if codec in CODECS_OPENCV:
+        return CODECS_OPENCV[codec][1]
+    if codec in CODIFICADORES_FFMPEG:
+        return EscritorFFmpeg.extensao
+    if codec == CODEC_MJPG_DIRETO:
+        return '.avi' if localizar_ffmpeg() else '.mjpeg'
+    raise ErroVideo(f"Codec desconhecido: {codec}")
+
+
+def abrir_escritor(caminho_base, fps, tamanho, codec=CODEC_AUTO, qualidade=75):
+    """Cria o escritor de ``codec`` em ``caminho_base`` + extensão do contêiner.
+
+    ``tamanho`` é ``(largura, altura)`` do vídeo; se um codec via FFmpeg falhar ao
+    abrir, a gravação cai para o ``mjpg`` do OpenCV em vez de ser perdida.
+    """
+    codec = escolher_codec(codec)
+    caminho = caminho_base + extensao_codec(codec)
+    if codec in CODECS_OPENCV:
+        return EscritorOpenCV(caminho, fps, tamanho, codec, qualidade)
+    try:
+        if codec == CODEC_MJPG_DIRETO:
+            return EscritorMJPGDireto(caminho, fps, tamanho, qualidade)
+        return EscritorFFmpeg(caminho, fps, tamanho, codec, qualidade)
+    except (ErroVideo, OSError) as e:
+        print(f"Codec {codec} indisponível ({e}); gravando em MJPG pelo OpenCV")
+        return EscritorOpenCV(caminho_base + CODECS_OPENCV['mjpg'][1], fps, tamanho, 'mjpg', qualidade)
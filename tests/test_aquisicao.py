@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from siriusgraph.aquisicao import AquisicaoSerial
+
+
+def tempos_sem(perdidas, n=100, periodo=0.01):
+    # Tempos do ESP32 a cada ``periodo``, sem as amostras de índice ``perdidas``
+    tempos = np.arange(n) * periodo
+    return np.delete(tempos, list(perdidas))
+
+
+@pytest.mark.parametrize('perdidas', [(), (50,), (50, 51), (20, 60), (20, 60, 61)])
+def test_conta_amostras_perdidas(perdidas):
+    aquisicao = AquisicaoSerial('loop://')
+    aquisicao._registrar_lacunas(tempos_sem(perdidas))
+    assert aquisicao.amostras_perdidas == len(perdidas)
+
+
+def test_conta_amostra_perdida_entre_blocos():
+    aquisicao = AquisicaoSerial('loop://')
+    tempos = tempos_sem((50,))
+    aquisicao._registrar_lacunas(tempos[:50])
+    aquisicao._registrar_lacunas(tempos[50:])
+    assert aquisicao.amostras_perdidas == 1
@@ -0,0 +1,15 @@
+import pytest
+import serial
+
+from siriusgraph.aquisicao_async import ServicoAquisicao
+
+
+def test_iniciar_fecha_as_portas_abertas_se_outra_falhar():
+    servico = ServicoAquisicao()
+    primeira = servico.adicionar_fonte('empuxo', 'loop://')
+    servico.adicionar_fonte('pressao', '/dev/porta-que-nao-existe')
+    with pytest.raises(serial.SerialException):
+        servico.iniciar()
+    assert not primeira.conexao.is_open
+    assert servico._thread is None
+
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from siriusgraph.calibracao import (ErroCalibracao, PerfilCalibracao, ajustar_reta, carregar_perfil, media_robusta,
+                                    recalibrar_corrida, salvar_perfil)
+from siriusgraph.formato import EscritorCorrida, abrir_corrida
+
+CARGAS = [0.0, 5.0, 10.0, 20.0]
+
+
+def patamar(leitura, n=400, semente=0):
+    gerador = np.random.default_rng(semente)
+    return leitura + gerador.uniform(-0.05, 0.05, n)  # Limitado: nenhuma amostra boa passa de 3.5 MAD
+
+
+def perfil_medido(inclinacao=2.0, intercepto=0.3, escala=100.0):
+    perfil = PerfilCalibracao('celula50kg', escala_referencia=escala)
+    for k, carga in enumerate(CARGAS):
+        perfil.adicionar_patamar(carga, patamar(inclinacao * carga + intercepto, semente=k))
+    return perfil
+
+
+def test_media_robusta_descarta_picos():
+    valores = patamar(10.0)
+    valores[::50] = 1000.0  # Picos do HX711
+    media, desvio, usadas, rejeitadas = media_robusta(valores)
+    assert rejeitadas == 8 and usadas == 392
+    assert abs(media - 10.0) < 0.01 and desvio < 0.1
+
+
+def test_media_robusta_sem_amostras():
+    with pytest.raises(ErroCalibracao):
+        media_robusta([np.nan, np.inf])
+
+
+def test_ajustar_reta_recupera_coeficientes_e_residuos():
+    cargas = np.array(CARGAS)
+    desvio_linear = np.array([0.0, 0.02, -0.01, 0.0])
+    ajuste = ajustar_reta(cargas, 2.5 * (cargas + desvio_linear) - 1.0)
+    # Mínimos quadrados sem pesos: resíduos somam zero e refletem o desvio imposto
+    assert abs(np.sum(ajuste['residuos'])) < 1e-9
+    assert abs(ajuste['inclinacao'] - 2.5) < 0.01 and abs(ajuste['intercepto'] + 1.0) < 0.05
+    assert ajuste['residuo_maximo'] == pytest.approx(np.abs(ajuste['residuos']).max())
+    assert ajuste['nao_linearidade_pct'] == pytest.approx(ajuste['residuo_maximo'] / 20.0 * 100)
+    exata = ajustar_reta(cargas, 2.5 * cargas - 1.0)
+    assert exata['inclinacao'] == pytest.approx(2.5) and exata['intercepto'] == pytest.approx(-1.0)
+    assert exata['residuo_maximo'] < 1e-9
+
+
+def test_ajustar_reta_pondera_pelo_desvio():
+    # O ponto ruidoso pesa pouco: a reta passa pelos outros três
+    ajuste = ajustar_reta(CARGAS, [0.0, 10.0, 20.0, 45.0], desvios=[0.01, 0.01, 0.01, 10.0],
+                          amostras=[200, 200, 200, 200])
+    assert ajuste['inclinacao'] == pytest.approx(2.0, abs=1e-3)
+    assert ajuste['intercepto'] == pytest.approx(0.0, abs=1e-3)
+
+
+def test_ajustar_reta_exige_dois_pesos():
+    with pytest.raises(ErroCalibracao):
+        ajustar_reta([5.0, 5.0], [1.0, 1.1])
+
+
+def test_perfil_fator_firmware_e_aplicar():
+    perfil = perfil_medido()
+    assert perfil.ajuste is None
+    assert perfil.fator_firmware == pytest.approx(100.0 * 2.0, rel=1e-3)
+    np.testing.assert_allclose(perfil.aplicar([0.3, 20.3, 40.3]), [0.0, 10.0, 20.0], atol=0.01)
+    # Gravado com o dobro da escala: as leituras vêm pela metade
+    np.testing.assert_allclose(perfil.aplicar([0.15, 10.15], escala_gravacao=200.0), [0.0, 10.0], atol=0.01)
+    np.testing.assert_allclose(perfil.aplicar([0.3], escala_gravacao=float('nan')), [0.0], atol=0.01)
+
+
+def test_salvar_e_carregar_versoes(tmp_path):
+    diretorio = str(tmp_path)
+    primeiro = perfil_medido(inclinacao=2.0)
+    segundo = perfil_medido(inclinacao=3.0)
+    salvar_perfil(primeiro, diretorio)
+    caminho = salvar_perfil(segundo, diretorio)
+    assert caminho.endswith('v0002.json')
+    recente = carregar_perfil('celula50kg', diretorio=diretorio)
+    assert recente.versao == 2
+    assert recente.fator_firmware == pytest.approx(segundo.fator_firmware)
+    antigo = carregar_perfil('celula50kg', 1, diretorio)
+    assert antigo.ajuste['inclinacao'] == pytest.approx(primeiro.ajuste['inclinacao'])
+    assert antigo.pontos == primeiro.pontos
+    with pytest.raises(ErroCalibracao):
+        carregar_perfil('outra', diretorio=diretorio)
+
+
+def test_recalibrar_corrida(tmp_path):
+    perfil = perfil_medido()
+    perfil.versao = 1
+    entrada = str(tmp_path / 'corrida.srun')
+    tempo = np.arange(1000) * 0.001
+    carga = 10.0 * np.ones_like(tempo)
+    with EscritorCorrida(entrada, fator_calibracao=100.0) as escritor:
+        escritor.escrever(tempo=tempo, forca=2.0 * carga + 0.3, impulso=np.zeros_like(tempo),
+                          impulso_total=np.zeros_like(tempo))
+    saida = str(tmp_path / 'corrigida.srun')
+    assert recalibrar_corrida(entrada, saida, perfil) == 1000
+    corrida = abrir_corrida(saida)
+    assert corrida.cabecalho['fator_calibracao'] == pytest.approx(perfil.fator_firmware)
+    np.testing.assert_allclose(corrida['forca'], carga, atol=0.01)
+    assert corrida['impulso_total'][-1] == pytest.approx(10.0 * tempo[-1], rel=1e-2)
@@ -0,0 +1,85 @@
+import hashlib
+
+import numpy as np
+import pytest
+
+from siriusgraph.comparacao import (CacheCorridas, comparar_corridas, envelope, hash_arquivo, instante_ignicao,
+                                    reamostrar)
+from siriusgraph.formato import EscritorCorrida
+
+
+def queima(atraso, n=2000, taxa=1000.0):
+    tempo = np.arange(n) / taxa
+    forca = np.where(tempo >= atraso, 50.0 * np.exp(-(tempo - atraso) * 3), 0.0)
+    return tempo, forca
+
+
+def gravar(caminho, tempo, forca):
+    zeros = np.zeros_like(tempo)
+    with EscritorCorrida(caminho) as escritor:
+        escritor.escrever(tempo=tempo, forca=forca, impulso=zeros, impulso_total=zeros)
+    return caminho
+
+
+def test_instante_ignicao_interpolado():
+    tempo = np.array([0.0, 1.0, 2.0, 3.0])
+    assert instante_ignicao(tempo, [0.0, 0.0, 10.0, 20.0], limiar=2.5) == pytest.approx(1.25)
+    assert instante_ignicao(tempo, [0.0, 0.0, 10.0, 20.0]) == pytest.approx(1.1)  # 5% de 20 N
+    assert instante_ignicao(tempo, [5.0, 6.0, 7.0, 8.0], limiar=1.0) == 0.0
+    assert np.isnan(instante_ignicao(tempo, [0.0, 0.0, 0.0, 0.0], limiar=1.0))
+    assert np.isnan(instante_ignicao([], []))
+
+
+def test_reamostrar_igual_a_interp_por_corrida():
+    curvas = [(np.array([0.0, 0.1, 0.2, 0.2, 0.3]), np.array([0.0, 1.0, 2.0, 9.0, 3.0])),
+              (np.array([0.15, 0.25, 0.35]), np.array([5.0, 6.0, 7.0])),
+              (np.empty(0), np.empty(0))]
+    grade, matriz = reamostrar(curvas, passo=0.05)
+    np.testing.assert_allclose(grade, np.arange(8) * 0.05)
+    assert matriz.shape == (3, 8)
+    # Instante repetido: fica a primeira amostra
+    np.testing.assert_allclose(matriz[0, :7], np.interp(grade[:7], [0.0, 0.1, 0.2, 0.3], [0.0, 1.0, 2.0, 3.0]))
+    np.testing.assert_allclose(matriz[1, 3:], np.interp(grade[3:], curvas[1][0], curvas[1][1]))
+    assert np.all(np.isnan(matriz[0, 7:])) and np.all(np.isnan(matriz[1, :3])) and np.all(np.isnan(matriz[2]))
+
+
+def test_envelope_ignora_nan():
+    matriz = np.array([[1.0, 2.0, np.nan], [3.0, np.nan, np.nan]])
+    curvas = envelope(matriz)
+    np.testing.assert_array_equal(curvas['n'], [2, 1, 0])
+    np.testing.assert_allclose(curvas['media'][:2], [2.0, 2.0])
+    np.testing.assert_allclose(curvas['desvio'][:2], [1.0, 0.0])
+    np.testing.assert_allclose(curvas['minimo'][:2], [1.0, 2.0])
+    np.testing.assert_allclose(curvas['maximo'][:2], [3.0, 2.0])
+    assert np.isnan(curvas['media'][2])
+
+
+def test_hash_arquivo(tmp_path):
+    caminho = tmp_path / 'dados.bin'
+    conteudo = bytes(range(256)) * 5000
+    caminho.write_bytes(conteudo)
+    assert hash_arquivo(str(caminho), tamanho_bloco=1000) == hashlib.sha256(conteudo).hexdigest()
+
+
+def test_comparar_alinha_na_ignicao_e_usa_o_cache(tmp_path):
+    corridas = [(gravar(str(tmp_path / f'corrida{k}.srun'), *queima(atraso)), 'calibracao')
+                for k, atraso in enumerate((0.2, 0.5, 0.8))]
+    cache = CacheCorridas(str(tmp_path / 'cache'))
+    resumos, grade, matriz, curvas = comparar_corridas(corridas, limiar=1.0, antes=0.1, depois=1.0,
+                                                       cache=cache, processos=1)
+    assert [r['origem'] for r in resumos] == [c for c, _ in corridas]
+    ignicoes = [r['ignicao'] for r in resumos]
+    # A exponencial começa em 50 N no instante do atraso: a ignição é interpolada entre as amostras vizinhas
+    np.testing.assert_allclose(ignicoes, [0.2, 0.5, 0.8], atol=1e-3)
+    assert grade[0] == pytest.approx(-0.1) and grade[-1] == pytest.approx(1.0, abs=1e-3)
+    assert matriz.shape[0] == 3
+    np.testing.assert_allclose(np.nanmax(matriz, axis=0), np.nanmin(matriz, axis=0), atol=1.0)
+    assert np.all(curvas['n'] == 3)
+
+    recarregado = CacheCorridas(str(tmp_path / 'cache'))
+    chave = recarregado.chave(resumos[0]['sha256'], formato='calibracao', limiar_relativo=0.05, limiar=1.0)
+    assert recarregado.resumo(chave)['ignicao'] == pytest.approx(ignicoes[0])
+    de_novo, _, matriz_cache, _ = comparar_corridas(corridas, limiar=1.0, antes=0.1, depois=1.0,
+                                                    cache=recarregado, processos=1)
+    assert [r['sha256'] for r in de_novo] == [r['sha256'] for r in resumos]
+    np.testing.assert_array_equal(matriz_cache, matriz)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from siriusgraph import filtros
+
+CRIAR = {
+    'media': lambda: filtros.FiltroMediaMovel(10),
+    'exponencial': lambda: filtros.FiltroExponencial(0.94),
+    'savgol': lambda: filtros.FiltroSavitzkyGolay(21, 3),
+    'mediana': lambda: filtros.FiltroMediana(7),
+    'butterworth': lambda: filtros.FiltroButterworth(30, 1000),
+}
+
+
+@pytest.mark.parametrize('nome', sorted(CRIAR))
+def test_fase_zero_vazio(nome):
+    try:
+        filtro = CRIAR[nome]()
+    except ImportError:
+        pytest.skip("sem SciPy")
+    assert len(filtro.fase_zero(np.empty(0))) == 0
+    assert len(filtro.filtrar(np.empty(0))) == 0
+
+
+def sinal(n=5000):
+    rng = np.random.default_rng(1)
+    tempo = np.arange(n) / 1000
+    return 50 * (tempo > 1) + 10 * np.sin(40 * tempo) + rng.normal(0, 2, n)
+
+
+@pytest.mark.parametrize('nome', sorted(CRIAR))
+def test_blocos_iguais_a_passada_unica(nome):
+    try:
+        inteiro, em_blocos = CRIAR[nome](), CRIAR[nome]()
+    except ImportError:
+        pytest.skip("sem SciPy")
+    valores = sinal()
+    esperado = inteiro.filtrar(valores)
+    cortes = [0, 1, 2, 7, 230, 231, 1000, 1001, 3333, len(valores)]
+    obtido = np.concatenate([em_blocos.filtrar(valores[a:b]) for a, b in zip(cortes[:-1], cortes[1:])])
+    np.testing.assert_array_equal(obtido, esperado)
+
+
+@pytest.mark.parametrize('alfa', [0.94, 0.5, 0.01, 1.0])
+def test_exponencial_sem_scipy_em_blocos(monkeypatch, alfa):
+    monkeypatch.setattr(filtros, '_signal', None)
+    valores = sinal()
+    esperado = filtros.FiltroExponencial(alfa).filtrar(valores)
+    filtro = filtros.FiltroExponencial(alfa)
+    rng = np.random.default_rng(2)
+    cortes = np.unique(np.concatenate(([0, len(valores)], rng.integers(0, len(valores), 60))))
+    obtido = np.concatenate([filtro.filtrar(valores[a:b]) for a, b in zip(cortes[:-1], cortes[1:])])
+    np.testing.assert_array_equal(obtido, esperado)
+
+
+def test_exponencial_sem_scipy_segue_a_recorrencia(monkeypatch):
+    monkeypatch.setattr(filtros, '_signal', None)
+    valores = sinal(2000)
+    esperado = np.empty_like(valores)
+    anterior = valores[0]
+    for i, x in enumerate(valores):
+        anterior = esperado[i] = 0.94 * x + 0.06 * anterior
+    np.testing.assert_allclose(filtros.FiltroExponencial(0.94).filtrar(valores), esperado, rtol=1e-12, atol=1e-9)
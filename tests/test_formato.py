@@ -0,0 +1,68 @@
+import numpy as np
+
+from siriusgraph.formato import (EscritorCorrida, abrir_corrida, binario_para_texto, ler_cabecalho,
+                                 recuperar_corrida, texto_para_binario)
+
+
+def amostras(n=500):
+    tempo = np.arange(n) * 0.001
+    forca = np.round(100 * np.sin(7 * tempo), 4)
+    return dict(tempo=tempo, forca=forca, impulso=forca * 0.001, impulso_total=np.cumsum(forca) * 0.001)
+
+
+def test_ida_e_volta(tmp_path):
+    caminho = str(tmp_path / 'corrida.srun')
+    dados = amostras()
+    with EscritorCorrida(caminho, fator_calibracao=-21.5, taxa_amostragem=1000.0) as escritor:
+        escritor.escrever(**{k: v[:200] for k, v in dados.items()})
+        escritor.escrever(**{k: v[200:] for k, v in dados.items()})
+    corrida = abrir_corrida(caminho)
+    assert corrida.completa and len(corrida) == 500
+    assert corrida.cabecalho['fator_calibracao'] == -21.5
+    np.testing.assert_array_equal(corrida['tempo'], dados['tempo'])
+    np.testing.assert_array_equal(corrida['forca'], dados['forca'].astype(np.float32))
+    np.testing.assert_array_equal(corrida['impulso_total'], dados['impulso_total'])
+
+
+def test_corrida_interrompida_e_recuperada(tmp_path):
+    caminho = str(tmp_path / 'corrida.srun')
+    dados = amostras()
+    escritor = EscritorCorrida(caminho)
+    escritor.escrever(**dados)
+    escritor._arquivo.write(b'\1\2\3')  # Registro cortado no meio, como numa queda
+    escritor._arquivo.flush()
+
+    interrompida = abrir_corrida(caminho)
+    assert not interrompida.completa and len(interrompida) == 500
+    recuperada = recuperar_corrida(caminho)
+    assert recuperada.completa and len(recuperada) == 500
+    assert ler_cabecalho(caminho)['n_amostras'] == 500
+    np.testing.assert_array_equal(recuperada['tempo'], dados['tempo'])
+    escritor._arquivo.close()
+
+
+def test_corrida_fechada_sem_amostras_esta_completa(tmp_path):
+    caminho = str(tmp_path / 'vazia.srun')
+    EscritorCorrida(caminho).fechar()
+    corrida = abrir_corrida(caminho)
+    assert corrida.completa and len(corrida) == 0
+
+
+def test_texto_com_precisao_de_float32(tmp_path):
+    caminho = str(tmp_path / 'corrida.srun')
+    with EscritorCorrida(caminho) as escritor:
+        escritor.escrever(tempo=[0.5, 1.25], forca=[12.3456, -0.1], impulso=[0.0, 0.1], impulso_total=[0.0, 0.1])
+    texto = str(tmp_path / 'corrida.txt')
+    assert binario_para_texto(caminho, texto) == 2
+    linhas = open(texto).read().split()
+    assert linhas == ['0.5,12.3456,0,0', '1.25,-0.1,0.1,0.1']
+
+
+def test_texto_binario_texto(tmp_path):
+    texto = tmp_path / 'entrada.txt'
+    texto.write_text('0.001,1.5,0.0015,0.0015\n0.002,2.25,0.0019,0.0034\n')
+    caminho = str(tmp_path / 'corrida.srun')
+    assert texto_para_binario(str(texto), caminho) == 2
+    saida = str(tmp_path / 'saida.txt')
+    binario_para_texto(caminho, saida)
+    assert open(saida).read() == texto.read_text()
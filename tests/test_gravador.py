@@ -0,0 +1,74 @@
+import threading
+import time
+
+import numpy as np
+
+from siriusgraph.formato import abrir_corrida
+from siriusgraph.gravador import GravadorCorrida
+
+
+def bloco(inicio, n):
+    tempo = inicio + np.arange(n) * 0.001
+    return dict(tempo=tempo, forca=np.sin(tempo), impulso=tempo, impulso_total=2 * tempo)
+
+
+def test_grava_todos_os_blocos(tmp_path):
+    caminho = str(tmp_path / 'corrida.srun')
+    gravador = GravadorCorrida(caminho, tamanho_lote=64, fator_calibracao=412.5).iniciar()
+    for k in range(10):
+        gravador.adicionar(**bloco(k * 0.1, 100))
+    gravador.fechar()
+    assert gravador.erro is None and gravador.blocos_descartados == 0
+    corrida = abrir_corrida(caminho)
+    assert corrida.completa and len(corrida) == 1000
+    assert corrida.cabecalho['fator_calibracao'] == 412.5
+    np.testing.assert_array_equal(corrida['tempo'][:100], bloco(0.0, 100)['tempo'])
+
+
+def test_fechar_com_thread_morta_nao_trava(tmp_path):
+    gravador = GravadorCorrida(str(tmp_path / 'corrida.srun'), capacidade_fila=1)
+    gravador._fila.put(bloco(0.0, 10))  # Fila cheia e a thread nunca iniciada
+    inicio = time.monotonic()
+    gravador.fechar(timeout=5.0)
+    assert time.monotonic() - inicio < 1.0
+
+
+def test_fechar_com_fila_cheia_respeita_timeout(tmp_path, monkeypatch):
+    gravador = GravadorCorrida(str(tmp_path / 'corrida.srun'), capacidade_fila=1)
+    liberar = threading.Event()
+    monkeypatch.setattr(gravador, '_acumular', lambda _: liberar.wait())
+    gravador.iniciar()
+    gravador.adicionar(**bloco(0.0, 10))  # Preso em _acumular
+    time.sleep(0.1)
+    gravador.adicionar(**bloco(0.1, 10))  # Ocupa a fila
+    inicio = time.monotonic()
+    gravador.fechar(timeout=0.3)
+    assert time.monotonic() - inicio < 1.0
+    assert isinstance(gravador.erro, TimeoutError)
+    liberar.set()
+
+
+def test_erro_ao_fechar_o_arquivo_fica_em_erro(tmp_path, monkeypatch):
+    gravador = GravadorCorrida(str(tmp_path / 'corrida.srun'))
+
+    def falhar():
+        raise OSError(28, "No space left on device")
+    monkeypatch.setattr(gravador.escritor, 'fechar', falhar)
+    gravador.iniciar()
+    gravador.adicionar(**bloco(0.0, 10))
+    gravador.fechar()
+    assert not gravador.is_alive()
+    assert isinstance(gravador.erro, OSError)
+
+
+def test_lote_com_falha_nao_conta_como_gravado(tmp_path, monkeypatch):
+    gravador = GravadorCorrida(str(tmp_path / 'corrida.srun'), tamanho_lote=10)
+
+    def falhar(_):
+        raise OSError(5, "Input/output error")
+    monkeypatch.setattr(gravador.escritor, 'escrever_registros', falhar)
+    gravador.iniciar()
+    gravador.adicionar(**bloco(0.0, 25))
+    gravador.fechar()
+    assert isinstance(gravador.erro, OSError)
+    assert gravador.lotes_gravados == 0
@@ -0,0 +1,47 @@
+import numpy as np
+
+from siriusgraph.leitura import SeguidorArquivo
+
+
+def seguir(tmp_path, conteudo, formato='bancada'):
+    caminho = tmp_path / 'dados.txt'
+    caminho.write_bytes(conteudo)
+    seguidor = SeguidorArquivo(str(caminho), formato=formato)
+    seguidor.ler_novos(ate_o_fim=True)
+    return seguidor
+
+
+def test_linha_em_branco_no_meio_de_tres_colunas(tmp_path):
+    seguidor = seguir(tmp_path, b'1 10 0.5\n\n2 20 0.6\n')
+    np.testing.assert_array_equal(seguidor.buffer['tempo'], [1, 2])
+    np.testing.assert_array_equal(seguidor.buffer['forca'], [10, 20])
+    np.testing.assert_array_equal(seguidor.buffer['pressao'], [0.5, 0.6])
+
+
+def test_linha_em_branco_no_meio_de_duas_colunas(tmp_path):
+    seguidor = seguir(tmp_path, b'1 10\n\n2 20\n  \n3 30\n')
+    np.testing.assert_array_equal(seguidor.buffer['tempo'], [1, 2, 3])
+    np.testing.assert_array_equal(seguidor.buffer['forca'], [10, 20, 30])
+    assert np.isnan(seguidor.buffer['pressao']).all()
+
+
+def test_linhas_com_campos_diferentes_nao_desalinham(tmp_path):
+    # 1 + 3 campos somam 2 por linha, 2 + 4 somam 3: os totais batem com os caminhos rápidos
+    seguidor = seguir(tmp_path, b'5\n1 10 0.5\n2 20\n3 30 0.7 99\n')
+    np.testing.assert_array_equal(seguidor.buffer['tempo'], [1, 2, 3])
+    np.testing.assert_array_equal(seguidor.buffer['forca'], [10, 20, 30])
+    np.testing.assert_array_equal(seguidor.buffer['pressao'], [0.5, np.nan, 0.7])
+    assert seguidor.linhas_invalidas == 1
+
+
+def test_uma_e_tres_colunas_nao_viram_duas(tmp_path):
+    seguidor = seguir(tmp_path, b'7\n1 10 0.5\n')
+    np.testing.assert_array_equal(seguidor.buffer['tempo'], [1])
+    np.testing.assert_array_equal(seguidor.buffer['forca'], [10])
+
+
+def test_duas_e_quatro_colunas_nao_viram_tres(tmp_path):
+    seguidor = seguir(tmp_path, b'1 10\n2 20 0.6 99\n')
+    np.testing.assert_array_equal(seguidor.buffer['tempo'], [1, 2])
+    np.testing.assert_array_equal(seguidor.buffer['forca'], [10, 20])
+    np.testing.assert_array_equal(seguidor.buffer['pressao'], [np.nan, 0.6])
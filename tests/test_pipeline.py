@@ -0,0 +1,70 @@
+import time
+
+import numpy as np
+
+from siriusgraph.pipeline import FIM, PipelineVideo
+
+
+class CameraFalsa:
+    """``n`` quadros entregues sem espera, mais rápido que a composição."""
+
+    def __init__(self, n):
+        self.n = n
+        self.lidos = 0
+
+    def read(self):
+        if self.lidos >= self.n:
+            return False, None
+        self.lidos += 1
+        return True, np.full((4, 4, 3), self.lidos % 256, dtype=np.uint8)
+
+
+def compor_devagar(quadro):
+    time.sleep(0.002)
+    return quadro
+
+
+def esperar_fim(pipeline, timeout=10.0):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if pipeline.quadro_para_exibir() is FIM:
+            break
+        time.sleep(0.001)
+    pipeline.parar()
+
+
+def test_gravacao_recebe_todos_os_quadros_em_ordem():
+    gravados = []
+    pipeline = PipelineVideo(CameraFalsa(200), compor_devagar, gravar=lambda q: gravados.append(q.indice),
+                             capacidade_composicao=4).iniciar()
+    esperar_fim(pipeline)
+    assert gravados == list(range(200))
+    assert pipeline.quadros_perdidos == 0
+    assert pipeline.esperas_captura > 0  # A captura esperou em vez de descartar
+
+
+def test_sem_gravacao_a_composicao_descarta_os_atrasados():
+    compostos = []
+
+    def compor(quadro):
+        compostos.append(quadro.indice)
+        return compor_devagar(quadro)
+    pipeline = PipelineVideo(CameraFalsa(200), compor).iniciar()
+    esperar_fim(pipeline)
+    assert len(compostos) + pipeline.quadros_perdidos == 200
+    assert compostos == sorted(compostos)
+
+
+def test_falha_em_um_quadro_pula_so_ele():
+    gravados = []
+
+    def compor(quadro):
+        if quadro.indice == 5:
+            raise ValueError("quadro ruim")
+        return quadro
+    pipeline = PipelineVideo(CameraFalsa(20), compor, gravar=lambda q: gravados.append(q.indice)).iniciar()
+    esperar_fim(pipeline)
+    assert gravados == [k for k in range(20) if k != 5]
+    assert pipeline.composicao.falhas == 1
+    assert [nome for nome, _ in pipeline.novos_erros()] == ['composicao']
+    assert pipeline.novos_erros() == []
@@ -0,0 +1,50 @@
+import numpy as np
+
+from siriusgraph.protocolo import QUADRO_ESCALA, ProtocoloSerial
+
+
+def quadros(n, inicio=0):
+    return b''.join(b'<1,%d,%.2f>' % (k, k * 0.5) for k in range(inicio, inicio + n))
+
+
+def test_blocos_cortados_em_qualquer_ponto():
+    dados = quadros(100)
+    for passo in (1, 3, 7, 64):
+        protocolo = ProtocoloSerial()
+        tempos, forcas = [], []
+        for i in range(0, len(dados), passo):
+            t, f = protocolo.alimentar(dados[i:i + passo])
+            tempos.append(t)
+            forcas.append(f)
+        np.testing.assert_array_equal(np.concatenate(tempos), np.arange(100))
+        np.testing.assert_array_equal(np.concatenate(forcas), np.arange(100) * 0.5)
+        assert protocolo.quadros_dados == 100 and protocolo.quadros_malformados == 0
+
+
+def test_lixo_e_quadros_truncados_sao_descartados():
+    protocolo = ProtocoloSerial()
+    dados = quadros(3) + b'\x00\xffrst' + b'<1,3,' + quadros(2, 4) + b'<1,abc,2>' + quadros(1, 6)
+    tempos, forcas = protocolo.alimentar(dados)
+    np.testing.assert_array_equal(tempos, [0, 1, 2, 4, 5, 6])
+    assert protocolo.quadros_malformados == 2
+    assert protocolo.estatisticas()['quadros_dados'] == 6
+
+
+def test_resto_sem_fim_e_limitado():
+    protocolo = ProtocoloSerial(tamanho_maximo=16)
+    protocolo.alimentar(b'x' * 100)
+    assert protocolo.bytes_descartados == 100
+    tempos, _ = protocolo.alimentar(quadros(2))
+    np.testing.assert_array_equal(tempos, [0, 1])
+
+
+def test_quadro_de_escala_vai_para_o_tratador():
+    protocolo = ProtocoloSerial()
+    escalas = []
+    protocolo.registrar(QUADRO_ESCALA, lambda campos: escalas.append(campos))
+    tempos, _ = protocolo.alimentar(quadros(2) + b'<2,-412.5>' + b'<9,1>' + quadros(1, 2))
+    np.testing.assert_array_equal(tempos, [0, 1, 2])
+    assert escalas == [[-412.5]]
+    estatisticas = protocolo.estatisticas()
+    assert estatisticas['quadros_outros'] == 1 and estatisticas['quadros_desconhecidos'] == 1
+    assert estatisticas['quadros_malformados'] == 0
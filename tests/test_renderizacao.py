@@ -0,0 +1,128 @@
+import cv2
+import numpy as np
+import pytest
+
+from siriusgraph.formato import EscritorCorrida
+from siriusgraph.renderizacao import (CompositorSobreposicao, abrir_video, amostras_exibidas, dividir_trechos,
+                                      permite_busca, renderizar)
+from siriusgraph.sincronizacao import GravadorSincronizado, RelogioDispositivo
+from siriusgraph.video import abrir_escritor
+
+TAMANHO = (320, 240)
+
+
+def dados_sinteticos(n=3000, taxa=1000.0):
+    tempo = 2.0 + np.arange(n) / taxa
+    forca = np.where(tempo > 2.5, 80 * np.sin(3 * (tempo - 2.5)) ** 2, -1.0) + np.cos(50 * tempo)
+    zeros = np.zeros(n)
+    return {'tempo': tempo, 'forca': forca, 'forca_grafico': forca, 'impulso': zeros, 'impulso_total': zeros}
+
+
+def imagem(k):
+    quadro = np.full((TAMANHO[1], TAMANHO[0], 3), (k * 7) % 256, dtype=np.uint8)
+    cv2.putText(quadro, str(k), (40, 160), cv2.FONT_HERSHEY_SIMPLEX, 3, (255, 255, 255), 5)
+    return quadro
+
+
+def test_amostras_exibidas():
+    tempos = np.arange(100) * 0.01
+    indice = {
+        'instante_captura': np.array([10.0, 10.5, 11.0, 12.0]),
+        'instante_inicio': np.array([10.0, 10.0, 11.0, 12.0]),
+        'instante_fim': np.array([11.0, 11.0, 12.0, 13.0]),
+        'tempo_dispositivo_inicio': np.array([0.0, 0.0, 0.5, np.nan]),
+        'tempo_dispositivo_fim': np.array([0.5, 0.5, 1.0, np.nan]),
+    }
+    # Captura em t=0, 0.25 e 0.5 do ESP32: amostras com tempo <= t; sem tempo, nenhuma
+    np.testing.assert_array_equal(amostras_exibidas(indice, tempos), [1, 26, 51, 0])
+
+
+def test_dividir_trechos_cobre_tudo():
+    trechos = dividir_trechos(1000, 3)
+    assert trechos[0][0] == 0 and trechos[-1][1] == 1000
+    assert all(a[1] == b[0] for a, b in zip(trechos[:-1], trechos[1:]))
+    assert dividir_trechos(2, 5) == [(0, 1), (1, 2)]
+
+
+@pytest.mark.parametrize('amostras', [None, 500])
+def test_acompanhar_da_os_mesmos_limites_que_a_janela(amostras):
+    dados = dados_sinteticos()
+    rapido = CompositorSobreposicao(dados, *TAMANHO, amostras=amostras)
+    completo = CompositorSobreposicao(dados, *TAMANHO, amostras=amostras)
+    for n in range(0, 3001, 37):
+        rapido.acompanhar(n)
+        if n:
+            completo.grafico.acompanhar(*completo._janela(n))
+        assert rapido.grafico._xlim == completo.grafico._xlim
+        assert rapido.grafico._ylim == completo.grafico._ylim
+
+
+def test_trecho_aquecido_igual_ao_sequencial():
+    dados = dados_sinteticos()
+    n = np.linspace(0, 3000, 40).astype(int)
+    sequencial = CompositorSobreposicao(dados, *TAMANHO, amostras=None)
+    esperado = [sequencial.compor(imagem(k), n[k]).copy() for k in range(len(n))]
+    trecho = CompositorSobreposicao(dados, *TAMANHO, amostras=None)
+    for k in range(25):
+        trecho.acompanhar(n[k])
+    for k in range(25, len(n)):
+        np.testing.assert_array_equal(trecho.compor(imagem(k), n[k]), esperado[k])
+
+
+@pytest.mark.parametrize('fourcc,extensao', [('MJPG', '.avi'), ('mp4v', '.mp4')])
+def test_abrir_video_no_meio(tmp_path, fourcc, extensao):
+    caminho = str(tmp_path / f'video{extensao}')
+    escritor = cv2.VideoWriter(caminho, cv2.VideoWriter_fourcc(*fourcc), 30, TAMANHO)
+    for k in range(120):
+        escritor.write(imagem(k))
+    escritor.release()
+    captura = cv2.VideoCapture(caminho)
+    sequencia = [captura.read()[1] for _ in range(120)]
+    captura.release()
+    assert permite_busca(caminho, 60)
+    for inicio in (1, 13, 59, 119):
+        captura = abrir_video(caminho, inicio)
+        ok, quadro = captura.read()
+        captura.release()
+        assert ok
+        np.testing.assert_array_equal(quadro, sequencia[inicio])
+
+
+def test_renderizar_gera_todos_os_quadros(tmp_path):
+    dados = dados_sinteticos()
+    caminho_dados = str(tmp_path / 'calibration_data.srun')
+    with EscritorCorrida(caminho_dados) as escritor:
+        escritor.escrever(tempo=dados['tempo'], forca=dados['forca'], impulso=dados['impulso'],
+                          impulso_total=dados['impulso_total'])
+    relogio = RelogioDispositivo()
+    for t in dados['tempo'][::50]:
+        relogio.registrar(t, t + 100.0)
+    video = abrir_escritor(str(tmp_path / 'calibration_video'), 30.0, TAMANHO, 'mjpg')
+    indice = str(tmp_path / 'calibration_video_indice.csv')
+    gravador = GravadorSincronizado(video, 30.0, indice, relogio)
+    for k in range(90):
+        gravador.escrever(imagem(k), dados['tempo'][0] + 100.0 + (k + 0.5) / 30.0, k)
+    gravador.fechar()
+    video.release()
+
+    resumo = renderizar(video.caminho, indice, caminho_dados, str(tmp_path / 'saida'), codec='mjpg', processos=1)
+    assert resumo['quadros'] == resumo['quadros_indice'] == 90
+    captura = cv2.VideoCapture(resumo['arquivo'])
+    assert int(captura.get(cv2.CAP_PROP_FRAME_COUNT)) == 90
+    captura.release()
+
+
+def test_mjpeg_sem_indice_le_ate_o_inicio(tmp_path):
+    caminho = str(tmp_path / 'video.mjpeg')
+    with open(caminho, 'wb') as arquivo:
+        for k in range(40):
+            arquivo.write(cv2.imencode('.jpg', imagem(k))[1].tobytes())
+    captura = cv2.VideoCapture(caminho)
+    sequencia = [captura.read()[1] for _ in range(21)]
+    captura.release()
+    assert not permite_busca(caminho, 20)
+    captura = abrir_video(caminho, 20)
+    ok, quadro = captura.read()
+    captura.release()
+    assert ok
+    np.testing.assert_array_equal(quadro, sequencia[20])
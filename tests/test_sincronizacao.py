@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from siriusgraph.sincronizacao import GravadorSincronizado, RelogioDispositivo, amostras_por_quadro, carregar_indice
+
+
+class EscritorFalso:
+    def __init__(self):
+        self.quadros = []
+
+    def write(self, imagem):
+        self.quadros.append(imagem)
+
+
+def test_relogio_estima_deslocamento_e_deriva():
+    gerador = np.random.default_rng(1)
+    relogio = RelogioDispositivo(janela=1.0)
+    tempos = np.arange(0.0, 30.0, 0.01)
+    atrasos = gerador.exponential(0.005, len(tempos))
+    atrasos[::50] = 0.0  # Em cada bloco, ao menos uma amostra chega sem atraso
+    for t, atraso in zip(tempos, atrasos):
+        relogio.registrar(t, 1000.0 + t * (1 + 2e-5) + atraso)
+    assert relogio.deslocamento == pytest.approx(1000.0, abs=1e-6)
+    assert relogio.deriva == pytest.approx(2e-5, abs=1e-8)
+    instantes = relogio.para_host([0.0, 12.5])
+    np.testing.assert_allclose(instantes, [1000.0, 1000.0 + 12.5 * (1 + 2e-5)], atol=1e-6)
+    np.testing.assert_allclose(relogio.para_dispositivo(instantes), [0.0, 12.5], atol=1e-9)
+
+
+def test_relogio_antes_do_primeiro_bloco_usa_a_menor_diferenca():
+    relogio = RelogioDispositivo(janela=1.0)
+    relogio.registrar(0.1, 5.3)
+    relogio.registrar(0.2, 5.25)
+    relogio.registrar(0.3, 5.4)
+    assert relogio.deslocamento == pytest.approx(5.05)
+    assert relogio.deriva == 0.0
+
+
+def test_gravador_duplica_e_descarta_quadros(tmp_path):
+    escritor = EscritorFalso()
+    caminho = str(tmp_path / 'indice.csv')
+    gravador = GravadorSincronizado(escritor, 10.0, caminho)
+    gravador.escrever('A', 100.0, 0)
+    gravador.escrever('B', 100.05, 1)  # Mesma posição que A: A é descartado
+    gravador.escrever('C', 100.35, 2)  # Posições 1 e 2 repetem B
+    gravador.fechar()
+    assert escritor.quadros == ['B', 'B', 'B', 'C']
+    assert gravador.estatisticas() == {'quadros_escritos': 4, 'duplicados': 2, 'descartados': 1}
+    indice = carregar_indice(caminho)
+    np.testing.assert_array_equal(indice['quadro'], [0, 1, 2, 3])
+    np.testing.assert_array_equal(indice['quadro_captura'], [1, 1, 1, 2])
+    np.testing.assert_array_equal(indice['duplicado'], [0, 1, 1, 0])
+    np.testing.assert_allclose(indice['instante_inicio'], [100.0, 100.1, 100.2, 100.3])
+    assert np.all(np.isnan(indice['tempo_dispositivo_inicio']))  # Sem relógio
+
+
+def test_indice_no_tempo_do_dispositivo(tmp_path):
+    relogio = RelogioDispositivo()
+    for t in np.arange(0.0, 5.0, 0.01):
+        relogio.registrar(t, t + 50.0)
+    caminho = str(tmp_path / 'indice.csv')
+    gravador = GravadorSincronizado(EscritorFalso(), 4.0, caminho, relogio)
+    for k in range(8):
+        gravador.escrever(k, 51.0 + k / 4.0, k)
+    gravador.fechar()
+    indice = carregar_indice(caminho)
+    np.testing.assert_allclose(indice['tempo_dispositivo_inicio'], 1.0 + np.arange(8) / 4.0, atol=1e-6)
+    np.testing.assert_allclose(indice['tempo_dispositivo_fim'], 1.25 + np.arange(8) / 4.0, atol=1e-6)
+    inicio, fim = amostras_por_quadro(indice, np.arange(0.0, 5.0, 0.01))
+    np.testing.assert_array_equal(fim - inicio, np.full(8, 25))
@@ -0,0 +1,39 @@
+import cv2
+import numpy as np
+import pytest
+
+from siriusgraph.sincronizacao import GravadorSincronizado
+from siriusgraph.video import EscritorMJPGDireto, abrir_escritor, eh_jpeg, localizar_ffmpeg
+
+TAMANHO = (160, 120)
+
+
+def jpeg(k):
+    imagem = np.full((TAMANHO[1], TAMANHO[0], 3), (k * 9) % 256, dtype=np.uint8)
+    return cv2.imencode('.jpg', imagem)[1]
+
+
+@pytest.mark.skipif(localizar_ffmpeg() is not None, reason="com FFmpeg o resultado é um .avi")
+def test_mjpg_direto_grava_os_jpegs_da_camera_sem_recodificar(tmp_path):
+    escritor = EscritorMJPGDireto(str(tmp_path / 'video.mjpeg'), 30.0, TAMANHO)
+    quadros = [jpeg(k) for k in range(10)]
+    gravador = GravadorSincronizado(escritor, 30.0)
+    for k, quadro in enumerate(quadros):
+        assert eh_jpeg(quadro)
+        gravador.escrever(quadro, (k + 0.5) / 30.0, k)
+    gravador.fechar()
+    escritor.release()
+    assert escritor.copiados == 10
+    assert open(escritor.caminho, 'rb').read() == b''.join(q.tobytes() for q in quadros)
+
+
+def test_jpeg_bruto_e_decodificado_para_outros_codecs(tmp_path):
+    escritor = abrir_escritor(str(tmp_path / 'video'), 30.0, TAMANHO, 'mjpg')
+    escritor.write(jpeg(3))
+    escritor.write(np.zeros((240, 320, 3), dtype=np.uint8))  # Tamanho diferente: redimensionado
+    escritor.release()
+    assert escritor.quadros == 2 and escritor.redimensionados == 1
+    captura = cv2.VideoCapture(escritor.caminho)
+    ok, quadro = captura.read()
+    captura.release()
+    assert ok and quadro.shape == (TAMANHO[1], TAMANHO[0], 3)